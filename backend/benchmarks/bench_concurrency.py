@@ -0,0 +1,88 @@
+"""
+Concurrent-request benchmark: how long do cheap /analytics/summary calls take
+while slow /plans/variations calls are in flight?
+
+Runs the app in-process over ASGI against a throwaway SQLite file, so it measures
+event-loop blocking rather than network overhead.
+
+One client loops on /analytics/summary while --variations clients loop on
+/plans/variations for --duration seconds.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--duration 5] [--variations 2] [--foods 5000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+import httpx
+from database import engine, create_db_and_tables, UnitOfWork
+from models import FoodItem
+from main import app
+
+engine.echo = False
+
+
+def seed(n_foods: int):
+    create_db_and_tables()
+    with UnitOfWork() as uow:
+        for i in range(n_foods):
+            uow.session.add(FoodItem(name=f"Food {i}", calories=50 + i % 500, protein=i % 40,
+                                     carbs=i % 60, fats=i % 25, is_custom=False))
+
+
+async def run(args):
+    seed(args.foods)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/users/", json={"email": "bench@example.com", "password": "benchpass"})
+        token = (await client.post("/token", data={"username": "bench@example.com", "password": "benchpass"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        latencies = []
+        variations_done = 0
+        deadline = time.perf_counter() + args.duration
+
+        async def summaries():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get("/analytics/summary", headers=headers)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        async def variations():
+            nonlocal variations_done
+            while time.perf_counter() < deadline:
+                response = await client.post("/plans/variations", headers=headers)
+                response.raise_for_status()
+                variations_done += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(summaries(), *(variations() for _ in range(args.variations)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies) + variations_done
+    print(f"requests:            {total} ({len(latencies)} summary, {variations_done} variations)")
+    print(f"wall time:           {elapsed:.2f}s")
+    print(f"throughput:          {total / elapsed:.1f} req/s")
+    print(f"summary p50 latency: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"summary p95 latency: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+    print(f"summary max latency: {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to keep the load running")
+    parser.add_argument("--variations", type=int, default=2, help="clients looping on /plans/variations")
+    parser.add_argument("--foods", type=int, default=5000, help="catalog size to seed")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""
+Dependency-resolution overhead per route.
+
+For every API route a probe endpoint is mounted that declares exactly the same
+Depends(...) parameters but does no work, so the time per request is the cost
+of resolving that route's dependency graph (services, unit of work, auth)
+minus a dependency-free baseline probe.
+
+Usage:
+    python benchmarks/bench_dependencies.py [--requests 1000]
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+import httpx
+from fastapi import FastAPI, params
+from fastapi.routing import APIRoute
+from database import engine, create_db_and_tables
+from services.auth_service import AuthenticationService
+from main import app
+
+engine.echo = False
+
+
+def build_probe_app():
+    probe_app = FastAPI()
+    probes = {}
+
+    async def baseline():
+        return None
+    probe_app.add_api_route("/probe/baseline", baseline, methods=["GET"])
+
+    for index, route in enumerate(r for r in app.routes if isinstance(r, APIRoute)):
+        dependencies = [
+            p for p in inspect.signature(route.endpoint).parameters.values()
+            if isinstance(p.default, params.Depends) and p.default.dependency is not None
+        ]
+
+        async def probe(**kwargs):
+            return None
+        probe.__signature__ = inspect.Signature(dependencies)
+
+        path = f"/probe/{index}"
+        probe_app.add_api_route(path, probe, methods=["GET"])
+        probes[f"{'/'.join(sorted(route.methods))} {route.path}"] = path
+
+    probe_app.dependency_overrides = app.dependency_overrides
+    return probe_app, probes
+
+
+async def time_path(client, path, headers, requests):
+    await client.get(path, headers=headers)  # warm caches and lazy construction
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+    return (time.perf_counter() - start) / requests
+
+
+async def run(args):
+    create_db_and_tables()
+    auth_service = AuthenticationService()
+    auth_service.register_user({"email": "bench@example.com"}, "benchpass")
+    headers = {"Authorization": f"Bearer {auth_service.create_access_token({'sub': 'bench@example.com'})}"}
+
+    probe_app, probes = build_probe_app()
+    transport = httpx.ASGITransport(app=probe_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        baseline = await time_path(client, "/probe/baseline", headers, args.requests)
+        print(f"{'route':<32} {'overhead/request':>18}")
+        print(f"{'(baseline, no dependencies)':<32} {baseline * 1e6:>15.0f} us")
+        for name, path in probes.items():
+            per_request = await time_path(client, path, headers, args.requests)
+            print(f"{name:<32} {(per_request - baseline) * 1e6:>15.0f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per route")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""
+Food search over a large synthetic catalog: the old `ILIKE '%q%'` scan versus the
+FTS5 prefix search in FoodRepository.search_foods.
+
+Builds a throwaway SQLite database with --rows foods (names made of common food
+words), applies the migrations (FTS table + triggers), then times the queries a
+user produces while typing.
+
+Usage:
+    python benchmarks/bench_food_search.py [--rows 500000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+from sqlmodel import select, col
+from database import engine, create_db_and_tables, UnitOfWork
+from models import FoodItem
+from repositories.food_repository import FoodRepository
+
+WORDS = ("chicken beef pork turkey salmon tuna shrimp egg tofu tempeh rice pasta bread oat quinoa "
+         "barley potato sweet corn bean lentil chickpea pea spinach kale broccoli carrot tomato onion "
+         "pepper apple banana orange mango berry grape melon yogurt cheese milk butter almond peanut "
+         "walnut cashew honey chocolate vanilla soup salad sandwich wrap burger pizza curry stew").split()
+STYLES = "grilled baked fried roasted steamed raw smoked boiled braised spicy organic".split()
+
+
+def populate(rows: int):
+    create_db_and_tables()
+    rng = random.Random(42)
+    batch = []
+    with engine.begin() as connection:
+        for i in range(rows):
+            name = f"{rng.choice(STYLES).title()} {rng.choice(WORDS).title()} {rng.choice(WORDS).title()} #{i}"
+            batch.append((name, rng.uniform(20, 900), rng.uniform(0, 60), rng.uniform(0, 90), rng.uniform(0, 50)))
+            if len(batch) == 10000:
+                connection.exec_driver_sql(
+                    "INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom, details) "
+                    "VALUES (?, ?, ?, ?, ?, 0, '{}')", batch)
+                batch = []
+        if batch:
+            connection.exec_driver_sql(
+                "INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom, details) "
+                "VALUES (?, ?, ?, ?, ?, 0, '{}')", batch)
+
+
+def ilike_search(query: str):
+    with UnitOfWork() as uow:
+        return uow.session.exec(select(FoodItem).where(col(FoodItem.name).ilike(f"%{query}%"))).all()
+
+
+def time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), len(result)
+
+
+def main(args):
+    start = time.perf_counter()
+    populate(args.rows)
+    print(f"built {args.rows} foods + FTS index in {time.perf_counter() - start:.1f}s\n")
+
+    repo = FoodRepository()
+    print(f"{'query':<16} {'ILIKE p50':>11} {'rows':>8} {'FTS5 p50':>11} {'rows':>6}")
+    for query in ["c", "ch", "chi", "chick", "chicken", "grilled chick", "salmon", ""]:
+        ilike_ms, ilike_rows = time_ms(lambda: ilike_search(query), max(1, args.repeat // 5))
+        fts_ms, fts_rows = time_ms(lambda: repo.search_foods(query), args.repeat)
+        print(f"{query!r:<16} {ilike_ms:>9.1f}ms {ilike_rows:>8} {fts_ms:>9.2f}ms {fts_rows:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
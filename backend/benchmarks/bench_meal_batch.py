@@ -0,0 +1,78 @@
+"""
+Logging N meals one POST /meals at a time versus a single POST /meals/batch.
+
+Half of the entries carry a catalog food id, half are custom foods (name and
+macros only), like a day copied from another tracker. Runs in-process against
+a temporary file database with the production storage profile.
+
+Usage:
+    python benchmarks/bench_meal_batch.py [--meals 50] [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+import httpx
+from database import engine, create_db_and_tables
+from services.auth_service import AuthenticationService
+from main import app
+
+engine.echo = False
+
+
+def build_meals(count, round_index):
+    start = datetime(2024, 1, 1) + timedelta(days=round_index)
+    meals = []
+    for i in range(count):
+        if i % 2:
+            food_item = {"id": 1, "name": "Apple", "calories": 95, "protein": 0.5, "carbs": 25, "fats": 0.3}
+        else:
+            food_item = {"name": f"Imported food {i % 10}", "calories": 100 + i, "protein": 5, "carbs": 10, "fats": 2}
+        meals.append({"date": (start + timedelta(minutes=i)).isoformat(), "meal_type": "snack", "food_item": food_item})
+    return meals
+
+
+async def run(args):
+    create_db_and_tables()
+    auth_service = AuthenticationService()
+    auth_service.register_user({"email": "bench@example.com"}, "benchpass")
+    headers = {"Authorization": f"Bearer {auth_service.create_access_token({'sub': 'bench@example.com'})}"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        single, batch = [], []
+        for round_index in range(args.rounds):
+            meals = build_meals(args.meals, round_index)
+            start = time.perf_counter()
+            for meal in meals:
+                (await client.post("/meals", json=meal, headers=headers)).raise_for_status()
+            single.append(time.perf_counter() - start)
+
+            meals = build_meals(args.meals, args.rounds + round_index)
+            start = time.perf_counter()
+            response = await client.post("/meals/batch", json={"meals": meals}, headers=headers)
+            response.raise_for_status()
+            assert response.json()["created"] == args.meals
+            batch.append(time.perf_counter() - start)
+
+    single_ms = min(single) * 1000
+    batch_ms = min(batch) * 1000
+    print(f"{args.meals} meals, best of {args.rounds}")
+    print(f"  POST /meals x{args.meals:<5} {single_ms:8.1f} ms")
+    print(f"  POST /meals/batch   {batch_ms:8.1f} ms  ({single_ms / batch_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meals", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""
+Meal planner speed and accuracy on synthetic catalogs.
+
+For each catalog size, builds the macro matrix once (as the food catalog does per
+snapshot), then times a week's plan and reports the worst per-day deviation from
+the calorie and macro targets, next to the random pick the planner replaced.
+
+Usage:
+    python benchmarks/bench_meal_planner.py [--sizes 1000 10000 100000] [--runs 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from services.meal_planner import MEAL_SLOTS, MacroTargets, MealPlanner
+
+
+def synthetic_catalog(size: int, rng: np.random.Generator) -> np.ndarray:
+    protein = rng.uniform(0, 60, size)
+    fats = rng.uniform(0, 40, size)
+    carbs = rng.uniform(0, 100, size)
+    calories = protein * 4 + carbs * 4 + fats * 9
+    return np.column_stack([calories, protein, carbs, fats])
+
+
+def worst_error(day_totals: np.ndarray, targets: MacroTargets) -> np.ndarray:
+    return np.abs(day_totals / targets.as_array() - 1).max(axis=0) * 100
+
+
+def run(args):
+    rng = np.random.default_rng(0)
+    targets = MacroTargets.for_goal(2200, "lose")
+    print(f"targets: {targets}")
+    print(f"{'foods':>8} {'build ms':>9} {'p50 ms':>8} {'p95 ms':>8}   worst day error % (kcal/P/C/F)   random pick")
+    for size in args.sizes:
+        macros = synthetic_catalog(size, rng)
+        started = time.perf_counter()
+        planner = MealPlanner(macros)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        planner.plan(targets)
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            week = planner.plan(targets)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        planned = worst_error(np.array([planner.day_totals(day) for day in week]), targets)
+
+        random_days = np.array([macros[rng.integers(size, size=len(MEAL_SLOTS))].sum(axis=0) for _ in range(7)])
+        baseline = worst_error(random_days, targets)
+        print(f"{size:>8} {build_ms:9.2f} {statistics.median(timings):8.2f} {timings[int(len(timings) * 0.95) - 1]:8.2f}"
+              f"   {'/'.join(f'{e:.1f}' for e in planned):<30}   {'/'.join(f'{e:.0f}' for e in baseline)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=50)
+    run(parser.parse_args())
@@ -0,0 +1,66 @@
+"""
+/plans/variations planning: the ten presets one after another vs. on the plan pool.
+
+Builds a synthetic catalog per size, then times planning all presets (3 days each)
+inline on the calling thread and on a warmed-up PlanPool reading the shared macro
+matrix. Reports p50 per batch next to the slowest single preset.
+
+Usage:
+    python benchmarks/bench_plan_pool.py [--sizes 10000 100000] [--workers 4] [--runs 30]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from services.meal_planner import MacroTargets, MealPlanner
+from services.plan_pool import PlanPool
+
+# Same splits and factors as services.ai_service.PLAN_PRESETS, without importing the app
+SPLITS = [((0.30, 0.45, 0.25), 1.10), ((0.30, 0.40, 0.30), 0.85), ((0.20, 0.05, 0.75), 1.0), ((0.30, 0.30, 0.40), 1.0),
+          ((0.15, 0.60, 0.25), 1.0), ((0.20, 0.50, 0.30), 1.0), ((0.20, 0.50, 0.30), 1.0), ((0.30, 0.20, 0.50), 1.0),
+          ((0.15, 0.60, 0.25), 1.10), ((0.20, 0.50, 0.30), 1.0)]
+
+
+def p50_ms(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(args):
+    pool = PlanPool(max_workers=args.workers, budget_seconds=1.0, inline_max_foods=0)
+    inline = PlanPool(max_workers=0, budget_seconds=1.0)
+    pool.warm_up()
+    rng = np.random.default_rng(0)
+    print(f"{args.workers} workers, {len(SPLITS)} presets x 3 days")
+    print(f"{'foods':>8} {'inline ms':>10} {'pool ms':>9} {'slowest preset ms':>18}")
+    try:
+        for size in args.sizes:
+            protein, carbs, fats = rng.uniform(0, 60, size), rng.uniform(0, 100, size), rng.uniform(0, 40, size)
+            planner = MealPlanner(np.column_stack([protein * 4 + carbs * 4 + fats * 9, protein, carbs, fats]))
+            jobs = [(MacroTargets.for_goal(2200 * factor, None, split), 3, seed) for seed, (split, factor) in enumerate(SPLITS)]
+
+            pool.plan_many(planner, jobs)  # publish this catalog's matrix and attach the workers
+            inline_ms = p50_ms(lambda: inline.plan_many(planner, jobs), args.runs)
+            pool_ms = p50_ms(lambda: pool.plan_many(planner, jobs), args.runs)
+            slowest = max(p50_ms(lambda: inline.plan_many(planner, [job]), args.runs) for job in jobs)
+            print(f"{size:>8} {inline_ms:10.2f} {pool_ms:9.2f} {slowest:18.2f}")
+        print(pool.metrics())
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=30)
+    run(parser.parse_args())
@@ -0,0 +1,74 @@
+"""
+Recognition throughput against batch size.
+
+Uses the model-shaped ProjectionRecognizer on 224x224 inputs. First times the
+model directly at each batch size, then pushes --requests concurrent uploads
+through the InferenceBatcher configured with that max batch size and reports
+images/sec and mean latency per request.
+
+Usage:
+    python benchmarks/bench_recognition_batching.py [--sizes 1 2 4 8 16 32] [--requests 512] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from services.food_catalog import FoodRecord
+from services.inference_batcher import InferenceBatcher
+from services.recognition import MODEL_INPUT_SIZE, ProjectionRecognizer
+
+
+def direct_rate(recognizer, images, foods, batch_size: int, total: int) -> float:
+    batch = images[:batch_size]
+    recognizer.recognize_batch(batch, foods)
+    rounds = max(1, total // batch_size)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        recognizer.recognize_batch(batch, foods)
+    return rounds * batch_size / (time.perf_counter() - started)
+
+
+async def batched_rate(recognizer, images, foods, batch_size: int, args):
+    batcher = InferenceBatcher(lambda items: recognizer.recognize_batch(np.stack(items), foods),
+                               max_batch_size=batch_size, max_wait_ms=args.wait_ms, max_queue=args.requests)
+    limit = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i):
+        async with limit:
+            started = time.perf_counter()
+            await batcher.submit(images[i % len(images)])
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    return args.requests / elapsed, sum(latencies) / len(latencies) * 1000, batcher.metrics()["avg_batch_size"]
+
+
+def run(args):
+    rng = np.random.default_rng(0)
+    images = rng.integers(0, 256, (max(args.sizes), MODEL_INPUT_SIZE, MODEL_INPUT_SIZE, 3), dtype=np.uint8)
+    foods = tuple(FoodRecord(i, f"Food {i}", 100.0, 5.0, 10.0, 2.0, None, False) for i in range(args.foods))
+    recognizer = ProjectionRecognizer()
+    print(f"{args.requests} requests, {args.concurrency} concurrent, max wait {args.wait_ms} ms, {args.foods} foods")
+    print(f"{'batch':>6} {'model img/s':>12} {'batcher img/s':>14} {'mean latency ms':>16} {'avg batch':>10}")
+    for size in args.sizes:
+        direct = direct_rate(recognizer, images, foods, size, args.requests)
+        rate, latency, average = asyncio.run(batched_rate(recognizer, images, foods, size, args))
+        print(f"{size:>6} {direct:12.0f} {rate:14.0f} {latency:16.1f} {average:10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--foods", type=int, default=2000)
+    run(parser.parse_args())
@@ -0,0 +1,92 @@
+"""
+Serialization and transfer size of the largest JSON endpoints.
+
+Seeds a temporary database with --foods catalog rows and --meals logged meals
+(each with a food_snapshot), then times each endpoint in-process and reports
+the body size for identity, gzip and brotli Accept-Encoding.
+
+Usage:
+    python benchmarks/bench_serialization.py [--foods 2000] [--meals 1000] [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"
+
+import httpx
+from sqlalchemy import text
+from database import engine, create_db_and_tables
+from services.auth_service import AuthenticationService
+from main import app
+
+engine.echo = False
+
+ENDPOINTS = [
+    ("POST", "/plans/variations"),
+    ("POST", "/plans/generate"),
+    ("GET", "/sync?limit=2000"),
+    ("GET", "/meals/history?limit=200"),
+    ("GET", "/foods?limit=100"),
+]
+ENCODINGS = ("identity", "gzip", "br")
+
+
+def seed(foods: int, meals: int) -> dict:
+    create_db_and_tables()
+    auth_service = AuthenticationService()
+    user_id = auth_service.register_user({"email": "bench@example.com"}, "benchpass")
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom, details) "
+                 "VALUES (:name, :cal, 10, 20, 5, 0, :details)"),
+            [{"name": f"Food item {i}", "cal": 100 + i % 400, "details": '{"serving": "100 g", "source": "bench"}'}
+             for i in range(foods)],
+        )
+        start = datetime(2024, 1, 1)
+        connection.execute(
+            text("INSERT INTO meallog (user_id, food_item_id, date, meal_type, food_snapshot, calories, protein, carbs, fats) "
+                 "VALUES (:user_id, :food_id, :date, 'lunch', :snapshot, 300, 20, 30, 10)"),
+            [{"user_id": user_id, "food_id": 1 + i % foods, "date": (start + timedelta(hours=i)).isoformat(sep=" "),
+              "snapshot": f'{{"name": "Food item {i % foods}", "calories": 300, "protein": 20, "carbs": 30, "fats": 10}}'}
+             for i in range(meals)],
+        )
+    return {"Authorization": f"Bearer {auth_service.create_access_token({'sub': 'bench@example.com'})}"}
+
+
+async def run(args):
+    headers = seed(args.foods, args.meals)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<28} {'p50 ms':>8} {'identity':>10} {'gzip':>9} {'br':>9}")
+        for method, path in ENDPOINTS:
+            sizes = {}
+            for encoding in ENCODINGS:
+                response = await client.request(method, path, headers={**headers, "Accept-Encoding": encoding})
+                response.raise_for_status()
+                # httpx decodes transparently; Content-Length is the size on the wire
+                sizes[encoding] = int(response.headers.get("content-length", len(response.content)))
+
+            timings = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                response = await client.request(method, path, headers={**headers, "Accept-Encoding": "identity"})
+                timings.append(time.perf_counter() - started)
+            p50 = statistics.median(timings) * 1000
+            print(f"{method + ' ' + path:<28} {p50:8.2f} {sizes['identity']:>10} {sizes['gzip']:>9} {sizes['br']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--foods", type=int, default=2000)
+    parser.add_argument("--meals", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Mixed read/write throughput of POST /meals + GET /analytics/summary under each
+storage profile (database.STORAGE_PROFILES).
+
+Each profile runs in its own subprocess against a fresh SQLite file, with
+--writers clients looping on POST /meals and --readers clients looping on
+GET /analytics/summary for --duration seconds.
+
+Usage:
+    python benchmarks/bench_storage_profiles.py [--duration 5] [--writers 4] [--readers 8]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def run_profile(args):
+    sys.path.append(BACKEND_DIR)
+    import httpx
+    from database import create_db_and_tables
+    from main import app
+
+    create_db_and_tables()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers_by_user = []
+        for i in range(args.writers + args.readers):
+            email = f"user{i}@example.com"
+            await client.post("/users/", json={"email": email, "password": "benchpass"})
+            token = (await client.post("/token", data={"username": email, "password": "benchpass"})).json()["access_token"]
+            headers_by_user.append({"Authorization": f"Bearer {token}"})
+
+        counts = {"writes": 0, "reads": 0}
+        deadline = time.perf_counter() + args.duration
+
+        async def writer(headers):
+            meal = {"date": datetime.utcnow().isoformat(), "meal_type": "lunch",
+                    "food_item": {"name": "Bench Meal", "calories": 500, "protein": 30, "carbs": 50, "fats": 20}}
+            while time.perf_counter() < deadline:
+                (await client.post("/meals", json=meal, headers=headers)).raise_for_status()
+                counts["writes"] += 1
+
+        async def reader(headers):
+            while time.perf_counter() < deadline:
+                (await client.get("/analytics/summary", headers=headers)).raise_for_status()
+                counts["reads"] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(writer(h) for h in headers_by_user[:args.writers]),
+            *(reader(h) for h in headers_by_user[args.writers:]),
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"{os.environ['DB_PROFILE']:<12} {counts['writes'] / elapsed:>10.1f} {counts['reads'] / elapsed:>10.1f} "
+          f"{(counts['writes'] + counts['reads']) / elapsed:>10.1f}")
+
+
+def main(args):
+    from database import STORAGE_PROFILES
+
+    print(f"{'profile':<12} {'writes/s':>10} {'reads/s':>10} {'total/s':>10}")
+    for profile in STORAGE_PROFILES:
+        db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        env = dict(os.environ, DB_PROFILE=profile, DATABASE_URL=f"sqlite:///{db_path}", SQL_ECHO="false")
+        subprocess.run(
+            [sys.executable, __file__, "--run-profile",
+             "--duration", str(args.duration), "--writers", str(args.writers), "--readers", str(args.readers)],
+            env=env, cwd=BACKEND_DIR, check=True, stderr=subprocess.DEVNULL,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--run-profile", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_profile:
+        asyncio.run(run_profile(args))
+    else:
+        sys.path.append(BACKEND_DIR)
+        main(args)
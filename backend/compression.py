@@ -0,0 +1,126 @@
+from typing import List, Optional, Tuple
+import gzip
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Already-compressed or streamed media is passed through untouched
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "text/event-stream")
+
+def negotiate_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (q-values honoured, br preferred on ties)."""
+    offered: List[Tuple[float, int, str]] = []
+    wildcard_q = None
+    explicit = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding == "*":
+            wildcard_q = q
+            continue
+        explicit.add(coding)
+        if coding == "br" and brotli_available and q > 0:
+            offered.append((q, 1, "br"))
+        elif coding in ("gzip", "x-gzip") and q > 0:
+            offered.append((q, 0, "gzip"))
+    if wildcard_q and wildcard_q > 0:
+        if brotli_available and "br" not in explicit:
+            offered.append((wildcard_q, 1, "br"))
+        if "gzip" not in explicit:
+            offered.append((wildcard_q, 0, "gzip"))
+    return max(offered)[2] if offered else None
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip for complete responses of at least `minimum_size` bytes.
+    Streaming responses (more than one body message), 304s, excluded media types and
+    responses that already carry a Content-Encoding go out unchanged. Strong ETags on
+    compressed bodies are downgraded to weak ones, since the bytes differ per encoding;
+    If-None-Match comparison is weak, so revalidation keeps working.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 thread_minimum_size: int = 256 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_minimum_size = thread_minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the body shows whether compression applies
+                    start = message
+                return
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                # e.g. pathsend: nothing to compress, release the held start first
+                await send(start)
+                await send(message)
+                passthrough = True
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                passthrough = True
+                return
+
+            if len(body) >= self.thread_minimum_size:
+                # Big payloads (full syncs) would hold up the event loop for milliseconds
+                compressed = await anyio.to_thread.run_sync(self._compress, body, encoding)
+            else:
+                compressed = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import Optional
+from loguru import logger
+from sqlalchemy import text
+from database import engine
+from settings import Settings
+from services.password_hasher import PasswordHashPool
+from services.principal_cache import PrincipalCache
+from services.food_catalog import FoodCatalog
+from services.version_registry import VersionRegistry
+from services.plan_cache import PlanCache
+from interfaces.services import IFoodRecognizer
+import threading
+import time
+
+@dataclass
+class ServiceContainer:
+    """
+    Application-scoped services, built once at startup and shared by every request.
+    Services hold no per-request state: repositories pick up the request's session
+    from the active unit of work.
+    """
+    settings: Settings
+    hash_pool: PasswordHashPool
+    principal_cache: PrincipalCache
+    food_catalog: FoodCatalog
+    versions: VersionRegistry
+    plan_pool: "PlanPool"
+    plan_cache: PlanCache
+    recognizer: IFoodRecognizer
+    recognition_cache: "RecognitionCache"
+    auth_service: "AuthenticationService"
+    user_service: "UserProfileService"
+    meal_service: "MealService"
+    ai_service: "AIEngine"
+    sync_service: "SyncService"
+
+    def warm_up(self):
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        # Build the catalog snapshot ahead of the first plan/recognition request
+        foods = self.food_catalog.records()
+        # Worker pools warm up in the background instead of holding back the first request
+        self.hash_pool.warm_up(wait=False)
+        if len(foods) >= self.plan_pool.inline_max_foods:
+            self.plan_pool.warm_up(wait=False)
+        logger.info(f"Service container ready in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def shutdown(self):
+        self.hash_pool.shutdown()
+        self.plan_pool.shutdown()
+        self.plan_cache.close()
+        self.recognition_cache.close()
+
+def build_container(settings: Optional[Settings] = None) -> ServiceContainer:
+    from services.auth_service import AuthenticationService
+    from services.user_service import UserProfileService
+    from services.meal_service import MealService
+    from services.ai_service import AIEngine
+    from services.sync_service import SyncService
+    # NumPy, Pillow and the planner load here rather than when the app module is imported
+    from services.plan_pool import PlanPool
+    from services.recognition import load_recognizer
+    from services.recognition_cache import RecognitionCache
+    from repositories.food_repository import FoodRepository
+
+    settings = settings or Settings.from_env()
+    hash_pool = PasswordHashPool(settings.hash_pool_workers, settings.hash_pool_max_pending)
+    principal_cache = PrincipalCache(settings.principal_cache_size, settings.principal_cache_ttl)
+    food_catalog = FoodCatalog(FoodRepository().catalog_rows, settings.food_catalog_max_age)
+    versions = VersionRegistry()
+    plan_pool = PlanPool(settings.plan_pool_workers, settings.plan_pool_budget, settings.plan_pool_inline_max_foods)
+    plan_cache = PlanCache(settings.plan_cache_size, settings.plan_cache_spill_path or None)
+    recognizer = load_recognizer(settings.recognizer)
+    recognition_cache = RecognitionCache(settings.recognition_cache_size, settings.recognition_cache_max_distance,
+                                         settings.recognition_cache_path or None, model=settings.recognizer)
+    return ServiceContainer(
+        settings=settings,
+        hash_pool=hash_pool,
+        principal_cache=principal_cache,
+        food_catalog=food_catalog,
+        versions=versions,
+        plan_pool=plan_pool,
+        plan_cache=plan_cache,
+        recognizer=recognizer,
+        recognition_cache=recognition_cache,
+        auth_service=AuthenticationService(settings, hash_pool),
+        user_service=UserProfileService(principal_cache, plan_cache),
+        meal_service=MealService(food_catalog),
+        ai_service=AIEngine(food_catalog, plan_pool, plan_cache, recognizer, recognition_cache, settings),
+        sync_service=SyncService(),
+    )
+
+_container: Optional[ServiceContainer] = None
+_container_lock = threading.Lock()
+
+def get_container() -> ServiceContainer:
+    # Built lazily for code paths that never ran the app lifespan (scripts, TestClient without `with`)
+    global _container
+    with _container_lock:
+        if _container is None:
+            _container = build_container()
+        return _container
+
+def set_container(container: Optional[ServiceContainer]):
+    """Install a container (lifespan) or swap one in for tests; None resets to lazy construction."""
+    global _container
+    with _container_lock:
+        _container = container
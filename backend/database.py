@@ -1,14 +1,148 @@
 from sqlmodel import SQLModel, create_engine, Session
-import os
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from settings import Settings
 
-# Create engine
-sqlite_url = os.getenv("DATABASE_URL", "sqlite:///database.db")
+# Storage profiles: PRAGMAs applied to every new SQLite connection, and whether the
+# connection pool is sized (DB_POOL_SIZE / DB_POOL_MAX_OVERFLOW).
+# "compat" keeps SQLite's own defaults (rollback journal, FULL sync).
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "compat": {
+        "pragmas": {},
+        "sized_pool": False,
+    },
+    "production": {
+        "pragmas": {
+            # Readers no longer block on the writer, and commits append to the WAL
+            "journal_mode": "WAL",
+            # Durable across application crashes; only an OS crash can lose the last commits
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            # Negative values are KiB: 64 MiB page cache per connection
+            "cache_size": -64000,
+            "busy_timeout": 5000,
+            "temp_store": "MEMORY",
+        },
+        "sized_pool": True,
+    },
+}
+
+def _is_file_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and url not in ("sqlite://", "sqlite:///:memory:")
+
+def create_app_engine(url: str, profile: str = "production", echo: bool = False,
+                      pool_size: int = Settings.db_pool_size, max_overflow: int = Settings.db_pool_max_overflow) -> Engine:
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}', expected one of {sorted(STORAGE_PROFILES)}")
+    settings = STORAGE_PROFILES[profile]
+
+    # Request handlers run on a worker threadpool, so one session's connection may be
+    # used from different threads over the course of a request
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    # In-memory databases use a single shared connection; pool sizing only applies to files
+    pool_args = {}
+    if settings["sized_pool"] and _is_file_sqlite(url):
+        pool_args = {"pool_size": pool_size, "max_overflow": max_overflow}
+    new_engine = create_engine(url, echo=echo, connect_args=connect_args, **pool_args)
+
+    pragmas = settings["pragmas"]
+    if pragmas and url.startswith("sqlite"):
+        @event.listens_for(new_engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
 
-engine = create_engine(sqlite_url, echo=True)
+    return new_engine
+
+def engine_from_settings(settings: Settings) -> Engine:
+    return create_app_engine(settings.database_url, settings.db_profile, settings.sql_echo,
+                             settings.db_pool_size, settings.db_pool_max_overflow)
+
+# Create engine
+_settings = Settings.from_env()
+sqlite_url = _settings.database_url
+engine = engine_from_settings(_settings)
 
 def create_db_and_tables():
+    from migrations import run_migrations
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 def get_session():
-    with Session(engine) as session:
+    # Objects handed back by repositories outlive the session, so keep them loaded after commit
+    with Session(engine, expire_on_commit=False) as session:
         yield session
+
+
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar("current_unit_of_work", default=None)
+
+class UnitOfWork:
+    """
+    Shares a single Session between every repository call made while it is active
+    and commits all of their writes as one transaction when the block exits.
+    Repositories pick it up automatically, so they can keep their simple API.
+    """
+    def __init__(self, session: Optional[Session] = None):
+        self._owns_session = session is None
+        self.session = session if session is not None else Session(engine, expire_on_commit=False)
+        self._previous: Optional["UnitOfWork"] = None
+        self._after_commit: List[Callable[[], None]] = []
+
+    def __enter__(self) -> "UnitOfWork":
+        self._previous = _current_unit_of_work.get()
+        _current_unit_of_work.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            self.deactivate()
+
+    @contextmanager
+    def activated(self) -> Iterator["UnitOfWork"]:
+        # Bind without committing, for callers that commit off the current thread
+        self._previous = _current_unit_of_work.get()
+        _current_unit_of_work.set(self)
+        try:
+            yield self
+        finally:
+            self.deactivate()
+
+    def deactivate(self):
+        _current_unit_of_work.set(self._previous)
+        if self._owns_session:
+            self.session.close()
+
+    def commit(self):
+        self.session.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        self.session.rollback()
+        self._after_commit = []
+
+    def after_commit(self, callback: Callable[[], None]):
+        # For in-process caches that must only change once the write is durable
+        self._after_commit.append(callback)
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _current_unit_of_work.get()
+
+def run_after_commit(callback: Callable[[], None]):
+    uow = current_unit_of_work()
+    if uow is None:
+        # Standalone repository calls commit as they go
+        callback()
+    else:
+        uow.after_commit(callback)
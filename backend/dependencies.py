@@ -1,24 +1,52 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from services.auth_service import AuthenticationService
 from services.user_service import UserProfileService
 from services.meal_service import MealService
-from services.ai_service import AIEngine
+from interfaces.services import IAIEngine
+from services.sync_service import SyncService
+from container import get_container
+from database import get_session, UnitOfWork
+from sqlmodel import Session
 from jose import jwt, JWTError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_auth_service():
-    return AuthenticationService()
+async def get_unit_of_work(session: Session = Depends(get_session)):
+    # One session and one commit per request, shared by every repository the request touches.
+    # Declared async so the binding is visible to the threadpool-run handlers; the commit
+    # itself is pushed to the threadpool to keep SQLite I/O off the event loop.
+    uow = UnitOfWork(session)
+    with uow.activated():
+        try:
+            yield uow
+        except Exception:
+            await run_in_threadpool(uow.rollback)
+            raise
+        if uow.session.in_transaction():
+            await run_in_threadpool(uow.commit)
+        else:
+            # Nothing touched the database (e.g. cached principal only): no I/O, no thread hop
+            uow.commit()
 
-def get_user_service():
-    return UserProfileService()
+# Services are application-scoped singletons; depending on the unit of work only makes
+# sure the request's session is bound before they are used. The getters are async so
+# resolving them does not cost a threadpool hop.
+async def get_auth_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> AuthenticationService:
+    return get_container().auth_service
 
-def get_meal_service():
-    return MealService()
+async def get_user_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> UserProfileService:
+    return get_container().user_service
 
-def get_ai_service():
-    return AIEngine()
+async def get_meal_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> MealService:
+    return get_container().meal_service
+
+async def get_ai_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> IAIEngine:
+    return get_container().ai_service
+
+async def get_sync_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> SyncService:
+    return get_container().sync_service
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -37,9 +65,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # user is now a User object
-    user = auth_service.user_repo.get_by_email(email)
+    principal_cache = get_container().principal_cache
+    user = principal_cache.get(email)
+    if user is not None:
+        return user
+    generation = principal_cache.generation()
+
+    # Only a cache miss touches the database, so only then leave the event loop
+    user = await run_in_threadpool(auth_service.user_repo.get_by_email, email)
     if user is None:
         raise credentials_exception
     
+    principal_cache.put(email, user, generation)
     return user
@@ -0,0 +1,27 @@
+from typing import Optional
+from fastapi import Request, Response
+
+# Clients may keep the body but must revalidate with If-None-Match before reusing it
+PUBLIC_REVALIDATE = "no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def conditional_response(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    304 response to return right away when the client already holds `etag`;
+    otherwise tags `response` and returns None so the handler builds the body.
+    Call it before building the body so a match costs no more than the ETag's marker lookup.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -21,7 +21,7 @@ class IUserRepository(ABC):
 
 class IFoodRepository(ABC):
     @abstractmethod
-    def search_foods(self, query: str) -> List[Dict[str, Any]]:
+    def search_foods(self, query: str, limit: int, cursor: Optional[str] = None) -> Any:
         pass
 
     @abstractmethod
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from datetime import timedelta
 
 class IAuthenticationService(ABC):
@@ -30,7 +30,7 @@ class IUserProfileService(ABC):
 
 class IMealService(ABC):
     @abstractmethod
-    def search_foods(self, query: str) -> List[Dict[str, Any]]:
+    def search_foods(self, query: str, limit: int, cursor: Optional[str] = None) -> Any:
         pass
 
     @abstractmethod
@@ -42,18 +42,45 @@ class IMealService(ABC):
         pass
 
     @abstractmethod
-    def get_meal_history(self, user_id: str) -> List[Dict[str, Any]]:
+    def log_meals(self, user_id: str, meals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def delete_meal(self, user_id: str, meal_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_meal_history(self, user_id: str, limit: int, cursor: Optional[str] = None) -> Any:
         pass
 
     @abstractmethod
     def get_daily_summary(self, user_id: str) -> Dict[str, Any]:
         pass
 
+class IFoodRecognizer(ABC):
+    @abstractmethod
+    def recognize(self, pixels: Any, foods: Sequence[Any]) -> Optional[Any]:
+        """Catalog food shown in `pixels` (model-input RGB array), or None when unsure."""
+        pass
+
+    def recognize_batch(self, pixels: Any, foods: Sequence[Any]) -> List[Optional[Any]]:
+        """One result per image of `pixels` (N, H, W, 3); models override this with one batched call."""
+        return [self.recognize(image, foods) for image in pixels]
+
 class IAIEngine(ABC):
     @abstractmethod
-    def recognize_image(self) -> Dict[str, Any]:
+    def recognize_image(self, pixels: Optional[Any] = None) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    async def recognize_batched(self, pixels: Any) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def generate_meal_plan(self, user_id: str, daily_calorie_goal: Optional[float] = None,
+                           goal: Optional[str] = None) -> Dict[str, Any]:
         pass
 
     @abstractmethod
-    def generate_meal_plan(self, user_id: str) -> Dict[str, Any]:
+    def generate_meal_plan_variations(self, user_id: str, daily_calorie_goal: Optional[float] = None) -> List[Dict[str, Any]]:
         pass
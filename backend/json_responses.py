@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from typing import Any
+import json
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        # Naive datetimes are emitted without an offset, matching FastAPI's encoder
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for handlers that return plain dicts/lists: return it directly from
+    the handler and the payload is encoded once (orjson when installed) instead of
+    being walked by jsonable_encoder first. Routes with a response_model do not need
+    it; FastAPI already serializes those straight to bytes through Pydantic.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,30 +1,93 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response, Query, File, UploadFile
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
+from contextlib import asynccontextmanager
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import sys
-from typing import List
+from datetime import date, timedelta
+from typing import List, Literal, Optional
 
 from services.auth_service import AuthenticationService
 from services.user_service import UserProfileService
 from services.meal_service import MealService
-from services.ai_service import AIEngine
-from models import UserCreate, Token, User, UserUpdate, FoodItem, MealLog, WeeklyPlan, MealLogCreate
+from services.sync_service import SyncService, DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT
+from services.password_hasher import HashPoolSaturated
+from services.inference_batcher import InferenceQueueFull
+from fastapi.concurrency import run_in_threadpool
+from container import build_container, get_container, set_container
+from json_responses import FastJSONResponse
+from compression import CompressionMiddleware
+from upload_limits import BodySizeLimitMiddleware, InvalidImage
+from interfaces.services import IAIEngine
+from settings import Settings
+from http_caching import conditional_response, PUBLIC_REVALIDATE, PRIVATE_REVALIDATE
+from repositories.food_repository import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from repositories.meal_repository import HISTORY_PAGE_SIZE, MAX_HISTORY_PAGE_SIZE
+from repositories.pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from models import UserCreate, Token, User, UserUpdate, FoodItem, MealLog, WeeklyPlan, MealLogCreate, MealLogBatchCreate, MealLogBatchResult
 
-# Configure Loguru
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}", level="INFO")
-logger.add("logs/app.log", rotation="1 day", retention="7 days", level="DEBUG")
+def configure_logging():
+    # Called when the server starts, not on import, so scripts and tests importing the
+    # app neither replace their log handlers nor create logs/
+    logger.remove()
+    logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}", level="INFO")
+    logger.add("logs/app.log", rotation="1 day", retention="7 days", level="DEBUG")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    on_startup()
+    # Build the application-scoped services once; worker pools finish warming in the background
+    container = build_container()
+    container.warm_up()
+    set_container(container)
+    logger.info("Application started")
+    yield
+    container.shutdown()
+    set_container(None)
 
 # Rate limiting
 limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(title="Smart Nutrition Tracker API")
+app = FastAPI(title="Smart Nutrition Tracker API", lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+@app.exception_handler(HashPoolSaturated)
+async def hash_pool_saturated_handler(request: Request, exc: HashPoolSaturated):
+    logger.warning(f"Password hashing pool saturated, rejecting {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": f"Invalid cursor: {exc}"})
+
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFull):
+    logger.warning("Recognition queue full, rejecting upload")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Recognition is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(InvalidImage)
+async def invalid_image_handler(request: Request, exc: InvalidImage):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": f"Invalid image: {exc}"})
+
+# Upload size caps, inside CORS so browsers can read the 413
+app.add_middleware(BodySizeLimitMiddleware, limits={
+    "/ai/recognize": Settings.from_env().upload_max_bytes,
+    "/admin/foods/import": Settings.from_env().import_max_bytes,
+})
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -32,23 +95,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# brotli (when installed) or gzip for JSON bodies above the threshold
+app.add_middleware(CompressionMiddleware, minimum_size=Settings.from_env().compression_minimum_size)
+
 # Dependency Injection
 from dependencies import (
     get_auth_service, 
     get_user_service, 
     get_meal_service, 
     get_ai_service, 
+    get_sync_service,
     get_current_user,
     oauth2_scheme
 )
 
-logger.info("Application started")
+# Handlers that hit the database or hash passwords are plain `def` on purpose:
+# FastAPI runs them on its threadpool instead of blocking the event loop.
 
 @app.post("/token", response_model=Token)
 # @limiter.limit("5/minute")
-async def login_for_access_token(
+def login_for_access_token(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     auth_service: AuthenticationService = Depends(get_auth_service)
@@ -70,7 +139,7 @@ async def login_for_access_token(
 
 @app.post("/users/", response_model=User, response_model_exclude={"hashed_password"})
 # @limiter.limit("3/minute")
-async def create_user(
+def create_user(
     request: Request,
     user: UserCreate,
     auth_service: AuthenticationService = Depends(get_auth_service)
@@ -89,18 +158,24 @@ async def create_user(
         
         logger.info(f"User registered successfully: {user.email}")
         return created_user
-    except HTTPException:
+    except (HTTPException, HashPoolSaturated):
         raise
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
 @app.get("/users/me/", response_model=User, response_model_exclude={"hashed_password"})
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    # The body is the cached principal itself, so its content is the tag (no query)
+    versions = get_container().versions
+    etag = versions.etag("me", current_user.id, versions.fingerprint(current_user.model_dump(exclude={"hashed_password"})))
+    not_modified = conditional_response(request, response, etag, PRIVATE_REVALIDATE)
+    if not_modified:
+        return not_modified
     return current_user
 
 @app.put("/users/profile", response_model=User, response_model_exclude={"hashed_password"})
-async def update_user_profile(
+def update_user_profile(
     profile: UserUpdate,
     current_user: User = Depends(get_current_user),
     user_service: UserProfileService = Depends(get_user_service)
@@ -116,57 +191,51 @@ app.include_router(admin.router)
 
 # --- Food & Meal Endpoints ---
 
-@app.on_event("startup")
+# Foods every new installation starts with
+SEED_FOODS = [
+    {"name": "Apple", "calories": 95, "protein": 0.5, "carbs": 25, "fats": 0.3, "details": {}},
+    {"name": "Banana", "calories": 105, "protein": 1.3, "carbs": 27, "fats": 0.3, "details": {}},
+    {"name": "Chicken Breast (100g)", "calories": 165, "protein": 31, "carbs": 0, "fats": 3.6, "details": {}},
+    {"name": "Rice (1 cup cooked)", "calories": 205, "protein": 4.3, "carbs": 44.5, "fats": 0.4, "details": {}},
+    {"name": "Egg (Large)", "calories": 78, "protein": 6, "carbs": 0.6, "fats": 5, "details": {}},
+]
+
 def on_startup():
-    from database import create_db_and_tables
-    create_db_and_tables()
-    
-    # Seed Data
+    from database import create_db_and_tables, UnitOfWork
     from repositories.food_repository import FoodRepository
+    # Duplicate global food names were removed once by migration 9; its unique index keeps them out
+    create_db_and_tables()
+
     food_repo = FoodRepository()
-    # Deduplicate existing foods
-    with food_repo.get_session() as session:
-        from sqlmodel import select, col
-        # Get all foods
-        all_foods = session.exec(select(FoodItem)).all()
-        seen_names = set()
-        for food in all_foods:
-            if food.name in seen_names:
-                session.delete(food)
-                logger.info(f"Removed duplicate food: {food.name}")
-            else:
-                seen_names.add(food.name)
-        session.commit()
-
-    # Seed Data safely
-    if not food_repo.find_all():
-         seed_data = [
-            {"name": "Apple", "calories": 95, "protein": 0.5, "carbs": 25, "fats": 0.3, "is_custom": False},
-            {"name": "Banana", "calories": 105, "protein": 1.3, "carbs": 27, "fats": 0.3, "is_custom": False},
-            {"name": "Chicken Breast (100g)", "calories": 165, "protein": 31, "carbs": 0, "fats": 3.6, "is_custom": False},
-            {"name": "Rice (1 cup cooked)", "calories": 205, "protein": 4.3, "carbs": 44.5, "fats": 0.4, "is_custom": False},
-            {"name": "Egg (Large)", "calories": 78, "protein": 6, "carbs": 0.6, "fats": 5, "is_custom": False},
-        ]
-         with food_repo.get_session() as session:
-             for item in seed_data:
-                 # Check existence again just in case
-                 exists = session.exec(select(FoodItem).where(FoodItem.name == item["name"])).first()
-                 if not exists:
-                     food_repo.insert_one(FoodItem(**item))
-         logger.info("Seeded Food Database")
-         
+    with UnitOfWork():
+        # Workers booting together on an empty database may both seed: OR IGNORE keeps one of each
+        if not food_repo.has_foods():
+            added = food_repo.seed_global_foods(SEED_FOODS)
+            logger.info(f"Seeded {added} foods")
+
     logger.info("Database initialized (SQLite)")
 
 @app.get("/foods", response_model=List[FoodItem])
-async def get_foods(
+def get_foods(
+    request: Request,
+    response: Response,
     search: str = "",
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: Optional[str] = None,
     meal_service: MealService = Depends(get_meal_service)
 ):
-    foods = meal_service.search_foods(search)
-    return foods
+    # Every food write, from any process, moves the catalog marker, so it fully determines this listing
+    versions = get_container().versions
+    not_modified = conditional_response(request, response, versions.etag("foods", versions.catalog()), PUBLIC_REVALIDATE)
+    if not_modified:
+        return not_modified
+    page = meal_service.search_foods(search, limit, cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 @app.post("/foods", response_model=FoodItem)
-async def create_custom_food(
+def create_custom_food(
     food: FoodItem,
     current_user: User = Depends(get_current_user),
     meal_service: MealService = Depends(get_meal_service)
@@ -174,48 +243,93 @@ async def create_custom_food(
     return meal_service.add_custom_food(food.dict())
 
 @app.post("/meals", response_model=MealLog)
-async def log_meal(
+def log_meal(
     meal: MealLogCreate,
     current_user: User = Depends(get_current_user),
     meal_service: MealService = Depends(get_meal_service)
 ):
     return meal_service.log_meal(current_user.id, meal.dict())
 
+@app.post("/meals/batch", response_model=MealLogBatchResult)
+def log_meals_batch(
+    batch: MealLogBatchCreate,
+    current_user: User = Depends(get_current_user),
+    meal_service: MealService = Depends(get_meal_service)
+):
+    # One request, one transaction: entries that cannot be logged are reported, not fatal
+    results = meal_service.log_meals(current_user.id, [meal.dict() for meal in batch.meals])
+    created = sum(1 for result in results if result["ok"])
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+@app.delete("/meals/{meal_id}")
+def delete_meal(
+    meal_id: int,
+    current_user: User = Depends(get_current_user),
+    meal_service: MealService = Depends(get_meal_service)
+):
+    if not meal_service.delete_meal(current_user.id, meal_id):
+        raise HTTPException(status_code=404, detail="Meal not found")
+    return {"ok": True}
+
 @app.get("/meals/history", response_model=List[MealLog])
-async def get_meal_history(
+def get_meal_history(
+    response: Response,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_HISTORY_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     meal_service: MealService = Depends(get_meal_service)
 ):
-    return meal_service.get_meal_history(current_user.id)
+    page = meal_service.get_meal_history(current_user.id, limit, cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 # --- AI & Planning Endpoints ---
 
 @app.post("/ai/recognize", response_model=FoodItem)
 async def recognize_food_image(
+    image: Optional[UploadFile] = File(None),
     current_user: User = Depends(get_current_user),
-    ai_service: AIEngine = Depends(get_ai_service)
+    ai_service: IAIEngine = Depends(get_ai_service)
 ):
-    return ai_service.recognize_image()
+    # The multipart upload was streamed into a spooled temp file (on disk past 1 MB) before
+    # the handler runs. Decoding goes to the threadpool, never the event loop; the model
+    # call is shared with concurrent uploads through the micro-batcher.
+    if image is None:
+        return await run_in_threadpool(ai_service.recognize_image)
+    from services.recognition import load_model_input
+    pixels = await run_in_threadpool(load_model_input, image.file)
+    return await ai_service.recognize_batched(pixels)
 
 @app.post("/plans/generate", response_model=WeeklyPlan)
-async def generate_meal_plan(
+def generate_meal_plan(
     current_user: User = Depends(get_current_user),
-    ai_service: AIEngine = Depends(get_ai_service)
+    ai_service: IAIEngine = Depends(get_ai_service)
 ):
-    return ai_service.generate_meal_plan(current_user.id)
+    return ai_service.generate_meal_plan(current_user.id, current_user.daily_calorie_goal, current_user.goal)
 
-@app.post("/plans/variations")
-async def generate_meal_plan_variations(
+@app.post("/plans/variations", response_class=FastJSONResponse)
+def generate_meal_plan_variations(
     current_user: User = Depends(get_current_user),
-    ai_service: AIEngine = Depends(get_ai_service)
+    ai_service: IAIEngine = Depends(get_ai_service)
 ):
-    return ai_service.generate_meal_plan_variations(current_user.id)
+    return FastJSONResponse(ai_service.generate_meal_plan_variations(current_user.id, current_user.daily_calorie_goal))
 
 @app.get("/analytics/summary")
-async def get_analytics_summary(
+def get_analytics_summary(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     meal_service: MealService = Depends(get_meal_service)
 ):
+    # Rollups only change with the user's meals, so their marker covers the totals; the goal
+    # comes from the principal and the date covers the rollover to a new "today"
+    versions = get_container().versions
+    etag = versions.etag("summary", current_user.id, versions.meals(current_user.id),
+                         current_user.daily_calorie_goal, date.today().isoformat())
+    not_modified = conditional_response(request, response, etag, PRIVATE_REVALIDATE)
+    if not_modified:
+        return not_modified
     summary = meal_service.get_daily_summary(current_user.id)
     # Summary structure is {"today": {...}}
     # We need to add goal to "today" or top level?
@@ -228,6 +342,36 @@ async def get_analytics_summary(
     summary["goal"] = current_user.daily_calorie_goal or 2000
     return summary
 
+MAX_RANGE_DAYS = 731
+
+@app.get("/analytics/range", response_class=FastJSONResponse)
+def get_analytics_range(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    granularity: Literal["day", "week", "month"] = "day",
+    current_user: User = Depends(get_current_user),
+    meal_service: MealService = Depends(get_meal_service)
+):
+    end = end or date.today()
+    start = start or end - timedelta(days=6)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_RANGE_DAYS} days")
+    return FastJSONResponse(meal_service.get_range_summary(current_user.id, start, end, granularity))
+
+# --- Sync ---
+
+@app.get("/sync", response_class=FastJSONResponse)
+def sync_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_SYNC_LIMIT, ge=1, le=MAX_SYNC_LIMIT),
+    current_user: User = Depends(get_current_user),
+    sync_service: SyncService = Depends(get_sync_service)
+):
+    # since=0 is a full snapshot; afterwards clients pass the previous response's `next`
+    return FastJSONResponse(sync_service.changes_since(current_user.id, since, limit))
+
 @app.get("/")
 async def root():
     return {"message": "Smart Nutrition Tracker API is running (SQLite Version)"}
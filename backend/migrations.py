@@ -0,0 +1,216 @@
+"""
+Versioned schema migrations for the SQLite database.
+
+`create_all` only creates missing tables, so every change to an existing table
+(new columns, indexes, backfills) is a numbered step here. Applied versions are
+recorded in `schema_version`; each step runs in its own transaction together
+with its version row and is written to be idempotent, so it is safe on
+databases that `create_all` already built in the new shape.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Set
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, description: str):
+    def register(fn: Callable[[Connection], None]):
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append(Migration(version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+def _columns(connection: Connection, table: str) -> Set[str]:
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+def _ensure_version_table(connection: Connection):
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at TEXT NOT NULL)"
+    )
+
+def applied_versions(connection: Connection) -> Set[int]:
+    _ensure_version_table(connection)
+    return {row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_version")}
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    with engine.begin() as connection:
+        applied = applied_versions(connection)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+def run_migrations(engine: Engine, dry_run: bool = False, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations in order (up to `target`) and return them. With dry_run nothing is written."""
+    pending = [m for m in pending_migrations(engine) if target is None or m.version <= target]
+    for step in pending:
+        if dry_run:
+            logger.info(f"[dry-run] would apply migration {step.version}: {step.description}")
+            continue
+        with engine.begin() as connection:
+            step.apply(connection)
+            connection.execute(
+                text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": step.version, "d": step.description, "t": datetime.utcnow().isoformat()},
+            )
+        logger.info(f"Applied migration {step.version}: {step.description}")
+    return pending
+
+# --- Migrations ---
+
+@migration(1, "Add user.is_admin")
+def _add_user_is_admin(connection: Connection):
+    if "is_admin" not in _columns(connection, "user"):
+        connection.exec_driver_sql("ALTER TABLE user ADD COLUMN is_admin BOOLEAN NOT NULL DEFAULT 0")
+
+@migration(2, "Index meallog (user_id, date) for history and daily summaries")
+def _index_meallog_user_date(connection: Connection):
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_meallog_user_id_date ON meallog (user_id, date)")
+
+@migration(3, "Index fooditem (is_custom, name) for catalog listings")
+def _index_fooditem_is_custom_name(connection: Connection):
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_fooditem_is_custom_name ON fooditem (is_custom, name)")
+
+@migration(4, "Typed macro columns on meallog, backfilled from food_snapshot")
+def _meallog_macro_columns(connection: Connection):
+    existing = _columns(connection, "meallog")
+    for column in ("calories", "protein", "carbs", "fats"):
+        if column not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE meallog ADD COLUMN {column} FLOAT NOT NULL DEFAULT 0")
+    connection.exec_driver_sql(
+        "UPDATE meallog SET "
+        "calories = COALESCE(CAST(json_extract(food_snapshot, '$.calories') AS REAL), 0), "
+        "protein = COALESCE(CAST(json_extract(food_snapshot, '$.protein') AS REAL), 0), "
+        "carbs = COALESCE(CAST(json_extract(food_snapshot, '$.carbs') AS REAL), 0), "
+        "fats = COALESCE(CAST(json_extract(food_snapshot, '$.fats') AS REAL), 0) "
+        "WHERE food_snapshot IS NOT NULL AND json_valid(food_snapshot)"
+    )
+
+@migration(5, "Backfill dailynutritionrollup from meal history")
+def _backfill_daily_rollups(connection: Connection):
+    # The table itself comes from create_all; fill it for meals logged before it existed
+    connection.exec_driver_sql("DELETE FROM dailynutritionrollup")
+    connection.exec_driver_sql(
+        "INSERT INTO dailynutritionrollup (user_id, day, calories, protein, carbs, fats, meal_count) "
+        "SELECT user_id, date(date), SUM(calories), SUM(protein), SUM(carbs), SUM(fats), COUNT(*) "
+        "FROM meallog GROUP BY user_id, date(date)"
+    )
+
+@migration(6, "FTS5 index over fooditem names with sync triggers")
+def _fooditem_fts(connection: Connection):
+    connection.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS fooditem_fts USING fts5("
+        "name, content='fooditem', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS fooditem_fts_insert AFTER INSERT ON fooditem BEGIN "
+        "INSERT INTO fooditem_fts (rowid, name) VALUES (new.id, new.name); END"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS fooditem_fts_delete AFTER DELETE ON fooditem BEGIN "
+        "INSERT INTO fooditem_fts (fooditem_fts, rowid, name) VALUES ('delete', old.id, old.name); END"
+    )
+    connection.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS fooditem_fts_update AFTER UPDATE OF name ON fooditem BEGIN "
+        "INSERT INTO fooditem_fts (fooditem_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+        "INSERT INTO fooditem_fts (rowid, name) VALUES (new.id, new.name); END"
+    )
+    connection.exec_driver_sql("INSERT INTO fooditem_fts (fooditem_fts) VALUES ('rebuild')")
+
+@migration(7, "Index fooditem (name) for keyset-paginated catalog browsing")
+def _index_fooditem_name(connection: Connection):
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_fooditem_name ON fooditem (name)")
+
+# Tables whose rows carry a change_seq for /sync; the column lives only in SQL and is
+# maintained by triggers, so every write path (ORM, executemany, raw SQL) is covered
+SYNC_TABLES = ("meallog", "fooditem", "user")
+
+@migration(8, "Change sequence, sync triggers and tombstones for delta sync")
+def _sync_change_sequence(connection: Connection):
+    # synctombstone itself comes from create_all
+    connection.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS sync_sequence (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL)"
+    )
+    connection.exec_driver_sql("INSERT OR IGNORE INTO sync_sequence (id, value) VALUES (1, 0)")
+
+    for table in SYNC_TABLES:
+        if "change_seq" not in _columns(connection, table):
+            connection.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0')
+        # Existing rows get distinct sequence numbers so clients can page through them
+        connection.exec_driver_sql(
+            f'UPDATE "{table}" SET change_seq = id + (SELECT value FROM sync_sequence) WHERE change_seq = 0'
+        )
+        connection.exec_driver_sql(
+            f'UPDATE sync_sequence SET value = max(value, (SELECT coalesce(max(change_seq), 0) FROM "{table}"))'
+        )
+        stamp = (
+            "UPDATE sync_sequence SET value = value + 1; "
+            f'UPDATE "{table}" SET change_seq = (SELECT value FROM sync_sequence) WHERE id = new.id; '
+        )
+        connection.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {table}_sync_insert AFTER INSERT ON "{table}" BEGIN {stamp}END'
+        )
+        # The guard skips the trigger's own stamping update
+        connection.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {table}_sync_update AFTER UPDATE ON "{table}" '
+            f"WHEN new.change_seq = old.change_seq BEGIN {stamp}END"
+        )
+
+    for table, entity, owner in (("meallog", "meal", "old.user_id"), ("fooditem", "food", "NULL")):
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_sync_delete AFTER DELETE ON {table} BEGIN "
+            "UPDATE sync_sequence SET value = value + 1; "
+            "INSERT INTO synctombstone (seq, entity, entity_id, user_id) "
+            f"VALUES ((SELECT value FROM sync_sequence), '{entity}', old.id, {owner}); END"
+        )
+
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_meallog_user_id_change_seq ON meallog (user_id, change_seq)")
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_fooditem_change_seq ON fooditem (change_seq)")
+
+@migration(9, "Deduplicate global food names and make them unique")
+def _unique_global_food_names(connection: Connection):
+    # Keep the oldest global food per name: point meals at it, then drop the others.
+    # Custom foods keep their names; the same name with other macros is a different food.
+    duplicates = (
+        "SELECT d.id AS duplicate_id, "
+        "(SELECT min(k.id) FROM fooditem k WHERE k.is_custom = 0 AND k.name = d.name) AS keep_id "
+        "FROM fooditem d WHERE d.is_custom = 0"
+    )
+    connection.exec_driver_sql(f"CREATE TEMP TABLE fooditem_duplicates AS SELECT * FROM ({duplicates}) WHERE duplicate_id != keep_id")
+    connection.exec_driver_sql(
+        "UPDATE meallog SET food_item_id = "
+        "(SELECT keep_id FROM fooditem_duplicates WHERE duplicate_id = meallog.food_item_id) "
+        "WHERE food_item_id IN (SELECT duplicate_id FROM fooditem_duplicates)"
+    )
+    removed = connection.exec_driver_sql(
+        "DELETE FROM fooditem WHERE id IN (SELECT duplicate_id FROM fooditem_duplicates)"
+    ).rowcount
+    connection.exec_driver_sql("DROP TABLE fooditem_duplicates")
+    if removed:
+        logger.info(f"Removed {removed} duplicate global foods")
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_fooditem_global_name ON fooditem (name) WHERE is_custom = 0"
+    )
+
+@migration(10, "fooditem.source_id for bulk imports, unique where set")
+def _fooditem_source_id(connection: Connection):
+    if "source_id" not in _columns(connection, "fooditem"):
+        connection.exec_driver_sql("ALTER TABLE fooditem ADD COLUMN source_id VARCHAR")
+    connection.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_fooditem_source_id ON fooditem (source_id) WHERE source_id IS NOT NULL"
+    )
+
+@migration(11, "Index sync tombstones by owner for ETag change markers")
+def _index_synctombstone_user_id_seq(connection: Connection):
+    # max(seq) of the food tombstones (user_id NULL) becomes one index lookup, see SyncRepository.catalog_marker
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_synctombstone_user_id_seq ON synctombstone (user_id, seq)")
@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, JSON, Column
 from typing import List, Optional, Dict
-from datetime import datetime
+from datetime import datetime, date
 from pydantic import EmailStr
 
 class UserBase(SQLModel):
@@ -47,6 +47,8 @@ class FoodItem(SQLModel, table=True):
     image_url: Optional[str] = None
     is_custom: bool = False
     details: Optional[Dict] = Field(default={}, sa_column=Column(JSON))
+    # Key of the record in an imported dump (bulk import upserts on it); None for foods added by hand
+    source_id: Optional[str] = Field(default=None)
 
 class MealLog(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -58,12 +60,51 @@ class MealLog(SQLModel, table=True):
     # Store snapshot of food in case it changes
     food_snapshot: Dict = Field(default={}, sa_column=Column(JSON))
 
+    # Macros copied out of the snapshot as real columns so totals can be summed in SQL
+    calories: float = Field(default=0)
+    protein: float = Field(default=0)
+    carbs: float = Field(default=0)
+    fats: float = Field(default=0)
+
+class DailyNutritionRollup(SQLModel, table=True):
+    # Running per-user daily totals, kept in step with MealLog inside the same transaction
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    calories: float = 0
+    protein: float = 0
+    carbs: float = 0
+    fats: float = 0
+    meal_count: int = 0
+
+class SyncTombstone(SQLModel, table=True):
+    # Written by the AFTER DELETE triggers from migrations.py so /sync can report deletions
+    seq: int = Field(primary_key=True)
+    entity: str  # "meal" | "food"
+    entity_id: int
+    user_id: Optional[int] = None  # owner for meals; NULL for catalog rows every user sees
+
 class MealLogCreate(SQLModel):
     date: datetime
     meal_type: str
     food_item: Dict = {} 
     # Frontend sends 'food_item' dict. We will manually extract ID or create snapshot.
 
+MAX_MEAL_BATCH_SIZE = 500
+
+class MealLogBatchCreate(SQLModel):
+    meals: List[MealLogCreate] = Field(min_length=1, max_length=MAX_MEAL_BATCH_SIZE)
+
+class MealLogBatchItemResult(SQLModel):
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    food_item_id: Optional[int] = None
+    error: Optional[str] = None
+
+class MealLogBatchResult(SQLModel):
+    created: int
+    failed: int
+    results: List[MealLogBatchItemResult]
 
 class WeeklyPlan(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -1,6 +1,8 @@
-from typing import List, Optional, Type, TypeVar, Generic
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Type, TypeVar, Generic
+from sqlalchemy import insert
 from sqlmodel import Session, select, SQLModel
-from database import get_session
+from database import get_session, current_unit_of_work
 
 T = TypeVar("T", bound=SQLModel)
 
@@ -9,31 +11,49 @@ class BaseRepository(Generic[T]):
         self.model = model
 
     def get_session(self) -> Session:
-        # In a real app with dependency injection, we might pass the session in __init__
-        # For simplicity in this migration, we'll create a new session per operation
-        # or use a context manager. Ideally, FastAPI dependency injection handles this.
-        # However, to keep the repository pattern similar to before without passing session everywhere:
+        # Standalone session for code running outside a unit of work (scripts, startup seeding)
         return next(get_session())
 
-    def find_one(self, **kwargs) -> Optional[T]:
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        # Inside a request the unit of work owns the session and the single commit,
+        # so operations only flush. Outside of one, each operation is its own transaction.
+        uow = current_unit_of_work()
+        if uow is not None:
+            yield uow.session
+            return
+
         with self.get_session() as session:
+            yield session
+            session.commit()
+
+    def find_one(self, **kwargs) -> Optional[T]:
+        with self.session_scope() as session:
             statement = select(self.model).filter_by(**kwargs)
             return session.exec(statement).first()
 
     def find_all(self, **kwargs) -> List[T]:
-        with self.get_session() as session:
+        with self.session_scope() as session:
             statement = select(self.model).filter_by(**kwargs)
             return session.exec(statement).all()
 
     def insert_one(self, data: T) -> T:
-        with self.get_session() as session:
+        with self.session_scope() as session:
             session.add(data)
-            session.commit()
+            session.flush()
             session.refresh(data)
             return data
 
+    def insert_many(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """One executemany INSERT for all rows; returns the new ids in row order. No ORM objects are built."""
+        if not rows:
+            return []
+        statement = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        with self.session_scope() as session:
+            return list(session.execute(statement, rows).scalars())
+
     def update_one(self, id: int, update_data: dict) -> Optional[T]:
-        with self.get_session() as session:
+        with self.session_scope() as session:
             db_item = session.get(self.model, id)
             if not db_item:
                 return None
@@ -42,19 +62,19 @@ class BaseRepository(Generic[T]):
                 setattr(db_item, key, value)
             
             session.add(db_item)
-            session.commit()
+            session.flush()
             session.refresh(db_item)
             return db_item
 
     def delete_one(self, id: int) -> bool:
-        with self.get_session() as session:
+        with self.session_scope() as session:
             db_item = session.get(self.model, id)
             if not db_item:
                 return False
             session.delete(db_item)
-            session.commit()
+            session.flush()
             return True
             
     def find_by_id(self, id: int) -> Optional[T]:
-        with self.get_session() as session:
+        with self.session_scope() as session:
             return session.get(self.model, id)
@@ -1,19 +1,191 @@
 from repositories.base import BaseRepository
+from repositories.pagination import Page, decode_cursor, make_page
 from models import FoodItem
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import insert, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import select, col
+import re
+
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 100
+
+# (name, calories, protein, carbs, fats): what makes two food entries the same food
+FoodKey = Tuple[str, float, float, float, float]
+
+# Columns a bulk import writes; re-importing a record overwrites all of them
+IMPORT_COLUMNS = ("name", "calories", "protein", "carbs", "fats", "image_url", "details")
+
+def fts_match_expression(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word becomes a quoted prefix term and all
+    terms must match ("chick bre" -> '"chick"* "bre"*'). Quoting keeps user input from
+    being parsed as FTS operators. Returns None when there is nothing to search for.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
 
 class FoodRepository(BaseRepository[FoodItem]):
     def __init__(self):
         super().__init__(FoodItem)
 
-    def search_foods(self, query: str) -> List[FoodItem]:
-        with self.get_session() as session:
-            # Case-insensitive search
-            statement = select(FoodItem).where(col(FoodItem.name).ilike(f"%{query}%"))
-            return session.exec(statement).all()
+    def search_foods(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT, cursor: Optional[str] = None) -> Page:
+        """
+        Ranked matches for `query` (best `limit` hits, no further pages), or - with no
+        search terms - the catalog by name, paged with `cursor`.
+        """
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        match = fts_match_expression(query)
+        if match is None:
+            return self.list_foods(limit, cursor)
+
+        with self.session_scope() as session:
+            # fooditem_fts is kept in sync by triggers (see migrations.py); rank is BM25
+            ranked = text(
+                "SELECT fooditem.* FROM fooditem_fts "
+                "JOIN fooditem ON fooditem.id = fooditem_fts.rowid "
+                "WHERE fooditem_fts MATCH :match "
+                "ORDER BY fooditem_fts.rank, fooditem.id "
+                "LIMIT :limit"
+            ).bindparams(match=match, limit=limit)
+            return Page(session.execute(select(FoodItem).from_statement(ranked)).scalars().all(), None)
+
+    def list_statement(self, limit: int, after: Optional[Tuple[str, int]] = None, is_custom: Optional[bool] = None):
+        # (name, id) keyset: ix_fooditem_name, or ix_fooditem_is_custom_name when filtered (see migrations.py)
+        statement = select(FoodItem)
+        if is_custom is not None:
+            statement = statement.where(FoodItem.is_custom == is_custom)
+        if after is not None:
+            statement = statement.where(tuple_(FoodItem.name, FoodItem.id) > after)
+        return statement.order_by(col(FoodItem.name), col(FoodItem.id)).limit(limit)
+
+    def list_foods(self, limit: int = DEFAULT_SEARCH_LIMIT, cursor: Optional[str] = None, is_custom: Optional[bool] = None) -> Page:
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        with self.session_scope() as session:
+            rows = session.exec(self.list_statement(limit + 1, self.decode_list_cursor(cursor), is_custom)).all()
+        return self.make_list_page(rows, limit)
+
+    @staticmethod
+    def decode_list_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+        return decode_cursor(cursor, "foods", str, int) if cursor else None
+
+    @staticmethod
+    def make_list_page(rows: List[FoodItem], limit: int) -> Page:
+        return make_page(rows, limit, "foods", lambda food: (food.name, food.id))
+
+    def catalog_rows(self) -> List[tuple]:
+        """Column tuples for FoodCatalog; skips the JSON details blob and ORM identity-map work."""
+        statement = select(
+            FoodItem.id, FoodItem.name, FoodItem.calories, FoodItem.protein,
+            FoodItem.carbs, FoodItem.fats, FoodItem.image_url, FoodItem.is_custom,
+        ).order_by(col(FoodItem.id))
+        with self.session_scope() as session:
+            return [tuple(row) for row in session.exec(statement).all()]
+
+    def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """The given ids that belong to a stored food, in one IN query on the primary key."""
+        ids = set(ids)
+        if not ids:
+            return set()
+        with self.session_scope() as session:
+            return set(session.exec(select(FoodItem.id).where(col(FoodItem.id).in_(ids))).all())
+
+    def find_global_ids_by_key(self, keys: Iterable[FoodKey]) -> Dict[FoodKey, int]:
+        """
+        Global foods matching name and macros exactly, in one IN query on ix_fooditem_is_custom_name.
+        Custom foods are never matched: they belong to whoever logged them.
+        """
+        keys = set(keys)
+        if not keys:
+            return {}
+        statement = select(
+            FoodItem.id, FoodItem.name, FoodItem.calories, FoodItem.protein, FoodItem.carbs, FoodItem.fats,
+        ).where(FoodItem.is_custom == False, col(FoodItem.name).in_({key[0] for key in keys})).order_by(col(FoodItem.id))
+        found: Dict[FoodKey, int] = {}
+        with self.session_scope() as session:
+            for food_id, *key in session.exec(statement).all():
+                key = tuple(key)
+                if key in keys:
+                    found.setdefault(key, food_id)
+        return found
+
+    def has_foods(self) -> bool:
+        with self.session_scope() as session:
+            return session.exec(select(FoodItem.id).limit(1)).first() is not None
+
+    def seed_global_foods(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Inserts global foods in one executemany; names already taken are skipped by the
+        unique index on global names (INSERT OR IGNORE). Returns how many were added.
+        """
+        statement = insert(FoodItem).prefix_with("OR IGNORE")
+        with self.session_scope() as session:
+            # Through the connection: the ORM-level result of an executemany has no rowcount
+            return session.connection().execute(statement, [{**row, "is_custom": False} for row in rows]).rowcount
+
+    def upsert_imported(self, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Writes one chunk of imported global foods with an executemany per statement: rows
+        with a source_id are upserted on it, rows without one on their name. A name held
+        by a global food with no source_id yet (seeded or added by hand) is claimed, so
+        that food keeps its id and meals; a name held by another import key is skipped.
+        Returns (written, skipped).
+        """
+        by_key: Dict[Any, Dict[str, Any]] = {}
+        for row in rows:
+            # Within a chunk the last occurrence of a record wins
+            by_key[row["source_id"] if row.get("source_id") is not None else ("name", row["name"])] = row
+        unique_rows: Dict[str, Dict[str, Any]] = {}
+        for row in by_key.values():
+            unique_rows.setdefault(row["name"], row)
+        # Superseded repeats and rows whose name another record in the chunk already has
+        skipped = len(rows) - len(unique_rows)
+
+        keyed, named, claims = [], [], []
+        with self.session_scope() as session:
+            holders = {
+                name: (food_id, source_id) for food_id, name, source_id in session.exec(
+                    select(FoodItem.id, FoodItem.name, FoodItem.source_id)
+                    .where(FoodItem.is_custom == False, col(FoodItem.name).in_(list(unique_rows)))
+                ).all()
+            }
+            source_ids = [row["source_id"] for row in unique_rows.values() if row.get("source_id") is not None]
+            known_sources = set(session.exec(
+                select(FoodItem.source_id).where(col(FoodItem.source_id).in_(source_ids))
+            ).all()) if source_ids else set()
+
+            for name, row in unique_rows.items():
+                source_id = row.get("source_id")
+                if source_id is None:
+                    named.append(row)
+                    continue
+                holder = holders.get(name)
+                if holder is not None and holder[1] != source_id:
+                    if holder[1] is not None or source_id in known_sources:
+                        skipped += 1
+                        continue
+                    claims.append({"food_id": holder[0], "source_id": source_id})
+                keyed.append(row)
+
+            connection = session.connection()
+            if claims:
+                connection.execute(text("UPDATE fooditem SET source_id = :source_id WHERE id = :food_id"), claims)
+            for batch, target, where in ((keyed, "source_id", "source_id IS NOT NULL"), (named, "name", "is_custom = 0")):
+                if not batch:
+                    continue
+                statement = sqlite_insert(FoodItem)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[target], index_where=text(where),
+                    set_={column: getattr(statement.excluded, column) for column in IMPORT_COLUMNS},
+                )
+                connection.execute(statement, [{**row, "is_custom": False} for row in batch])
+        return len(keyed) + len(named), skipped
 
     def add_custom_food(self, food_data: dict) -> FoodItem:
         food = FoodItem(**food_data)
         food.is_custom = True
+        # Import keys belong to global foods; a user-supplied one could overwrite an imported food
+        food.source_id = None
         return self.insert_one(food)
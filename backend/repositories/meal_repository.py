@@ -1,9 +1,25 @@
 from repositories.base import BaseRepository
 from models import MealLog
-from typing import List, Dict
+from repositories.pagination import Page, decode_cursor, make_page
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import tuple_
 from sqlmodel import select, col
 
+MACRO_FIELDS = ("calories", "protein", "carbs", "fats")
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+
+def macros_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, float]:
+    """Typed macro columns for a MealLog, taken from its food snapshot (missing/invalid -> 0)."""
+    macros = {}
+    for field in MACRO_FIELDS:
+        try:
+            macros[field] = float((snapshot or {}).get(field) or 0)
+        except (TypeError, ValueError):
+            macros[field] = 0.0
+    return macros
+
 class MealRepository(BaseRepository[MealLog]):
     def __init__(self):
         super().__init__(MealLog)
@@ -11,51 +27,22 @@ class MealRepository(BaseRepository[MealLog]):
     def log_meal(self, user_id: int, meal_data: dict) -> MealLog:
         # Ensure user_id is set
         meal_data["user_id"] = user_id
+        for field, value in macros_from_snapshot(meal_data.get("food_snapshot")).items():
+            meal_data.setdefault(field, value)
         meal = MealLog(**meal_data)
         return self.insert_one(meal)
 
-    def get_history(self, user_id: int, limit: int = 50) -> List[MealLog]:
-        with self.get_session() as session:
-            statement = select(MealLog).where(MealLog.user_id == user_id).order_by(col(MealLog.date).desc()).limit(limit)
-            return session.exec(statement).all()
-
-    def get_daily_summary(self, user_id: int, date: datetime = None) -> Dict:
-        if date is None:
-            date = datetime.now()
-        
-        # Simple date filtering (could be improved with exact date ranges)
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        with self.get_session() as session:
-            statement = select(MealLog).where(
-                MealLog.user_id == user_id,
-                MealLog.date >= start_of_day,
-                MealLog.date <= end_of_day
-            )
-            meals = session.exec(statement).all()
-        
-        total_calories = 0
-        total_protein = 0
-        total_carbs = 0
-        total_fats = 0
+    def history_statement(self, user_id: int, limit: int = HISTORY_PAGE_SIZE, before: Optional[Tuple[datetime, int]] = None):
+        # Served by ix_meallog_user_id_date (filter, sort and keyset seek; the index carries the rowid), see migrations.py
+        statement = select(MealLog).where(MealLog.user_id == user_id)
+        if before is not None:
+            statement = statement.where(tuple_(MealLog.date, MealLog.id) < before)
+        return statement.order_by(col(MealLog.date).desc(), col(MealLog.id).desc()).limit(limit)
 
-        for meal in meals:
-            # Assuming food_snapshot or linked food_item has these details
-            # For now, we will assume the meal log has a food_snapshot or we fetch from food_item
-            # But the model has `food_snapshot`, let's rely on that if populated, or query the food item
-            # To simplify, we'll assume `food_snapshot` is populated during logging
-            food = meal.food_snapshot
-            if food:
-                total_calories += food.get("calories", 0)
-                total_protein += food.get("protein", 0)
-                total_carbs += food.get("carbs", 0)
-                total_fats += food.get("fats", 0)
-        
-        return {
-            "calories": total_calories,
-            "protein": total_protein,
-            "carbs": total_carbs,
-            "fats": total_fats,
-            "meals_count": len(meals)
-        }
+    def get_history(self, user_id: int, limit: int = HISTORY_PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+        """Newest meals first, one page at a time; pass the returned cursor to continue further back."""
+        limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+        before = decode_cursor(cursor, "history", datetime.fromisoformat, int) if cursor else None
+        with self.session_scope() as session:
+            rows = session.exec(self.history_statement(user_id, limit + 1, before)).all()
+        return make_page(rows, limit, "history", lambda meal: (meal.date, meal.id))
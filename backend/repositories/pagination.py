@@ -0,0 +1,46 @@
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime
+import base64
+import binascii
+import json
+
+# Pages keep the plain JSON list body; the cursor for the next page rides in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue (or one for another listing)."""
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+def encode_cursor(kind: str, *key: Any) -> str:
+    """
+    Opaque keyset cursor: the sort key of the last row on the page, tagged with the
+    listing it belongs to. Datetimes travel as ISO strings.
+    """
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    raw = json.dumps([kind, *values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, kind: str, *types: Callable[[Any], Any]) -> Tuple[Any, ...]:
+    """Inverse of encode_cursor; each key value is converted with the matching type."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(decoded, list) or len(decoded) != len(types) + 1 or decoded[0] != kind:
+            raise InvalidCursor("cursor does not belong to this listing")
+        return tuple(convert(value) for convert, value in zip(types, decoded[1:]))
+    except InvalidCursor:
+        raise
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise InvalidCursor("malformed cursor") from exc
+
+def make_page(rows: Sequence[Any], limit: int, kind: str, key: Callable[[Any], Tuple[Any, ...]]) -> Page:
+    """
+    Trim a `limit + 1` fetch to one page. The extra row only tells us another page
+    exists; the cursor points at the last row actually returned.
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(kind, *key(items[-1])) if len(rows) > limit else None
+    return Page(items, next_cursor)
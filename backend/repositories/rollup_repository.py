@@ -0,0 +1,88 @@
+from repositories.base import BaseRepository
+from models import DailyNutritionRollup, MealLog
+from typing import Any, Dict, List, Optional
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert
+
+ROLLUP_FIELDS = ("calories", "protein", "carbs", "fats", "meal_count")
+
+# SQLite expressions mapping a rollup day to the first day of its bucket
+BUCKET_EXPRESSIONS = {
+    "day": "day",
+    # 'weekday 0' moves to the coming Sunday (or stays on one), -6 days lands on its Monday
+    "week": "date(day, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m-01', day)",
+}
+
+class RollupRepository(BaseRepository[DailyNutritionRollup]):
+    def __init__(self):
+        super().__init__(DailyNutritionRollup)
+
+    def apply_meal(self, meal: MealLog, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) a meal's macros from its day's rollup row."""
+        self.apply_totals([{
+            "user_id": meal.user_id,
+            "day": meal.date.date(),
+            "calories": sign * meal.calories,
+            "protein": sign * meal.protein,
+            "carbs": sign * meal.carbs,
+            "fats": sign * meal.fats,
+            "meal_count": sign,
+        }])
+
+    def apply_totals(self, rows: List[Dict[str, Any]]):
+        """Add pre-aggregated per-day deltas (one row per user/day) with a single executemany upsert."""
+        if not rows:
+            return
+        statement = insert(DailyNutritionRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={
+                field: getattr(DailyNutritionRollup, field) + getattr(statement.excluded, field)
+                for field in ROLLUP_FIELDS
+            },
+        )
+        with self.session_scope() as session:
+            session.execute(statement, rows)
+
+    def get_day(self, user_id: int, day: date) -> Optional[DailyNutritionRollup]:
+        with self.session_scope() as session:
+            return session.get(DailyNutritionRollup, (user_id, day))
+
+    def rebuild(self, user_id: Optional[int] = None) -> int:
+        """Recompute rollups from MealLog in bulk (all users, or one). Returns the number of day rows written."""
+        where = "WHERE user_id = :user_id" if user_id is not None else ""
+        params = {"user_id": user_id}
+        with self.session_scope() as session:
+            session.execute(text(f"DELETE FROM dailynutritionrollup {where}"), params)
+            result = session.execute(text(
+                "INSERT INTO dailynutritionrollup (user_id, day, calories, protein, carbs, fats, meal_count) "
+                "SELECT user_id, date(date), SUM(calories), SUM(protein), SUM(carbs), SUM(fats), COUNT(*) "
+                f"FROM meallog {where} GROUP BY user_id, date(date)"
+            ), params)
+            return result.rowcount
+
+    def get_range_totals(self, user_id: int, start: date, end: date, granularity: str) -> List[Dict[str, Any]]:
+        """Bucketed totals for [start, end] in one aggregate query over the rollup primary key."""
+        bucket = BUCKET_EXPRESSIONS[granularity]
+        with self.session_scope() as session:
+            rows = session.execute(text(
+                f"SELECT {bucket} AS bucket, SUM(calories), SUM(protein), SUM(carbs), SUM(fats), "
+                "SUM(meal_count), COUNT(*) "
+                "FROM dailynutritionrollup "
+                "WHERE user_id = :user_id AND day BETWEEN :start AND :end AND meal_count > 0 "
+                "GROUP BY bucket ORDER BY bucket"
+            ), {"user_id": user_id, "start": start.isoformat(), "end": end.isoformat()}).all()
+        return [
+            {
+                "start": row[0],
+                "calories": row[1],
+                "protein": row[2],
+                "carbs": row[3],
+                "fats": row[4],
+                "meals_count": row[5],
+                "days_logged": row[6],
+            }
+            for row in rows
+        ]
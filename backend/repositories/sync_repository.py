@@ -0,0 +1,65 @@
+from repositories.base import BaseRepository
+from models import SyncTombstone, MealLog, FoodItem, User
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import Integer, literal_column, text
+from sqlmodel import select, col
+
+def change_seq(model) -> Any:
+    # change_seq is trigger-maintained and not mapped on the models (see migrations.py)
+    return literal_column(f'"{model.__tablename__}".change_seq', Integer)
+
+class SyncRepository(BaseRepository[SyncTombstone]):
+    def __init__(self):
+        super().__init__(SyncTombstone)
+
+    def current_seq(self) -> int:
+        with self.session_scope() as session:
+            return session.execute(text("SELECT value FROM sync_sequence")).scalar_one()
+
+    def catalog_marker(self) -> int:
+        """Highest stamp of any food write or deletion: ix_fooditem_change_seq plus ix_synctombstone_user_id_seq."""
+        with self.session_scope() as session:
+            return session.execute(text(
+                "SELECT max(coalesce((SELECT max(change_seq) FROM fooditem), 0), "
+                "coalesce((SELECT max(seq) FROM synctombstone WHERE user_id IS NULL), 0))"
+            )).scalar_one()
+
+    def meals_marker(self, user_id: int) -> int:
+        """Highest stamp of the user's meal writes and deletions: ix_meallog_user_id_change_seq plus ix_synctombstone_user_id_seq."""
+        with self.session_scope() as session:
+            return session.execute(text(
+                "SELECT max(coalesce((SELECT max(change_seq) FROM meallog WHERE user_id = :user_id), 0), "
+                "coalesce((SELECT max(seq) FROM synctombstone WHERE user_id = :user_id), 0))"
+            ), {"user_id": user_id}).scalar_one()
+
+    def meals_since(self, user_id: int, since: int, limit: int) -> List[Tuple[MealLog, int]]:
+        # ix_meallog_user_id_change_seq
+        seq = change_seq(MealLog)
+        statement = select(MealLog, seq).where(MealLog.user_id == user_id, seq > since).order_by(seq).limit(limit)
+        with self.session_scope() as session:
+            return [tuple(row) for row in session.exec(statement).all()]
+
+    def foods_since(self, since: int, limit: int) -> List[Tuple[FoodItem, int]]:
+        # ix_fooditem_change_seq
+        seq = change_seq(FoodItem)
+        statement = select(FoodItem, seq).where(seq > since).order_by(seq).limit(limit)
+        with self.session_scope() as session:
+            return [tuple(row) for row in session.exec(statement).all()]
+
+    def profile_since(self, user_id: int, since: int) -> Optional[Tuple[User, int]]:
+        seq = change_seq(User)
+        statement = select(User, seq).where(User.id == user_id, seq > since)
+        with self.session_scope() as session:
+            row = session.exec(statement).first()
+            return tuple(row) if row is not None else None
+
+    def tombstones_since(self, user_id: int, since: int, limit: int) -> List[SyncTombstone]:
+        statement = (
+            select(SyncTombstone)
+            .where(SyncTombstone.seq > since)
+            .where((SyncTombstone.user_id == user_id) | (col(SyncTombstone.user_id).is_(None)))
+            .order_by(col(SyncTombstone.seq))
+            .limit(limit)
+        )
+        with self.session_scope() as session:
+            return session.exec(statement).all()
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from typing import List, Literal, Optional
+from loguru import logger
+import csv
 from sqlmodel import select, func
+from sqlalchemy.exc import IntegrityError
 from database import get_session
 from models import User, FoodItem, MealLog, UserBase
 from dependencies import get_current_user
+from container import get_container
+from repositories.food_repository import FoodRepository, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from repositories.pagination import NEXT_CURSOR_HEADER
+from http_caching import conditional_response, PRIVATE_REVALIDATE
 
 router = APIRouter(
     prefix="/admin",
@@ -11,6 +18,8 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+food_repo = FoodRepository()
+
 # Dependency to check for admin privileges
 async def get_current_admin_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_admin:
@@ -21,7 +30,7 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
     return current_user
 
 @router.get("/stats")
-async def get_system_stats(
+def get_system_stats(
     current_user: User = Depends(get_current_admin_user),
     session = Depends(get_session)
 ):
@@ -41,7 +50,11 @@ async def get_system_stats(
     }
 
 @router.get("/foods", response_model=List[FoodItem])
-async def get_admin_foods(
+def get_admin_foods(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_admin_user),
     session = Depends(get_session)
 ):
@@ -49,23 +62,70 @@ async def get_admin_foods(
     # Usually admin manages global foods (is_custom=False)
     # But let's show all for full control, or just global. 
     # User asked for "already existing foods", likely meaning the database.
-    statement = select(FoodItem).where(FoodItem.is_custom == False)
-    return session.exec(statement).all()
+    versions = get_container().versions
+    not_modified = conditional_response(request, response, versions.etag("admin-foods", versions.catalog()), PRIVATE_REVALIDATE)
+    if not_modified:
+        return not_modified
+    # Paged by (name, id); follow X-Next-Cursor for the rest of the catalog
+    statement = food_repo.list_statement(limit + 1, food_repo.decode_list_cursor(cursor), is_custom=False)
+    page = food_repo.make_list_page(session.exec(statement).all(), limit)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 @router.post("/foods", response_model=FoodItem)
-async def create_global_food(
+def create_global_food(
     food: FoodItem,
     current_user: User = Depends(get_current_admin_user),
     session = Depends(get_session)
 ):
     food.is_custom = False # Admin adds global foods
     session.add(food)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        # Global food names are unique (ux_fooditem_global_name)
+        session.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"A food named '{food.name}' already exists")
     session.refresh(food)
+    get_container().food_catalog.bump()
     return food
 
+@router.post("/foods/import")
+def import_foods(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    offset: int = Query(0, ge=0),
+    source: str = "",
+    current_user: User = Depends(get_current_admin_user),
+    session = Depends(get_session)
+):
+    # Streams the (spooled) upload through the import pipeline, committing chunk by chunk;
+    # after a failure, send the file again with offset=<last logged next_offset>
+    from services.food_import import FoodImporter, detect_format, open_text, read_records
+    filename = file.filename or ""
+    fmt = format or detect_format(filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unknown file type, pass format=csv or format=ndjson")
+
+    def log_progress(report):
+        logger.info(f"Food import {filename}: {report.next_offset} records read, {report.written} written, "
+                    f"{report.invalid} invalid, {report.skipped} skipped")
+
+    container = get_container()
+    importer = FoodImporter(container.settings.import_chunk_size, source)
+    try:
+        report = importer.run(read_records(open_text(file.file, filename), fmt), session, offset, log_progress)
+    except (csv.Error, UnicodeDecodeError, EOFError, OSError) as exc:
+        # Not a per-record problem: the file itself cannot be read any further
+        raise HTTPException(status_code=400, detail=f"Unreadable import file: {exc}")
+    finally:
+        # Earlier chunks are committed even when a later one fails
+        container.food_catalog.bump()
+    return report.as_dict()
+
 @router.delete("/foods/{food_id}")
-async def delete_food(
+def delete_food(
     food_id: int,
     current_user: User = Depends(get_current_admin_user),
     session = Depends(get_session)
@@ -81,5 +141,20 @@ async def delete_food(
         session.commit()
     except Exception as e:
          raise HTTPException(status_code=400, detail="Cannot delete food (in use?)")
+    get_container().food_catalog.bump()
          
     return {"ok": True}
+
+@router.get("/metrics")
+async def get_metrics(current_user: User = Depends(get_current_admin_user)):
+    container = get_container()
+    return {
+        "password_hashing": container.hash_pool.metrics(),
+        "principal_cache": container.principal_cache.metrics(),
+        "food_catalog": container.food_catalog.metrics(),
+        "versions": container.versions.metrics(),
+        "plan_pool": container.plan_pool.metrics(),
+        "plan_cache": container.plan_cache.metrics(),
+        "recognition_batching": container.ai_service.recognition_batcher.metrics(),
+        "recognition_cache": container.recognition_cache.metrics(),
+    }
@@ -0,0 +1,85 @@
+"""
+Startup time budget: how long `import main` and the server's startup path take, checked
+against fixed budgets so CI catches a slow import or an O(n) boot step creeping back in.
+
+Every measurement runs in a fresh interpreter against a throwaway SQLite file:
+  - first boot:  empty database, so every migration runs and the catalog is seeded
+  - restart:     `--foods` global foods already stored, nothing left to migrate
+Startup is what the lifespan does before serving: on_startup() plus building and
+warming the service container. Medians of `--runs` restarts are compared to the budgets.
+
+Usage:
+    python scripts/check_startup_budget.py [--foods 20000] [--runs 5]
+        [--import-budget-ms 2000] [--startup-budget-ms 1000]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; the last line of its stdout is the JSON result
+CHILD = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.on_startup()
+from container import build_container
+container = build_container()
+container.warm_up()
+finished = time.perf_counter()
+container.shutdown()
+print(json.dumps({"import_ms": (imported - started) * 1000, "startup_ms": (finished - imported) * 1000}))
+"""
+
+def boot(database_path: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}")
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def add_foods(database_path: str, count: int):
+    with sqlite3.connect(database_path) as connection:
+        connection.executemany(
+            "INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom, details) VALUES (?, ?, ?, ?, ?, 0, '{}')",
+            ((f"Food {i}", 50 + i % 700, i % 40, i % 90, i % 30) for i in range(count)),
+        )
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--foods", type=int, default=20000, help="global foods in the database for the restarts")
+    parser.add_argument("--runs", type=int, default=5, help="restarts to take the median of")
+    parser.add_argument("--import-budget-ms", type=float, default=2000)
+    parser.add_argument("--startup-budget-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, "startup.db")
+        first = boot(database_path)
+        add_foods(database_path, args.foods)
+        restarts = [boot(database_path) for _ in range(args.runs)]
+
+    import_ms = statistics.median(run["import_ms"] for run in restarts)
+    startup_ms = statistics.median(run["startup_ms"] for run in restarts)
+    print(f"first boot (empty database): import {first['import_ms']:.0f} ms, startup {first['startup_ms']:.0f} ms")
+    print(f"restart ({args.foods} foods, median of {args.runs}): import {import_ms:.0f} ms "
+          f"(budget {args.import_budget_ms:.0f}), startup {startup_ms:.0f} ms (budget {args.startup_budget_ms:.0f})")
+
+    over = []
+    if import_ms > args.import_budget_ms:
+        over.append("import")
+    if startup_ms > args.startup_budget_ms:
+        over.append("startup")
+    if over:
+        print(f"Over budget: {', '.join(over)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,6 +38,7 @@ def create_admin_user():
             
         session.commit()
         session.refresh(user)
+        # Running servers cache principals, so they see the change once PRINCIPAL_CACHE_TTL expires
         print(f"DONE. User: {user.email}, Password: {password}, Admin: {user.is_admin}")
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_and_tables, get_session
+from services.food_import import IMPORT_FORMATS, FoodImporter, detect_format, open_text, read_records
+from settings import Settings
+
+def import_foods(path: str, fmt: str = None, offset: int = 0, chunk_size: int = None, source: str = "") -> int:
+    fmt = fmt or detect_format(path)
+    if fmt is None:
+        print(f"Cannot tell the format of {path}; pass --format {' or '.join(IMPORT_FORMATS)}")
+        return 2
+    create_db_and_tables()
+    importer = FoodImporter(chunk_size or Settings.from_env().import_chunk_size, source)
+    last = {"offset": offset}
+
+    def progress(report):
+        last["offset"] = report.next_offset
+        print(f"{report.next_offset} records read: {report.written} written, {report.invalid} invalid, "
+              f"{report.skipped} skipped ({report.records_per_second:.0f} records/s)", flush=True)
+
+    session = next(get_session())
+    try:
+        with open(path, "rb") as stream:
+            report = importer.run(read_records(open_text(stream, path), fmt), session, offset, progress)
+    except BaseException:
+        print(f"Import stopped; committed up to record {last['offset']}. Resume with --offset {last['offset']}")
+        raise
+    finally:
+        session.close()
+
+    for error in report.errors:
+        print(f"record {error['record']}: {error['error']}")
+    print(f"Imported {report.written} foods from {report.read} records in {report.elapsed_seconds:.1f} s "
+          f"({report.invalid} invalid, {report.skipped} skipped). Running servers list them right away; "
+          f"plans and recognition use them within FOOD_CATALOG_MAX_AGE seconds.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a CSV or NDJSON nutrition dump (optionally .gz) into the global food catalog")
+    parser.add_argument("path", help="dump file, e.g. a flattened FoodData Central or Open Food Facts export")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="default: from the file extension")
+    parser.add_argument("--offset", type=int, default=0, help="skip this many records (resume an interrupted import)")
+    parser.add_argument("--chunk-size", type=int, help="records per transaction (default: IMPORT_CHUNK_SIZE)")
+    parser.add_argument("--source", default="", help="prefix for the dump's record ids, e.g. fdc")
+    args = parser.parse_args()
+    sys.exit(import_foods(args.path, args.format, args.offset, args.chunk_size, args.source))
@@ -24,6 +24,7 @@ def make_admin(email: str):
         session.add(user)
         session.commit()
         session.refresh(user)
+        # Running servers cache principals, so they see the change once PRINCIPAL_CACHE_TTL expires
         print(f"Successfully promoted {user.full_name} ({user.email}) to Admin!")
 
 if __name__ == "__main__":
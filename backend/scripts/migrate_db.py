@@ -1,35 +1,32 @@
-import sqlite3
+import argparse
 import os
+import sys
 
-# Path to database.db - assumed in backend root
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database.db")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def migrate():
-    print(f"Migrating database at: {DB_PATH}")
-    if not os.path.exists(DB_PATH):
-        print("Database not found. Nothing to migrate.")
+from sqlmodel import SQLModel
+from database import engine, sqlite_url
+import models  # noqa: F401  (registers the tables with SQLModel.metadata)
+from migrations import MIGRATIONS, pending_migrations, run_migrations
+
+def migrate(dry_run: bool = False, target: int = None):
+    print(f"Migrating database at: {sqlite_url}")
+    # Tables that do not exist yet are created in their current shape
+    if not dry_run:
+        SQLModel.metadata.create_all(engine)
+
+    pending = pending_migrations(engine)
+    if not pending:
+        print(f"Schema is up to date (version {MIGRATIONS[-1].version}).")
         return
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    try:
-        # Check if column exists
-        cursor.execute("PRAGMA table_info(user)")
-        columns = [info[1] for info in cursor.fetchall()]
-        
-        if "is_admin" in columns:
-            print("Column 'is_admin' already exists.")
-        else:
-            print("Adding 'is_admin' column...")
-            cursor.execute("ALTER TABLE user ADD COLUMN is_admin INTEGER DEFAULT 0")
-            conn.commit()
-            print("Migration successful.")
-            
-    except Exception as e:
-        print(f"Migration failed: {e}")
-    finally:
-        conn.close()
+    for step in run_migrations(engine, dry_run=dry_run, target=target):
+        prefix = "Would apply" if dry_run else "Applied"
+        print(f"{prefix} {step.version}: {step.description}")
 
 if __name__ == "__main__":
-    migrate()
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    args = parser.parse_args()
+    migrate(dry_run=args.dry_run, target=args.target)
@@ -0,0 +1,22 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_and_tables, UnitOfWork
+from repositories.rollup_repository import RollupRepository
+
+def rebuild_rollups(user_id: int = None):
+    create_db_and_tables()
+    # Delete and re-insert in one transaction so readers never see a half-built table
+    with UnitOfWork():
+        rows = RollupRepository().rebuild(user_id)
+    scope = f"user {user_id}" if user_id is not None else "all users"
+    print(f"Rebuilt {rows} daily rollup rows for {scope}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute DailyNutritionRollup from MealLog history")
+    parser.add_argument("--user-id", type=int, help="only rebuild this user's rollups")
+    args = parser.parse_args()
+    rebuild_rollups(args.user_id)
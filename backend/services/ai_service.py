@@ -1,125 +1,226 @@
-from repositories.food_repository import FoodRepository
-from interfaces.services import IAIEngine
-from typing import List, Dict, Any
+from interfaces.services import IAIEngine, IFoodRecognizer
+from services.food_catalog import FoodCatalog, FoodRecord
+from services.meal_planner import DEFAULT_DAILY_CALORIES, MacroTargets, MealPlanner
+from services.plan_pool import PlanPool
+from services.plan_cache import PlanCache, plan_seed
+from services.inference_batcher import InferenceBatcher
+from services.recognition import perceptual_hash
+from services.recognition_cache import RecognitionCache
+from settings import Settings
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+import hashlib
 import random
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import time
+import anyio.to_thread
+import numpy as np
+
+# Variation presets: protein/carbs/fats calorie split and a factor on the user's calorie goal
+PLAN_PRESETS = [
+    {"name": "Muscle Gain", "desc": "High protein meals to support muscle growth.", "split": (0.30, 0.45, 0.25), "calorie_factor": 1.10},
+    {"name": "Weight Loss", "desc": "Calorie-conscious meals for steady weight loss.", "split": (0.30, 0.40, 0.30), "calorie_factor": 0.85},
+    {"name": "Keto", "desc": "Low carb, high fat diet.", "split": (0.20, 0.05, 0.75), "calorie_factor": 1.0},
+    {"name": "Paleo", "desc": "Whole foods, no processed grains.", "split": (0.30, 0.30, 0.40), "calorie_factor": 1.0},
+    {"name": "Vegan", "desc": "Plant-based power.", "split": (0.15, 0.60, 0.25), "calorie_factor": 1.0},
+    {"name": "Vegetarian", "desc": "Meat-free balanced diet.", "split": (0.20, 0.50, 0.30), "calorie_factor": 1.0},
+    {"name": "Balanced", "desc": "A mix of all macronutrients.", "split": (0.20, 0.50, 0.30), "calorie_factor": 1.0},
+    {"name": "Low Carb", "desc": "Reduced carbohydrates.", "split": (0.30, 0.20, 0.50), "calorie_factor": 1.0},
+    {"name": "High Energy", "desc": "Complex carbs for sustained energy.", "split": (0.15, 0.60, 0.25), "calorie_factor": 1.10},
+    {"name": "Budget Friendly", "desc": "Cost-effective nutritious meals.", "split": (0.20, 0.50, 0.30), "calorie_factor": 1.0},
+]
+
+UNKNOWN_FOOD = {"name": "Unknown Food", "calories": 0, "protein": 0, "carbs": 0, "fats": 0}
+
+class PlanningSnapshot(NamedTuple):
+    records: Tuple[FoodRecord, ...]
+    planner: MealPlanner
+    # Content hash of the snapshot: stable across processes and restarts, unlike FoodCatalog.version
+    fingerprint: str
+
+def _build_planning_snapshot(records: Tuple[FoodRecord, ...]) -> PlanningSnapshot:
+    # The planner is kept with the records it indexes, so a concurrent catalog rebuild cannot mismatch them
+    macros = np.array([(r.calories, r.protein, r.carbs, r.fats) for r in records], dtype=np.float64)
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(np.array([r.id for r in records], dtype=np.int64).tobytes())
+    digest.update(macros.tobytes())
+    digest.update("\0".join(f"{r.name}\x1f{r.image_url}\x1f{r.is_custom}" for r in records).encode("utf-8"))
+    return PlanningSnapshot(records, MealPlanner(macros), digest.hexdigest())
+
+def _week_start() -> date:
+    today = datetime.utcnow().date()
+    return today - timedelta(days=today.weekday())
+
+def _foods_by_id(records: Tuple[FoodRecord, ...]) -> Dict[int, FoodRecord]:
+    return {record.id: record for record in records}
 
 class AIEngine(IAIEngine):
-    def __init__(self):
-        self.food_repo = FoodRepository()
-
-    def recognize_image(self) -> Dict[str, Any]:
-        # Mock AI: Returns a random food from DB or a fixed one
-        foods = self.food_repo.find_all()
-        if foods:
-            recognized = random.choice(foods)
-            # recognized is a FoodItem object
-            # API expects a dict or object. Returning dict for safety if response model expects it, 
-            # but response model is FoodItem, so object is fine.
-            return recognized
-        return {"name": "Unknown Food", "calories": 0, "protein": 0, "carbs": 0, "fats": 0}
-
-    def generate_meal_plan(self, user_id: int) -> Dict[str, Any]:
-        # Mock Planner: Generates a random plan for 7 days
-        start_date = datetime.utcnow()
-        meals = []
-        foods = self.food_repo.find_all()
-        
-        if not foods:
-            foods = [{"name": "Apple", "calories": 95, "protein": 0.5, "carbs": 25, "fats": 0.3}]
-        # If foods contains objects, we need to handle them. 
-        # If empty, we made a list of dicts. Mixed types risks errors.
-        # Let's ensure 'foods' is a list of dicts for the logic below, or handle objects.
-        
-        food_list = []
-        for f in foods:
-             if isinstance(f, dict):
-                 food_list.append(f)
-             else:
-                 food_list.append(f.dict())
-        
-        for i in range(7):
-            day_date = start_date + timedelta(days=i)
-            for meal_type in ["breakfast", "lunch", "dinner"]:
-                food = random.choice(food_list)
-                food_copy = food.copy()
-                if "id" in food_copy:
-                    del food_copy["id"]
-                if "_id" in food_copy: # Legacy cleanup
-                    del food_copy["_id"]
-                
-                meals.append({
-                    "date": day_date.isoformat(),
-                    "meal_type": meal_type,
-                    "food": food_copy
-                })
-                
-        return {
+    def __init__(self, food_catalog: Optional[FoodCatalog] = None, plan_pool: Optional[PlanPool] = None,
+                 plan_cache: Optional[PlanCache] = None, recognizer: Optional[IFoodRecognizer] = None,
+                 recognition_cache: Optional[RecognitionCache] = None, settings: Optional[Settings] = None):
+        if (food_catalog is None or plan_pool is None or plan_cache is None or recognizer is None
+                or recognition_cache is None or settings is None):
+            from container import get_container
+            food_catalog = food_catalog or get_container().food_catalog
+            plan_pool = plan_pool or get_container().plan_pool
+            plan_cache = plan_cache or get_container().plan_cache
+            recognizer = recognizer or get_container().recognizer
+            recognition_cache = recognition_cache or get_container().recognition_cache
+            settings = settings or get_container().settings
+        # Shared, versioned snapshot of the food table instead of a full reload per call
+        self.food_catalog = food_catalog
+        self.plan_pool = plan_pool
+        self.plan_cache = plan_cache
+        self.recognizer = recognizer
+        self.recognition_cache = recognition_cache
+        # Concurrent uploads share one model call (see recognize_batched)
+        self.recognition_batcher = InferenceBatcher(self._recognize_batch, settings.recognition_batch_size,
+                                                    settings.recognition_batch_wait_ms, settings.recognition_queue_depth)
+
+    def recognize_image(self, pixels: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        # `pixels` is the decoded model input (services.recognition.load_model_input).
+        # Without an upload (older clients) this stays the demo: a random catalog food.
+        if pixels is not None:
+            image_hash, cached = self._cached_recognition(pixels)
+            return cached if cached is not None else self._recognize_batch([(pixels, image_hash)])[0]
+        foods = self.food_catalog.records()
+        # Response model is FoodItem; the record dict carries all of its scalar fields
+        return random.choice(foods).as_dict() if foods else dict(UNKNOWN_FOOD)
+
+    async def recognize_batched(self, pixels: np.ndarray) -> Dict[str, Any]:
+        """
+        recognize_image for request handlers: a near-duplicate of a recent photo is answered
+        from the recognition cache, anything else joins the next micro-batch
+        (InferenceQueueFull when backed up).
+        """
+        image_hash, cached = await anyio.to_thread.run_sync(self._cached_recognition, pixels)
+        if cached is not None:
+            return cached
+        return await self.recognition_batcher.submit((pixels, image_hash))
+
+    def _cached_recognition(self, pixels: np.ndarray) -> Tuple[int, Optional[Dict[str, Any]]]:
+        # (perceptual hash, cached result or None); the hash is reused to store a miss's result
+        image_hash = perceptual_hash(pixels)
+        foods = self.food_catalog.derived("foods_by_id", _foods_by_id)
+        hit, food_id = self.recognition_cache.lookup(image_hash, foods)
+        if not hit:
+            return image_hash, None
+        return image_hash, foods[food_id].as_dict() if food_id is not None else dict(UNKNOWN_FOOD)
+
+    def _recognize_batch(self, images: List[Tuple[np.ndarray, int]]) -> List[Dict[str, Any]]:
+        foods = self.food_catalog.records()
+        started = time.perf_counter()
+        recognized = self.recognizer.recognize_batch(np.stack([pixels for pixels, _ in images]), foods)
+        self.recognition_cache.store(
+            [(image_hash, food.id if food is not None else None) for (_, image_hash), food in zip(images, recognized)],
+            time.perf_counter() - started,
+        )
+        return [food.as_dict() if food is not None else dict(UNKNOWN_FOOD) for food in recognized]
+
+    def _planning_snapshot(self) -> PlanningSnapshot:
+        snapshot = self.food_catalog.derived("meal_planner", _build_planning_snapshot)
+        self.plan_cache.use_catalog(snapshot.fingerprint)
+        return snapshot
+
+    def generate_meal_plan(self, user_id: int, daily_calorie_goal: Optional[float] = None,
+                           goal: Optional[str] = None) -> Dict[str, Any]:
+        # Monday-to-Sunday breakfast/lunch/dinner sized to the user's calorie goal and macro split.
+        # Seeded from everything the plan depends on, so it is cached until one of them changes.
+        snapshot = self._planning_snapshot()
+        targets = MacroTargets.for_goal(daily_calorie_goal, goal)
+        week_start = _week_start()
+        key = (f"week:{user_id}:{targets.calories}:{targets.protein}:{targets.carbs}:{targets.fats}"
+               f":{week_start}:{snapshot.fingerprint}")
+        cached = self.plan_cache.get(key)
+        if cached is not None:
+            return cached
+
+        start_date = datetime.combine(week_start, datetime.min.time())
+        week = snapshot.planner.plan(targets, days=7, rng=np.random.default_rng(plan_seed(key)))
+        if week:
+            meals = self._render_meals(snapshot.records, week, start_date, {})
+        else:
+            # Nothing in the catalog has calories to portion: fall back to a fixed plan
+            meals = self._fallback_meals(snapshot.records, start_date, 7, random.Random(plan_seed(key)),
+                                         {"name": "Apple", "calories": 95, "protein": 0.5, "carbs": 25, "fats": 0.3})
+
+        plan = {
             "user_id": user_id,
             "start_date": start_date,
             "meals": meals
         }
+        self.plan_cache.put(key, user_id, snapshot.fingerprint, plan)
+        return plan
 
-    def generate_meal_plan_variations(self, user_id: int) -> List[Dict[str, Any]]:
-        variations = []
-        
-        # 10 Presets
-        presets = [
-            {"name": "Muscle Gain", "desc": "High protein meals to support muscle growth.", "bias": "protein"},
-            {"name": "Weight Loss", "desc": "Calorie-conscious meals for steady weight loss.", "bias": "low_cal"},
-            {"name": "Keto", "desc": "Low carb, high fat diet.", "bias": "keto"},
-            {"name": "Paleo", "desc": "Whole foods, no processed grains.", "bias": "paleo"},
-            {"name": "Vegan", "desc": "Plant-based power.", "bias": "vegan"},
-            {"name": "Vegetarian", "desc": "Meat-free balanced diet.", "bias": "veg"},
-            {"name": "Balanced", "desc": "A mix of all macronutrients.", "bias": "balanced"},
-            {"name": "Low Carb", "desc": "Reduced carbohydrates.", "bias": "low_carb"},
-            {"name": "High Energy", "desc": "Complex carbs for sustained energy.", "bias": "energy"},
-            {"name": "Budget Friendly", "desc": "Cost-effective nutritious meals.", "bias": "budget"},
+    def generate_meal_plan_variations(self, user_id: int, daily_calorie_goal: Optional[float] = None) -> List[Dict[str, Any]]:
+        # 10 presets, 3 days each (for brevity), planned concurrently on the plan pool
+        snapshot = self._planning_snapshot()
+        calories = daily_calorie_goal or DEFAULT_DAILY_CALORIES
+        week_start = _week_start()
+        key = f"variations:{user_id}:{calories}:{week_start}:{snapshot.fingerprint}"
+        cached = self.plan_cache.get(key)
+        if cached is not None:
+            return cached
+
+        start_date = datetime.combine(week_start, datetime.min.time())
+        jobs = [
+            (MacroTargets.for_goal(calories * preset["calorie_factor"], None, preset["split"]), 3,
+             plan_seed(f"{key}:{preset['name']}"))
+            for preset in PLAN_PRESETS
         ]
-        
-        start_date = datetime.utcnow()
-        all_foods = self.food_repo.find_all()
-        # Normalize to list of dicts
-        food_list = []
-        for f in all_foods:
-             if isinstance(f, dict): food_list.append(f)
-             else: food_list.append(f.dict())
-             
-        if not food_list:
-            food_list = [{"name": "Generic Food", "calories": 100, "protein": 5, "carbs": 10, "fats": 2, "is_custom": False}]
-
-        for preset in presets:
-            meals = []
-            # Filtering logic (Mocked for now as we don't have tags in DB yet)
-            # In a real app, we'd filter food_list based on preset['bias']
-            
-            # Create a 3-day plan for brevity (or 7)
-            for i in range(3): 
-                day_date = start_date + timedelta(days=i)
-                for meal_type in ["breakfast", "lunch", "dinner"]:
-                    # Randomized selection for variety
-                    food = random.choice(food_list)
-                    food_copy = food.copy()
-                    if "id" in food_copy: del food_copy["id"]
-                    if "_id" in food_copy: del food_copy["_id"]
-                    
-                    meals.append({
-                        "date": day_date.isoformat(),
-                        "meal_type": meal_type,
-                        "food": food_copy
-                    })
-            
-            grocery_list = self._generate_grocery_list(meals)
-            
+        weeks = self.plan_pool.plan_many(snapshot.planner, jobs)
+
+        # Tags don't exist in the DB yet, so presets differ by calories and macro split only.
+        # One dict per distinct food, shared by every meal that uses it.
+        foods: Dict[int, Dict[str, Any]] = {}
+        variations = []
+        for preset, week, (_, _, seed) in zip(PLAN_PRESETS, weeks, jobs):
+            if week:
+                meals = self._render_meals(snapshot.records, week, start_date, foods)
+            else:
+                meals = self._fallback_meals(snapshot.records, start_date, 3, random.Random(seed),
+                                             {"name": "Generic Food", "calories": 100, "protein": 5, "carbs": 10, "fats": 2, "is_custom": False})
+
             variations.append({
                 "goal_name": preset["name"],
                 "description": preset["desc"],
                 "meals": meals,
-                "grocery_list": grocery_list
+                "grocery_list": self._generate_grocery_list(meals)
             })
-            
+
+        self.plan_cache.put(key, user_id, snapshot.fingerprint, variations)
         return variations
 
+    def _render_meals(self, records: Tuple[FoodRecord, ...], week, start_date: datetime,
+                      foods: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        meals = []
+        for i, day in enumerate(week):
+            day_date = start_date + timedelta(days=i)
+            for planned in day:
+                food = foods.get(planned.food_index)
+                if food is None:
+                    food = foods[planned.food_index] = records[planned.food_index].as_dict()
+                    del food["id"]
+                meals.append({
+                    "date": day_date.isoformat(),
+                    "meal_type": planned.meal_type,
+                    "food": food,
+                    "servings": planned.servings,
+                })
+        return meals
+
+    def _fallback_meals(self, records: Tuple[FoodRecord, ...], start_date: datetime, days: int,
+                        rng: random.Random, default_food: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Random (but seeded) picks, as before the planner
+        food_list = [record.as_dict() for record in records] or [default_food]
+        meals = []
+        for i in range(days):
+            day_date = start_date + timedelta(days=i)
+            for meal_type in ["breakfast", "lunch", "dinner"]:
+                food_copy = rng.choice(food_list).copy()
+                food_copy.pop("id", None)
+                meals.append({"date": day_date.isoformat(), "meal_type": meal_type, "food": food_copy})
+        return meals
+
     def _generate_grocery_list(self, meals: List[Dict]) -> List[str]:
         # Simple aggregation
         counts = {}
@@ -1,32 +1,30 @@
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import jwt, JWTError
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
 from repositories.user_repository import UserRepository
+from services.password_hasher import PasswordHashPool
 from interfaces.services import IAuthenticationService
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from settings import Settings
 
 class AuthenticationService(IAuthenticationService):
-    def __init__(self):
+    def __init__(self, settings: Optional[Settings] = None, hash_pool: Optional[PasswordHashPool] = None):
+        if settings is None or hash_pool is None:
+            # Standalone use (scripts, tests) borrows the application-wide settings and pool
+            from container import get_container
+            container = get_container()
+            settings = settings or container.settings
+            hash_pool = hash_pool or container.hash_pool
         self.user_repo = UserRepository()
-        self.SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key-for-development-only")
-        self.ALGORITHM = "HS256"
-        self.ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-        self.ph = PasswordHasher()
+        self.SECRET_KEY = settings.secret_key
+        self.ALGORITHM = settings.algorithm
+        self.ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+        self.hash_pool = hash_pool
 
     def verify_password(self, plain_password, hashed_password):
-        try:
-            self.ph.verify(hashed_password, plain_password)
-            return True
-        except VerifyMismatchError:
-            return False
+        return self.hash_pool.verify(hashed_password, plain_password)
 
     def get_password_hash(self, password):
-        return self.ph.hash(password)
+        return self.hash_pool.hash(password)
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
         to_encode = data.copy()
@@ -0,0 +1,102 @@
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple, TypeVar
+import threading
+import time
+
+T = TypeVar("T")
+
+class FoodRecord(NamedTuple):
+    """Compact, immutable view of a FoodItem row: just what planning and recognition read."""
+    id: int
+    name: str
+    calories: float
+    protein: float
+    carbs: float
+    fats: float
+    image_url: Optional[str]
+    is_custom: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+class FoodCatalog:
+    """
+    Process-wide snapshot of the food table for read-mostly consumers (planner,
+    recognizer), so they stop reloading every row on every call.
+    Writers bump the version once their transaction commits; the next reader
+    rebuilds the snapshot. Snapshots older than max_age_seconds are also rebuilt,
+    so changes made by other workers or offline scripts converge, and such a
+    rebuild that finds different rows bumps the version as a local write would.
+    """
+    def __init__(self, loader: Callable[[], Iterable[Tuple]], max_age_seconds: float = 300.0):
+        self._loader = loader
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._version = 0
+        self._built_version = -1
+        self._built_at = 0.0
+        self._records: Tuple[FoodRecord, ...] = ()
+        # name -> (snapshot it was built from, value)
+        self._derived: Dict[str, Tuple[Tuple[FoodRecord, ...], Any]] = {}
+        self._rebuilds = 0
+        self._bumps = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+            self._bumps += 1
+
+    def records(self) -> Tuple[FoodRecord, ...]:
+        if self._is_fresh():
+            return self._records
+        # One rebuild at a time; readers that queued behind it reuse its result
+        with self._build_lock:
+            if self._is_fresh():
+                return self._records
+            # Capture the version before reading: a bump racing the load leaves the
+            # snapshot marked stale rather than hiding the write until the next bump
+            version = self._version
+            records = tuple(FoodRecord(*row) for row in self._loader())
+            with self._lock:
+                # Expired, not bumped, yet the rows differ: another process wrote to the table
+                if version == self._built_version == self._version and records != self._records:
+                    self._version += 1
+                    self._bumps += 1
+                    version = self._version
+                self._records = records
+                self._built_version = version
+                self._built_at = time.monotonic()
+                self._rebuilds += 1
+            return records
+
+    def derived(self, name: str, build: Callable[[Tuple[FoodRecord, ...]], T]) -> T:
+        """
+        Value computed from the current snapshot (e.g. the planner's macro matrix),
+        built once per snapshot and shared by every caller until the next rebuild.
+        """
+        records = self.records()
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] is records:
+            return cached[1]
+        value = build(records)
+        with self._lock:
+            self._derived[name] = (records, value)
+        return value
+
+    def _is_fresh(self) -> bool:
+        return self._built_version == self._version and time.monotonic() - self._built_at < self.max_age_seconds
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self._version,
+                "built_version": self._built_version,
+                "size": len(self._records),
+                "rebuilds": self._rebuilds,
+                "bumps": self._bumps,
+                "max_age_seconds": self.max_age_seconds,
+            }
@@ -0,0 +1,250 @@
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, TypeVar
+import codecs
+import csv
+import gzip
+import io
+import json
+import math
+import time
+from sqlmodel import Session
+from database import UnitOfWork
+from repositories.food_repository import FoodRepository
+from repositories.meal_repository import MACRO_FIELDS
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib parser
+    orjson = None
+
+T = TypeVar("T")
+
+IMPORT_FORMATS = ("csv", "ndjson")
+DEFAULT_CHUNK_SIZE = 5000
+MAX_NAME_LENGTH = 255
+# Anything above this per serving is a unit mix-up (kJ, mg) rather than a food
+MAX_MACRO_VALUE = 10_000.0
+# Invalid records are counted; only the first few are described in the report
+MAX_REPORTED_ERRORS = 20
+
+# Column -> accepted field names, first present wins: our own columns, FoodData Central
+# (fdc_id, description) and Open Food Facts (code, product_name, *_100g) exports
+FIELD_ALIASES = {
+    "source_id": ("source_id", "fdc_id", "fdcId", "code"),
+    "name": ("name", "description", "food_name", "product_name"),
+    "calories": ("calories", "energy_kcal", "kcal", "energy-kcal_100g"),
+    "protein": ("protein", "protein_g", "proteins_100g"),
+    "carbs": ("carbs", "carbohydrates", "carbohydrate", "carbohydrate_g", "carbohydrates_100g"),
+    "fats": ("fats", "fat", "total_fat", "fat_g", "fat_100g"),
+    "image_url": ("image_url", "image_front_url"),
+}
+# FoodData Central nutrient numbers in a record's foodNutrients, in order of preference
+# (Foundation foods often carry only the Atwater energy values, 957/958)
+FDC_NUTRIENTS = {
+    "calories": ("208", "957", "958"),
+    "protein": ("203",),
+    "carbs": ("205",),
+    "fats": ("204",),
+}
+
+class InvalidFoodRecord(ValueError):
+    """A record that cannot become a FoodItem; it is counted and skipped, the import goes on."""
+
+def detect_format(filename: str) -> Optional[str]:
+    name = filename.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+def open_text(stream: BinaryIO, filename: str = "") -> TextIO:
+    """Text view of an uploaded or opened dump: gunzipped for *.gz, UTF-8 with or without a BOM."""
+    if filename.lower().endswith(".gz"):
+        stream = gzip.GzipFile(fileobj=stream, mode="rb")
+    if hasattr(stream, "readable"):
+        return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    # SpooledTemporaryFile (upload bodies) only became a full IOBase in Python 3.11
+    return codecs.getreader("utf-8-sig")(stream)
+
+def read_records(text: TextIO, fmt: str) -> Iterator[Any]:
+    """
+    Raw records, lazily: a dict per CSV row or the text of each NDJSON line (parsed by
+    normalize_record, so one malformed line is one invalid record). Blank lines are not
+    records, which keeps offsets stable between runs over the same file.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(text)
+    elif fmt == "ndjson":
+        for line in text:
+            if line.strip():
+                yield line
+    else:
+        raise ValueError(f"Unknown import format '{fmt}', expected one of {IMPORT_FORMATS}")
+
+def _loads(line: str) -> Any:
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+def _number(value: Any, column: str) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidFoodRecord(f"{column} is not a number: {value!r}")
+    if not math.isfinite(number) or number < 0 or number > MAX_MACRO_VALUE:
+        raise InvalidFoodRecord(f"{column} out of range: {value!r}")
+    return number
+
+def normalize_record(record: Any, source_prefix: str = "") -> Dict[str, Any]:
+    """
+    Maps one raw record onto FoodItem columns: the first field present per FIELD_ALIASES,
+    macros from FoodData Central foodNutrients when the record has no flat columns, and
+    the remaining scalar fields (plus any nutrient amounts) kept in `details`.
+    Raises InvalidFoodRecord without a name and calories.
+    """
+    if isinstance(record, str):
+        try:
+            record = _loads(record)
+        except ValueError as exc:
+            raise InvalidFoodRecord(f"invalid JSON: {exc}")
+    if not isinstance(record, dict):
+        raise InvalidFoodRecord("expected an object")
+
+    values: Dict[str, Any] = {}
+    used = set()
+    for column, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            value = record.get(alias)
+            if value is not None and value != "":
+                values[column] = value
+                used.add(alias)
+                break
+
+    details: Dict[str, Any] = {}
+    nutrients = record.get("foodNutrients")
+    if isinstance(nutrients, list):
+        used.add("foodNutrients")
+        by_number: Dict[str, Any] = {}
+        amounts: Dict[str, Any] = {}
+        for entry in nutrients:
+            if not isinstance(entry, dict):
+                continue
+            # Full exports nest the nutrient; abridged ones flatten it
+            nutrient = entry.get("nutrient") if isinstance(entry.get("nutrient"), dict) else entry
+            amount = entry.get("amount", entry.get("value"))
+            if amount is None:
+                continue
+            number = str(nutrient.get("number") or nutrient.get("nutrientNumber") or "")
+            by_number.setdefault(number, amount)
+            name = nutrient.get("name") or nutrient.get("nutrientName")
+            if name:
+                amounts[name] = amount
+        for column, numbers in FDC_NUTRIENTS.items():
+            if column not in values:
+                found = next((by_number[number] for number in numbers if number in by_number), None)
+                if found is not None:
+                    values[column] = found
+        if amounts:
+            details["nutrients"] = amounts
+
+    name = str(values.get("name", "")).strip()
+    if not name:
+        raise InvalidFoodRecord("missing name")
+    if len(name) > MAX_NAME_LENGTH:
+        raise InvalidFoodRecord(f"name longer than {MAX_NAME_LENGTH} characters")
+    if "calories" not in values:
+        raise InvalidFoodRecord("missing calories")
+
+    source_id = values.get("source_id")
+    if source_id is not None:
+        source_id = str(source_id).strip()
+        source_id = f"{source_prefix}:{source_id}" if source_prefix else source_id
+    for key, value in record.items():
+        if key not in used and isinstance(value, (str, int, float, bool)) and value != "":
+            details[key] = value
+    row = {column: _number(values.get(column, 0), column) for column in MACRO_FIELDS}
+    row.update(name=name, source_id=source_id or None, image_url=values.get("image_url"), details=details)
+    return row
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+@dataclass
+class ImportReport:
+    # Records before `offset` were skipped without being parsed (resumed run)
+    offset: int = 0
+    read: int = 0
+    written: int = 0
+    invalid: int = 0
+    skipped: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def next_offset(self) -> int:
+        """Offset to resume from: every record up to here is committed (or was invalid)."""
+        return self.offset + self.read
+
+    @property
+    def records_per_second(self) -> float:
+        return self.read / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "offset": self.offset,
+            "next_offset": self.next_offset,
+            "read": self.read,
+            "written": self.written,
+            "invalid": self.invalid,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "records_per_second": round(self.records_per_second, 1),
+        }
+
+class FoodImporter:
+    """
+    Streams a nutrition dump into the global food catalog: raw records are read lazily,
+    normalized and written `chunk_size` at a time, each chunk one transaction of
+    executemany upserts (FoodRepository.upsert_imported). Memory stays flat whatever the
+    file size, and an interrupted import resumes from the last reported next_offset;
+    re-importing records already written updates them in place.
+    """
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, source_prefix: str = "",
+                 food_repo: Optional[FoodRepository] = None):
+        self.chunk_size = chunk_size
+        # Namespaces source ids when several dumps are imported ("fdc" -> "fdc:171688")
+        self.source_prefix = source_prefix
+        self.food_repo = food_repo or FoodRepository()
+
+    def run(self, records: Iterable[Any], session: Session, offset: int = 0,
+            progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+        report = ImportReport(offset=offset)
+        started = time.perf_counter()
+        for chunk in chunked(islice(records, offset, None), self.chunk_size):
+            rows = []
+            for position, record in enumerate(chunk, report.next_offset + 1):
+                try:
+                    rows.append(normalize_record(record, self.source_prefix))
+                except InvalidFoodRecord as exc:
+                    report.invalid += 1
+                    if len(report.errors) < MAX_REPORTED_ERRORS:
+                        report.errors.append({"record": position, "error": str(exc)})
+            if rows:
+                # Commits this chunk alone, also inside a request's unit of work
+                with UnitOfWork(session):
+                    written, skipped = self.food_repo.upsert_imported(rows)
+                report.written += written
+                report.skipped += skipped
+            report.read += len(chunk)
+            report.elapsed_seconds = time.perf_counter() - started
+            if progress is not None:
+                progress(report)
+        return report
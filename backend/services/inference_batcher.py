@@ -0,0 +1,117 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import contextvars
+import threading
+import time
+import anyio.to_thread
+
+class InferenceQueueFull(Exception):
+    """Raised when the batcher already has as many requests waiting as it is allowed to queue."""
+
+class InferenceBatcher:
+    """
+    Groups concurrent inference requests into batches. The first waiting request opens
+    a batch; it is dispatched once `max_batch_size` requests have joined or `max_wait_ms`
+    has passed, whichever comes first. `run_batch` gets the items in arrival order, runs
+    on a worker thread (never the event loop) and returns one result per item, which is
+    handed back to each awaiting request. Batches run one at a time, so requests that
+    arrive during a run simply form the next batch. Requests beyond `max_queue` waiting
+    are rejected immediately instead of piling up behind the model.
+    """
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 max_wait_ms: float = 5.0, max_queue: int = 64):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue = max_queue
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional["asyncio.Queue[Tuple[Any, asyncio.Future, float]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._largest = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        queue = self._ensure_worker()
+        if queue.qsize() >= self.max_queue:
+            with self._lock:
+                self._rejected += 1
+            raise InferenceQueueFull()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    def _ensure_worker(self) -> "asyncio.Queue":
+        # Bound to the running loop; a new loop (tests, reloads) gets a fresh queue and worker
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def _run(self):
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch([entry for entry in batch if not entry[1].done()])
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        if not batch:
+            return
+        started = time.perf_counter()
+        items = [item for item, _, _ in batch]
+        try:
+            # Empty context: the batch serves many requests, so it must not see the
+            # unit of work (or anything else) of the request that started the worker
+            results = await anyio.to_thread.run_sync(contextvars.Context().run, self.run_batch, items)
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finished = time.perf_counter()
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._largest = max(self._largest, len(batch))
+            self._wait_total += sum(started - submitted for _, _, submitted in batch)
+            self._run_total += finished - started
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            batches = self._batches or 1
+            items = self._items or 1
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "max_queue": self.max_queue,
+                "queued": self._queue.qsize() if self._queue is not None else 0,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / batches, 2),
+                "largest_batch": self._largest,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": round(self._wait_total / items * 1000, 2),
+                "avg_batch_run_ms": round(self._run_total / batches * 1000, 2),
+            }
@@ -0,0 +1,170 @@
+"""
+Macro-targeting meal planner.
+
+The catalog is a (foods x 4) matrix of calories, protein, carbs and fats. Each
+meal slot gets a share of the day's targets, and every food gets a serving size
+(quarter steps) that brings it close to the slot's calories. The rest is array
+arithmetic, so a week's plan costs milliseconds even for 100k foods:
+
+1. Each slot scores every food against its slot target and keeps a pool of the
+   best few hundred (argpartition, the only O(foods) step).
+2. All combinations of the top few dozen per slot are scored at once by
+   broadcasting (K^3 day totals) and one of the best few is picked, for
+   variety between days.
+3. One round of local search re-picks each slot from its whole pool given the
+   other two slots, which fixes combinations the pruning missed.
+
+Foods already used earlier in the week are skipped while alternatives exist.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import time
+import numpy as np
+
+# (meal type, share of the day's targets)
+MEAL_SLOTS: Tuple[Tuple[str, float], ...] = (("breakfast", 0.25), ("lunch", 0.40), ("dinner", 0.35))
+
+# Share of calories from protein, carbs and fats per profile goal (see UserProfileService.calculate_bmr_tdee)
+MACRO_SPLITS = {
+    "lose": (0.30, 0.40, 0.30),
+    "maintain": (0.20, 0.50, 0.30),
+    "gain": (0.25, 0.50, 0.25),
+}
+KCAL_PER_GRAM = np.array([4.0, 4.0, 9.0])
+DEFAULT_DAILY_CALORIES = 2000.0
+
+# Relative-error weights for calories, protein, carbs, fats: calories matter most
+SCORE_WEIGHTS = np.array([2.0, 1.0, 0.5, 0.5])
+SCORE_SCALE = np.sqrt(SCORE_WEIGHTS)
+MIN_SERVINGS, MAX_SERVINGS, SERVING_STEP = 0.5, 2.0, 0.25
+# Foods per slot kept after the catalog-wide pass; all per-day work happens inside these
+SEARCH_POOL = 512
+# Foods per slot combined exhaustively (K^3 day totals)
+CANDIDATES_PER_SLOT = 32
+# A day's pick is drawn from this many of its best-scoring combinations
+DAY_CHOICES = 4
+
+@dataclass(frozen=True)
+class MacroTargets:
+    calories: float
+    protein: float
+    carbs: float
+    fats: float
+
+    @classmethod
+    def for_goal(cls, daily_calories: Optional[float], goal: Optional[str],
+                 split: Optional[Tuple[float, float, float]] = None) -> "MacroTargets":
+        calories = float(daily_calories or DEFAULT_DAILY_CALORIES)
+        protein_share, carbs_share, fats_share = split or MACRO_SPLITS.get(goal or "maintain", MACRO_SPLITS["maintain"])
+        grams = calories * np.array([protein_share, carbs_share, fats_share]) / KCAL_PER_GRAM
+        return cls(calories, *(round(float(g), 1) for g in grams))
+
+    def as_array(self) -> np.ndarray:
+        return np.array([self.calories, self.protein, self.carbs, self.fats])
+
+@dataclass(frozen=True)
+class PlannedMeal:
+    meal_type: str
+    food_index: int
+    servings: float
+
+class MealPlanner:
+    def __init__(self, macros: np.ndarray):
+        """`macros` is the catalog as rows of (calories, protein, carbs, fats) per serving."""
+        self.macros = np.asarray(macros, dtype=np.float64).reshape(-1, 4)
+        # Foods without calories cannot be portioned towards a target
+        self.usable = self.macros[:, 0] > 0
+        self.usable_count = int(self.usable.sum())
+        self._per_calorie = np.divide(1.0, self.macros[:, 0], out=np.zeros(len(self.macros)), where=self.usable)
+
+    def plan(self, targets: MacroTargets, days: int = 7, rng: Optional[np.random.Generator] = None,
+             deadline: Optional[float] = None) -> List[List[PlannedMeal]]:
+        """
+        `deadline` (time.monotonic()) bounds the work: days planned after it keep their
+        best combination without the local-search pass, which trades a little accuracy
+        for a result on time.
+        """
+        if not self.usable.any():
+            return []
+        rng = rng or np.random.default_rng()
+        target = targets.as_array()
+
+        # The only pass over the whole catalog. A food's error against a slot's share at
+        # s servings is (macros * s / target - share), so its weighted squared error expands
+        # to s^2 * q2 - 2 * share * s * q1 + share^2 * sum(w): two matrix-vector products
+        # per plan, then plain vector arithmetic per slot. The best SEARCH_POOL foods per
+        # slot are kept, best first, with their macros in units of the day's target.
+        q1 = self.macros @ (SCORE_WEIGHTS / target)
+        q2 = (self.macros ** 2) @ (SCORE_WEIGHTS / target ** 2)
+        keep = min(SEARCH_POOL, self.usable_count)
+        pools = []
+        for _, share in MEAL_SLOTS:
+            servings = self._servings(share * target[0])
+            score = servings * (servings * q2 - 2.0 * share * q1)
+            score[~self.usable] = np.inf
+            top = np.argpartition(score, keep - 1)[:keep]
+            top = top[np.argsort(score[top], kind="stable")]
+            pools.append((top, servings[top], self.macros[top] * servings[top, None] / target))
+
+        used: set = set()
+        week = []
+        for _ in range(days):
+            picks = self._best_combination(pools, used, rng)
+            if deadline is None or time.monotonic() < deadline:
+                picks = self._local_search(pools, picks, used)
+            chosen = [int(pool[0][pick]) for pool, pick in zip(pools, picks)]
+            used.update(chosen)
+            week.append([
+                PlannedMeal(meal_type, food_index, float(pool[1][pick]))
+                for (meal_type, _), pool, pick, food_index in zip(MEAL_SLOTS, pools, picks, chosen)
+            ])
+        return week
+
+    def day_totals(self, day: Sequence[PlannedMeal]) -> np.ndarray:
+        return sum(self.macros[meal.food_index] * meal.servings for meal in day)
+
+    def _servings(self, slot_calories: float) -> np.ndarray:
+        servings = np.round(self._per_calorie * (slot_calories / SERVING_STEP)) * SERVING_STEP
+        return np.clip(servings, MIN_SERVINGS, MAX_SERVINGS, out=servings)
+
+    @staticmethod
+    def _score(relative_error: np.ndarray) -> np.ndarray:
+        return (relative_error ** 2) @ SCORE_WEIGHTS
+
+    @staticmethod
+    def _available(pool_foods: np.ndarray, used: set) -> np.ndarray:
+        """Mask of pool entries not used earlier in the week (all of them if none are left)."""
+        if not used:
+            return np.ones(len(pool_foods), dtype=bool)
+        fresh = ~np.isin(pool_foods, np.fromiter(used, dtype=np.int64, count=len(used)))
+        return fresh if fresh.any() else np.ones(len(pool_foods), dtype=bool)
+
+    def _best_combination(self, pools, used, rng) -> List[int]:
+        """Positions (within each slot's pool) of a day's combination, drawn from the best few."""
+        positions = [np.flatnonzero(self._available(foods, used))[:CANDIDATES_PER_SLOT] for foods, _, _ in pools]
+        a, b, c = (relative[slot_positions] * SCORE_SCALE for (_, _, relative), slot_positions in zip(pools, positions))
+        # Weighted squared error of every (a, b, c) as |x + c|^2 = |x|^2 + 2 x.c + |c|^2 over the
+        # K^2 partial days x = a + b - 1: one small matmul instead of a K^3 x 4 intermediate
+        partial = (a[:, None, :] + b[None, :, :] - SCORE_SCALE).reshape(-1, 4)
+        flat = (np.einsum("ij,ij->i", partial, partial)[:, None] + 2.0 * partial @ c.T
+                + np.einsum("ij,ij->i", c, c)[None, :]).ravel()
+        shape = (len(a), len(b), len(c))
+        choices = min(DAY_CHOICES, flat.size)
+        best = np.argpartition(flat, choices - 1)[:choices]
+        pick = rng.choice(best[np.argsort(flat[best], kind="stable")])
+        return [int(slot_positions[i]) for slot_positions, i in zip(positions, np.unravel_index(pick, shape))]
+
+    def _local_search(self, pools, picks: List[int], used) -> List[int]:
+        """Re-pick each slot from its whole pool given the other two slots; keep improvements."""
+        picks = list(picks)
+        for slot, (foods, _, relative) in enumerate(pools):
+            others = sum(pools[s][2][picks[s]] for s in range(len(pools)) if s != slot)
+            score = self._score(relative + (others - 1.0))
+            score[~self._available(foods, used)] = np.inf
+            # The same food twice in one day is not a plan
+            taken = [int(pools[s][0][picks[s]]) for s in range(len(pools)) if s != slot]
+            score[np.isin(foods, taken)] = np.inf
+            best = int(np.argmin(score))
+            if score[best] < score[picks[slot]]:
+                picks[slot] = best
+        return picks
@@ -1,20 +1,31 @@
-from repositories.food_repository import FoodRepository
-from repositories.meal_repository import MealRepository
+from repositories.food_repository import FoodRepository, DEFAULT_SEARCH_LIMIT
+from repositories.meal_repository import MealRepository, HISTORY_PAGE_SIZE, MACRO_FIELDS, macros_from_snapshot
+from repositories.pagination import Page
+from repositories.rollup_repository import RollupRepository
 from interfaces.services import IMealService
-from typing import List, Dict, Any
-from datetime import datetime
+from services.food_catalog import FoodCatalog
+from database import run_after_commit
+from typing import List, Dict, Any, Optional
+from datetime import datetime, date, timedelta
 
 class MealService(IMealService):
-    def __init__(self):
+    def __init__(self, food_catalog: Optional[FoodCatalog] = None):
+        if food_catalog is None:
+            from container import get_container
+            food_catalog = get_container().food_catalog
+        self.food_catalog = food_catalog
         self.food_repo = FoodRepository()
         self.meal_repo = MealRepository()
+        self.rollup_repo = RollupRepository()
 
-    def search_foods(self, query: str) -> List[Any]:
-        return self.food_repo.search_foods(query)
+    def search_foods(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT, cursor: Optional[str] = None) -> Page:
+        return self.food_repo.search_foods(query, limit, cursor)
 
     def add_custom_food(self, food_data: Dict[str, Any]) -> Any:
         # food_data might check for is_custom in repo
-        return self.food_repo.add_custom_food(food_data)
+        food = self.food_repo.add_custom_food(food_data)
+        run_after_commit(self.food_catalog.bump)
+        return food
 
     def log_meal(self, user_id: int, meal_data: Dict[str, Any]) -> Any:
         # meal_data comes from MealLogCreate (has 'food_item' dict, no 'food_item_id')
@@ -52,31 +63,142 @@ class MealService(IMealService):
             "meal_type": meal_data["meal_type"],
             "food_snapshot": food_item
         }
-        return self.meal_repo.log_meal(user_id, repo_payload)
+        meal = self.meal_repo.log_meal(user_id, repo_payload)
+        # Same unit of work as the insert, so the rollup can never drift from the log
+        self.rollup_repo.apply_meal(meal)
+        return meal
 
-    def get_meal_history(self, user_id: int) -> List[Any]:
-        return self.meal_repo.get_history(user_id)
+    def log_meals(self, user_id: int, meals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Bulk version of log_meal: foods without an id are matched to global foods (same
+        name and macros) or, like log_meal, become custom foods, created once per distinct
+        food; then every log and the day rollups are written with one executemany each.
+        Returns one result per entry, in order.
+        """
+        results: List[Dict[str, Any]] = [{"index": i, "ok": False, "id": None, "food_item_id": None, "error": None} for i in range(len(meals))]
+        food_ids: List[Optional[int]] = [None] * len(meals)
+        new_food_keys: Dict[int, tuple] = {}
+
+        for i, meal_data in enumerate(meals):
+            food_item = meal_data.get("food_item") or {}
+            food_id = food_item.get("id") or food_item.get("_id")
+            if food_id:
+                try:
+                    food_ids[i] = int(food_id)
+                except (TypeError, ValueError):
+                    results[i]["error"] = "food_item.id must be an integer"
+            elif "name" in food_item and "calories" in food_item:
+                macros = macros_from_snapshot(food_item)
+                new_food_keys[i] = (str(food_item["name"]), *(macros[field] for field in MACRO_FIELDS))
+            else:
+                results[i]["error"] = "food_item needs an id, or a name and calories"
+
+        # Foreign keys are not enforced by SQLite: an unknown id would log a meal of no food
+        supplied = {i: food_id for i, food_id in enumerate(food_ids) if food_id is not None}
+        existing = self.food_repo.existing_ids(supplied.values())
+        for i, food_id in supplied.items():
+            if food_id not in existing:
+                food_ids[i] = None
+                results[i]["error"] = "food_item.id not found"
+
+        if new_food_keys:
+            resolved = self.food_repo.find_global_ids_by_key(new_food_keys.values())
+            missing = list(dict.fromkeys(key for key in new_food_keys.values() if key not in resolved))
+            created_keys = set(missing)
+            if missing:
+                created = self.food_repo.insert_many([
+                    {"name": key[0], **dict(zip(MACRO_FIELDS, key[1:])), "is_custom": True, "details": {}}
+                    for key in missing
+                ])
+                resolved.update(zip(missing, created))
+                run_after_commit(self.food_catalog.bump)
+            for i, key in new_food_keys.items():
+                food_ids[i] = resolved[key]
+                meals[i]["food_item"]["is_custom"] = key in created_keys
+
+        rows, row_indexes, day_totals = [], [], {}
+        for i, meal_data in enumerate(meals):
+            if food_ids[i] is None:
+                continue
+            snapshot = meal_data.get("food_item") or {}
+            macros = macros_from_snapshot(snapshot)
+            rows.append({
+                "user_id": user_id,
+                "food_item_id": food_ids[i],
+                "date": meal_data["date"],
+                "meal_type": meal_data["meal_type"],
+                "food_snapshot": snapshot,
+                **macros,
+            })
+            row_indexes.append(i)
+
+            day = meal_data["date"].date()
+            totals = day_totals.setdefault(day, {"user_id": user_id, "day": day, "calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0, "meal_count": 0})
+            for field in MACRO_FIELDS:
+                totals[field] += macros[field]
+            totals["meal_count"] += 1
+
+        for i, meal_id in zip(row_indexes, self.meal_repo.insert_many(rows)):
+            results[i].update(ok=True, id=meal_id, food_item_id=food_ids[i])
+        # Same unit of work as the inserts, one upsert row per day touched
+        self.rollup_repo.apply_totals(list(day_totals.values()))
+        return results
+
+    def delete_meal(self, user_id: int, meal_id: int) -> bool:
+        meal = self.meal_repo.find_by_id(meal_id)
+        if meal is None or meal.user_id != user_id:
+            return False
+        self.rollup_repo.apply_meal(meal, sign=-1)
+        return self.meal_repo.delete_one(meal_id)
+
+    def get_meal_history(self, user_id: int, limit: int = HISTORY_PAGE_SIZE, cursor: Optional[str] = None) -> Page:
+        return self.meal_repo.get_history(user_id, limit, cursor)
 
     def get_daily_summary(self, user_id: int) -> Dict[str, Any]:
-        summary = self.meal_repo.get_daily_summary(user_id)
-        
-        # summary is already a dict from repo: {"calories": ..., "protein": ...}
-        # The frontend expects a nested structure?
-        # Original service returned: {"today": { "calories": ... }}
-        # models.py endpoint return summary directly.
-        # Let's check main.py @app.get("/analytics/summary")
-        # It calls get_daily_summary() then adds "goal". 
-        # The original service logic calculated sums here. I moved that logic to the repository.
-        # Repository returns flat dict: {'calories': 0, 'protein': 0, ...}
-        # If frontend expects "today" key, I should add it, or check frontend code.
-        # But looking at old code: it returned {"today": {...}}. 
-        # Let's duplicate that structure to be safe.
-        
+        # Primary-key lookup on the maintained rollup instead of re-aggregating the day
+        rollup = self.rollup_repo.get_day(user_id, datetime.now().date())
         return {
             "today": {
-                "calories": summary["calories"],
-                "protein": summary["protein"],
-                "carbs": summary["carbs"],
-                "fats": summary["fats"]
+                "calories": rollup.calories if rollup else 0,
+                "protein": rollup.protein if rollup else 0,
+                "carbs": rollup.carbs if rollup else 0,
+                "fats": rollup.fats if rollup else 0
             }
         }
+
+    def get_range_summary(self, user_id: int, start: date, end: date, granularity: str) -> Dict[str, Any]:
+        totals = {row["start"]: row for row in self.rollup_repo.get_range_totals(user_id, start, end, granularity)}
+
+        # Fill empty buckets with zeros so charts get a continuous series
+        buckets = []
+        for bucket_start in self._bucket_starts(start, end, granularity):
+            key = bucket_start.isoformat()
+            buckets.append(totals.get(key) or {
+                "start": key, "calories": 0, "protein": 0, "carbs": 0, "fats": 0,
+                "meals_count": 0, "days_logged": 0,
+            })
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "granularity": granularity,
+            "buckets": buckets,
+        }
+
+    def _bucket_starts(self, start: date, end: date, granularity: str) -> List[date]:
+        if granularity == "week":
+            current = start - timedelta(days=start.weekday())
+        elif granularity == "month":
+            current = start.replace(day=1)
+        else:
+            current = start
+
+        starts = []
+        while current <= end:
+            starts.append(current)
+            if granularity == "day":
+                current += timedelta(days=1)
+            elif granularity == "week":
+                current += timedelta(weeks=1)
+            else:
+                current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return starts
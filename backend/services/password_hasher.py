@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
+import threading
+import time
+
+class HashPoolSaturated(Exception):
+    """Raised when the hashing pool already has as many jobs as it is allowed to queue."""
+
+class PasswordHashPool:
+    """
+    Runs Argon2 hashing/verification on a small dedicated thread pool.
+    Argon2 releases the GIL, so the workers hash in parallel while the request threads
+    just wait. Jobs beyond `max_workers + max_pending` are rejected immediately
+    instead of piling up behind a login storm.
+    """
+    def __init__(self, max_workers: int = 4, max_pending: int = 16, hasher: Optional[PasswordHasher] = None):
+        self.ph = hasher or PasswordHasher()
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="argon2")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    def hash(self, password: str) -> str:
+        return self._run(self.ph.hash, password)
+
+    def verify(self, hashed_password: str, plain_password: str) -> bool:
+        return self._run(self._verify, hashed_password, plain_password)
+
+    def _verify(self, hashed_password: str, plain_password: str) -> bool:
+        try:
+            return self.ph.verify(hashed_password, plain_password)
+        except VerifyMismatchError:
+            return False
+
+    def _run(self, fn: Callable, *args) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashPoolSaturated()
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                self._record(started - submitted, finished - started)
+
+        try:
+            return self._executor.submit(job).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _record(self, wait: float, run: float):
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._run_total += run
+            self._run_max = max(self._run_max, run)
+
+    def warm_up(self, wait: bool = True):
+        # Start every worker thread and touch Argon2's memory before the first login.
+        # Without `wait` this runs behind the server: an early login just queues behind it.
+        futures = [self._executor.submit(self.ph.hash, "warm-up") for _ in range(self.max_workers)]
+        if wait:
+            for future in futures:
+                future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": round(self._wait_total / completed * 1000, 2),
+                "max_queue_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2),
+                "max_run_ms": round(self._run_max * 1000, 2),
+            }
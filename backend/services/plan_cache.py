@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from json_responses import dumps
+
+def plan_seed(key: str) -> int:
+    """Stable 64-bit seed for a cache key: same inputs, same plan, in any process."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+class PlanCache:
+    """
+    Bounded LRU of generated plans. Keys name everything a plan depends on (user,
+    targets, week start, catalog fingerprint), and plans are seeded from their key,
+    so a cached plan is exactly what regenerating it would produce.
+
+    Entries belong to one catalog fingerprint: the first lookup under a new one drops
+    every entry built from another. Profile updates drop the user's entries.
+    With `spill_path`, entries pushed out of memory are kept in a SQLite file (up to
+    `spill_max_entries`) and promoted back on a hit, so they also survive restarts.
+    Cached payloads are shared between requests and must be treated as read-only.
+    """
+    def __init__(self, max_entries: int = 256, spill_path: Optional[str] = None, spill_max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.spill_max_entries = spill_max_entries
+        self._entries: "OrderedDict[str, Tuple[int, str, Any]]" = OrderedDict()
+        self._catalog: Optional[str] = None
+        self._lock = threading.Lock()
+        self._spill: Optional[sqlite3.Connection] = None
+        if spill_path:
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False, isolation_level=None)
+            self._spill.execute("PRAGMA journal_mode=WAL")
+            self._spill.execute(
+                "CREATE TABLE IF NOT EXISTS plan_cache ("
+                "key TEXT PRIMARY KEY, user_id INTEGER NOT NULL, catalog TEXT NOT NULL, "
+                "payload BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._spill.execute("CREATE INDEX IF NOT EXISTS ix_plan_cache_user_id ON plan_cache (user_id)")
+        self._hits = 0
+        self._spill_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def use_catalog(self, catalog: str):
+        """Switch to `catalog` (a snapshot fingerprint), dropping plans built from any other."""
+        with self._lock:
+            if catalog == self._catalog:
+                return
+            stale = [key for key, (_, entry_catalog, _) in self._entries.items() if entry_catalog != catalog]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM plan_cache WHERE catalog != ?", (catalog,))
+            self._catalog = catalog
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[2]
+            row = None
+            if self._spill is not None:
+                row = self._spill.execute(
+                    "SELECT user_id, catalog, payload FROM plan_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._spill_hits += 1
+        user_id, catalog, payload = row
+        value = json.loads(payload)
+        self.put(key, user_id, catalog, value)
+        return value
+
+    def put(self, key: str, user_id: int, catalog: str, value: Any):
+        with self._lock:
+            self._entries[key] = (user_id, catalog, value)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False))
+                self._evictions += 1
+            if self._spill is not None and evicted:
+                self._spill_entries(evicted)
+
+    def _spill_entries(self, evicted):
+        now = time.time()
+        self._spill.executemany(
+            "INSERT OR REPLACE INTO plan_cache (key, user_id, catalog, payload, stored_at) VALUES (?, ?, ?, ?, ?)",
+            [(key, user_id, catalog, dumps(value), now) for key, (user_id, catalog, value) in evicted],
+        )
+        # Oldest spilled plans go first once the file is over its bound
+        self._spill.execute(
+            "DELETE FROM plan_cache WHERE key IN (SELECT key FROM plan_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.spill_max_entries,),
+        )
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            keys = [key for key, (entry_user, _, _) in self._entries.items() if entry_user == user_id]
+            for key in keys:
+                del self._entries[key]
+            self._invalidations += len(keys)
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM plan_cache WHERE user_id = ?", (user_id,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._catalog = None
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM plan_cache")
+
+    def close(self):
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._spill_hits + self._misses
+            spilled = self._spill.execute("SELECT COUNT(*) FROM plan_cache").fetchone()[0] if self._spill is not None else 0
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "spilled": spilled,
+                "hits": self._hits,
+                "spill_hits": self._spill_hits,
+                "misses": self._misses,
+                "hit_rate": round((self._hits + self._spill_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,216 @@
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import math
+import threading
+import time
+import numpy as np
+from services.meal_planner import MacroTargets, MealPlanner, PlannedMeal
+
+# (targets, days, seed) for one plan
+PlanJob = Tuple[MacroTargets, int, int]
+Week = List[List[PlannedMeal]]
+
+# Worker-process state: the shared block it is attached to and a planner over it
+_worker_shared: Optional[SharedMemory] = None
+_worker_planner: Optional[MealPlanner] = None
+
+def _worker_ping() -> bool:
+    return True
+
+def _worker_plan(shared_name: str, rows: int, job: PlanJob, budget_seconds: float) -> Week:
+    """Runs in a pool process: plans against the published macro matrix without copying it."""
+    global _worker_shared, _worker_planner
+    started = time.monotonic()
+    if _worker_shared is None or _worker_shared.name != shared_name:
+        if _worker_shared is not None:
+            _worker_shared.close()
+        _worker_shared = SharedMemory(name=shared_name)
+        _worker_planner = MealPlanner(np.ndarray((rows, 4), dtype=np.float64, buffer=_worker_shared.buf))
+    targets, days, seed = job
+    return _worker_planner.plan(targets, days, rng=np.random.default_rng(seed), deadline=started + budget_seconds)
+
+class PlanPool:
+    """
+    Plans several weeks at once (the /plans/variations presets) on a small process pool.
+
+    The catalog's macro matrix is published once per snapshot into shared memory; tasks
+    carry only its name, so workers map the same read-only pages instead of unpickling
+    the catalog per task. Each block counts the tasks submitted against it, and a block
+    superseded by a newer snapshot is unlinked only once the last of them is done.
+    Each plan gets `budget_seconds`: the worker stops refining days past it, and plans
+    the pool has not returned in time are finished inline without refinement. Catalogs
+    under `inline_max_foods` (or `max_workers=0`) are planned inline, where the pool's
+    IPC would cost more than it saves.
+    """
+    def __init__(self, max_workers: int = 4, budget_seconds: float = 0.25, inline_max_foods: int = 2000):
+        self.max_workers = max_workers
+        self.budget_seconds = budget_seconds
+        self.inline_max_foods = inline_max_foods
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._shared: Optional[SharedMemory] = None
+        self._published_for: Optional[MealPlanner] = None
+        # Every block still linked (the current one and superseded ones still in use) -> unfinished tasks
+        self._blocks: Dict[str, SharedMemory] = {}
+        self._refs: Dict[str, int] = {}
+        self._pooled = 0
+        self._inline = 0
+        self._late = 0
+        self._failed = 0
+        self._batches = 0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    def uses_pool(self, planner: MealPlanner) -> bool:
+        return self.max_workers > 0 and planner.usable_count > 0 and len(planner.macros) >= self.inline_max_foods
+
+    def plan_many(self, planner: MealPlanner, jobs: Sequence[PlanJob]) -> List[Week]:
+        started = time.perf_counter()
+        if self.uses_pool(planner):
+            weeks = self._plan_pooled(planner, jobs)
+        else:
+            weeks = [self._plan_inline(planner, job, time.monotonic() + self.budget_seconds) for job in jobs]
+            with self._lock:
+                self._inline += len(jobs)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._batches += 1
+            self._run_total += elapsed
+            self._run_max = max(self._run_max, elapsed)
+        return weeks
+
+    def _plan_inline(self, planner: MealPlanner, job: PlanJob, deadline: float) -> Week:
+        targets, days, seed = job
+        return planner.plan(targets, days, rng=np.random.default_rng(seed), deadline=deadline)
+
+    def _plan_pooled(self, planner: MealPlanner, jobs: Sequence[PlanJob]) -> List[Week]:
+        with self._lock:
+            executor = self._ensure_executor()
+            shared_name = self._publish(planner)
+            # Held until each task is done, so a newer snapshot cannot unlink the block under it
+            self._refs[shared_name] += len(jobs)
+        futures: List[Future] = []
+        for job in jobs:
+            try:
+                future = executor.submit(_worker_plan, shared_name, len(planner.macros), job, self.budget_seconds)
+            except RuntimeError as exc:
+                # Broken or shut down pool: the job is planned inline below like a failed one
+                future = Future()
+                future.set_exception(exc)
+            future.add_done_callback(lambda _, name=shared_name: self._release_block(name))
+            futures.append(future)
+        # Jobs queue behind each other when there are more plans than workers
+        rounds = math.ceil(len(jobs) / self.max_workers)
+        wait(futures, timeout=self.budget_seconds * (rounds + 1))
+
+        weeks: List[Week] = []
+        late = failed = 0
+        for future, job in zip(futures, jobs):
+            if future.done() and not future.cancelled() and future.exception() is None:
+                weeks.append(future.result())
+                continue
+            if future.done():
+                failed += 1
+                if isinstance(future.exception(), BrokenProcessPool):
+                    self._reset_executor(executor)
+            else:
+                future.cancel()
+                late += 1
+            # Out of time (or the worker died): best combinations only, no refinement
+            weeks.append(self._plan_inline(planner, job, deadline=0.0))
+        with self._lock:
+            self._pooled += len(jobs) - late - failed
+            self._late += late
+            self._failed += failed
+        return weeks
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs server threads can copy held locks
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=get_context("spawn"))
+        return self._executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _publish(self, planner: MealPlanner) -> str:
+        """Shared-memory name of `planner`'s matrix, copied in once per catalog snapshot. Caller holds the lock."""
+        if self._published_for is not planner:
+            shared = SharedMemory(create=True, size=planner.macros.nbytes)
+            np.ndarray(planner.macros.shape, dtype=np.float64, buffer=shared.buf)[:] = planner.macros
+            previous = self._shared
+            self._shared = shared
+            self._published_for = planner
+            self._blocks[shared.name] = shared
+            self._refs[shared.name] = 0
+            if previous is not None and self._refs[previous.name] == 0:
+                self._unlink_block(previous.name)
+        return self._shared.name
+
+    def _release_block(self, name: str):
+        with self._lock:
+            if name not in self._refs:
+                return
+            self._refs[name] -= 1
+            if self._refs[name] == 0 and (self._shared is None or self._shared.name != name):
+                self._unlink_block(name)
+
+    def _unlink_block(self, name: str):
+        # Unlinking only drops the name: workers still mapping the block keep it until they move on
+        shared = self._blocks.pop(name)
+        del self._refs[name]
+        shared.close()
+        shared.unlink()
+
+    def _release_shared(self):
+        # Shutdown: every task was cancelled or abandoned, so no block is needed any more
+        for name in list(self._blocks):
+            self._unlink_block(name)
+        self._shared = None
+        self._published_for = None
+
+    def warm_up(self, wait: bool = True):
+        # Spawning a worker imports NumPy; pay for it at startup, not on the first request.
+        # Without `wait` the workers start behind the server; plans that cannot wait for
+        # them fall back to inline planning as usual.
+        if self.max_workers <= 0:
+            return
+        with self._lock:
+            executor = self._ensure_executor()
+        futures = [executor.submit(_worker_ping) for _ in range(self.max_workers)]
+        if wait:
+            for future in futures:
+                future.result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        # Outside the lock: cancelling runs the tasks' release callbacks, which take it
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._release_shared()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "started": self._executor is not None,
+                "budget_ms": round(self.budget_seconds * 1000, 2),
+                "inline_max_foods": self.inline_max_foods,
+                "pooled": self._pooled,
+                "inline": self._inline,
+                "late": self._late,
+                "failed": self._failed,
+                "shared_bytes": sum(block.size for block in self._blocks.values()),
+                "shared_blocks": len(self._blocks),
+                "batches": self._batches,
+                "avg_batch_ms": round(self._run_total / (self._batches or 1) * 1000, 2),
+                "max_batch_ms": round(self._run_max * 1000, 2),
+            }
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from models import User
+import threading
+import time
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of authenticated users keyed by token subject (email), so
+    get_current_user does not query the database on every request.
+    Entries are stored as plain dicts and rebuilt into detached User objects on
+    read, so no request can share or mutate another request's instance.
+    A miss takes generation() before reading the user and hands it to put(): if an
+    invalidation happened in between, the row read may predate it and is not stored.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        # Bumped by every invalidate()/clear(); puts carrying an older value are dropped
+        self._generation = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[subject]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self._hits += 1
+            data = entry[1]
+        return User(**data)
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, subject: str, user: User, generation: int):
+        data = user.model_dump()
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, data)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(subject, None) is not None:
+                self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
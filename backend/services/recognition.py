@@ -0,0 +1,105 @@
+from importlib import import_module
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+import hashlib
+import numpy as np
+from PIL import Image, ImageOps, UnidentifiedImageError
+from interfaces.services import IFoodRecognizer
+from services.food_catalog import FoodRecord
+from upload_limits import InvalidImage
+
+# Square RGB input the recognizer receives
+MODEL_INPUT_SIZE = 224
+# Refuse images whose header promises more pixels than any phone camera produces
+MAX_IMAGE_PIXELS = 64_000_000
+
+def load_model_input(fileobj: BinaryIO, size: int = MODEL_INPUT_SIZE) -> np.ndarray:
+    """
+    Decodes an uploaded image into a (size, size, 3) uint8 array: upright per its EXIF
+    orientation, center-cropped to a square and downscaled. CPU-bound, so call it from
+    a worker thread. JPEGs are decoded at a reduced scale (the decoder's 1/2..1/8 DCT
+    scaling), so a 12 MP phone photo is never expanded to full size in memory.
+    """
+    try:
+        with Image.open(fileobj) as image:
+            if image.width * image.height > MAX_IMAGE_PIXELS:
+                raise InvalidImage(f"{image.width}x{image.height} image is too large")
+            # Square request: the scale chosen works for either EXIF orientation
+            image.draft("RGB", (size * 2, size * 2))
+            upright = ImageOps.exif_transpose(image).convert("RGB")
+            return np.asarray(ImageOps.fit(upright, (size, size), Image.Resampling.BILINEAR))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        raise InvalidImage(str(exc) or "Unreadable image") from exc
+
+def perceptual_hash(pixels: np.ndarray) -> int:
+    """
+    64-bit dHash of a model-input image: the sign of the brightness step between
+    neighbours on a 9x8 grayscale thumbnail. Re-encoding, rescaling and small shifts
+    in lighting or framing change only a few bits, so near-duplicate photos end up
+    within a small Hamming distance of each other.
+    """
+    small = np.asarray(Image.fromarray(pixels).convert("L").resize((9, 8), Image.Resampling.BOX), dtype=np.int16)
+    return int(np.packbits(small[:, 1:] > small[:, :-1]).view(">u8")[0])
+
+class DigestRecognizer(IFoodRecognizer):
+    """
+    Deterministic CPU stand-in for a vision model: maps the model-input pixels to a
+    catalog food by hash, so the same photo always gives the same answer (tests, demos).
+    """
+    def recognize(self, pixels: np.ndarray, foods: Sequence[FoodRecord]) -> Optional[FoodRecord]:
+        if not foods:
+            return None
+        digest = hashlib.blake2b(np.ascontiguousarray(pixels).tobytes(), digest_size=8).digest()
+        return foods[int.from_bytes(digest, "big") % len(foods)]
+
+class ProjectionRecognizer(IFoodRecognizer):
+    """
+    CPU stand-in shaped like a real model, for batching and load tests: pixels are
+    average-pooled to 56x56, projected through a fixed random matrix (the "backbone",
+    one matrix product per batch) and matched against per-food embeddings (the "head").
+    Deterministic for a given seed and catalog.
+    """
+    POOL = 4
+    FEATURES = 512
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        side = MODEL_INPUT_SIZE // self.POOL
+        inputs = side * side * 3
+        rng = np.random.default_rng(seed)
+        self.weights = rng.standard_normal((inputs, self.FEATURES), dtype=np.float32) / np.float32(np.sqrt(inputs))
+        # (catalog snapshot, its food embeddings), rebuilt when the snapshot changes
+        self._head: Optional[Tuple[Sequence[FoodRecord], np.ndarray]] = None
+
+    def _food_embeddings(self, foods: Sequence[FoodRecord]) -> np.ndarray:
+        head = self._head
+        if head is None or head[0] is not foods:
+            rng = np.random.default_rng([self.seed, len(foods)])
+            head = self._head = (foods, rng.standard_normal((len(foods), self.FEATURES), dtype=np.float32))
+        return head[1]
+
+    def recognize(self, pixels: np.ndarray, foods: Sequence[FoodRecord]) -> Optional[FoodRecord]:
+        return self.recognize_batch(pixels[None], foods)[0]
+
+    def recognize_batch(self, pixels: np.ndarray, foods: Sequence[FoodRecord]) -> List[Optional[FoodRecord]]:
+        if not foods:
+            return [None] * len(pixels)
+        count = len(pixels)
+        # POOL x POOL sums as strided adds in uint16 (max 16 * 255), far cheaper than a reshaped mean
+        rows = pixels[:, 0::self.POOL].astype(np.uint16)
+        for offset in range(1, self.POOL):
+            rows += pixels[:, offset::self.POOL]
+        pooled = rows[:, :, 0::self.POOL].copy()
+        for offset in range(1, self.POOL):
+            pooled += rows[:, :, offset::self.POOL]
+        scaled = pooled.reshape(count, -1).astype(np.float32) / np.float32(255 * self.POOL * self.POOL) - np.float32(0.5)
+        features = np.tanh(scaled @ self.weights)
+        best = np.argmax(features @ self._food_embeddings(foods).T, axis=1)
+        return [foods[i] for i in best]
+
+def load_recognizer(path: str) -> IFoodRecognizer:
+    """Instantiates a recognizer from a "module:Class" path (the RECOGNIZER setting)."""
+    module_name, _, class_name = path.partition(":")
+    recognizer = getattr(import_module(module_name), class_name)()
+    if not isinstance(recognizer, IFoodRecognizer):
+        raise TypeError(f"{path} is not an IFoodRecognizer")
+    return recognizer
@@ -0,0 +1,178 @@
+from typing import Any, Container, Dict, List, Optional, Sequence, Tuple
+import sqlite3
+import threading
+import time
+import numpy as np
+
+# Bits set per byte value, for Hamming distances on NumPy versions without bitwise_count
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+def hamming_distances(hashes: np.ndarray, image_hash: int) -> np.ndarray:
+    """Bits differing between `image_hash` and each 64-bit hash in `hashes`."""
+    differing = hashes ^ np.uint64(image_hash)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(differing)
+    return _BYTE_POPCOUNT[differing.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+class RecognitionCache:
+    """
+    Recent recognition results keyed by perceptual hash, so a photo of the same plate
+    or package is answered without running the model. A lookup scans every cached
+    hash at once (XOR + popcount over a NumPy array) and counts the nearest one
+    within `max_distance` bits as a hit.
+
+    Results are stored as food ids (None for "not recognized"), so hits are served
+    from the current catalog snapshot; entries for foods deleted since are dropped.
+    Bounded to `max_entries`, least recently used evicted first. With `path`, entries
+    are written through to a SQLite file and the most recently stored are reloaded on
+    start (hits only refresh recency in memory, keeping writes off the hit path); rows are tagged with
+    `model`, so switching recognizers never serves another model's answers.
+    """
+    def __init__(self, max_entries: int = 2048, max_distance: int = 6, path: Optional[str] = None, model: str = ""):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.model = model
+        self._hashes = np.zeros(max_entries, dtype=np.uint64)
+        self._food_ids: List[Optional[int]] = [None] * max_entries
+        self._used = np.zeros(max_entries, dtype=np.float64)
+        self._slots: Dict[int, int] = {}  # hash -> slot
+        self._count = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._evictions = 0
+        self._lookup_total = 0.0
+        self._inference_total = 0.0
+        self._inferred = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS recognition_cache ("
+                "model TEXT NOT NULL, image_hash TEXT NOT NULL, food_id INTEGER, used_at REAL NOT NULL, "
+                "PRIMARY KEY (model, image_hash))"
+            )
+            rows = self._db.execute(
+                "SELECT image_hash, food_id, used_at FROM recognition_cache WHERE model = ? ORDER BY used_at DESC LIMIT ?",
+                (model, max_entries),
+            ).fetchall()
+            for image_hash, food_id, used_at in reversed(rows):
+                self._insert(int(image_hash, 16), food_id, used_at)
+            if len(rows) == max_entries:
+                # Rows that did not fit (a larger cache in an earlier run) would never be loaded again
+                self._db.execute("DELETE FROM recognition_cache WHERE model = ? AND used_at < ?", (model, rows[-1][2]))
+
+    def lookup(self, image_hash: int, food_ids: Container[int]) -> Tuple[bool, Optional[int]]:
+        """
+        (hit, food id) for the nearest cached hash within max_distance. `food_ids` are the
+        ids in the current catalog: an entry pointing at a food no longer in it is dropped.
+        """
+        started = time.perf_counter()
+        found = False
+        food_id = None
+        with self._lock:
+            if self._count:
+                distances = hamming_distances(self._hashes[:self._count], image_hash)
+                nearest = int(np.argmin(distances))
+                if distances[nearest] <= self.max_distance:
+                    food_id = self._food_ids[nearest]
+                    if food_id is None or food_id in food_ids:
+                        found = True
+                        self._used[nearest] = time.time()
+                    else:
+                        self._stale += 1
+                        self._remove(nearest)
+                        food_id = None
+            if found:
+                self._hits += 1
+            else:
+                self._misses += 1
+            self._lookup_total += time.perf_counter() - started
+        return found, food_id
+
+    def store(self, results: Sequence[Tuple[int, Optional[int]]], inference_seconds: float):
+        """Caches (hash, food id) results of one model run that took `inference_seconds`."""
+        now = time.time()
+        with self._lock:
+            self._inferred += len(results)
+            self._inference_total += inference_seconds
+            evicted = []
+            for image_hash, food_id in results:
+                evicted.extend(self._insert(image_hash, food_id, now))
+            if self._db is not None:
+                if evicted:
+                    self._db.executemany("DELETE FROM recognition_cache WHERE model = ? AND image_hash = ?",
+                                         [(self.model, f"{h:016x}") for h in evicted])
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO recognition_cache (model, image_hash, food_id, used_at) VALUES (?, ?, ?, ?)",
+                    [(self.model, f"{image_hash:016x}", food_id, now) for image_hash, food_id in results],
+                )
+
+    def _insert(self, image_hash: int, food_id: Optional[int], used_at: float) -> List[int]:
+        evicted = []
+        slot = self._slots.get(image_hash)
+        if slot is None:
+            if self._count < self.max_entries:
+                slot = self._count
+                self._count += 1
+            else:
+                slot = int(np.argmin(self._used))
+                old_hash = int(self._hashes[slot])
+                del self._slots[old_hash]
+                evicted.append(old_hash)
+                self._evictions += 1
+            self._hashes[slot] = image_hash
+            self._slots[image_hash] = slot
+        self._food_ids[slot] = food_id
+        self._used[slot] = used_at
+        return evicted
+
+    def _remove(self, slot: int):
+        removed = int(self._hashes[slot])
+        del self._slots[removed]
+        # Keep the live entries contiguous: move the last one into the freed slot
+        last = self._count - 1
+        if slot != last:
+            self._hashes[slot] = self._hashes[last]
+            self._food_ids[slot] = self._food_ids[last]
+            self._used[slot] = self._used[last]
+            self._slots[int(self._hashes[slot])] = slot
+        self._count = last
+        if self._db is not None:
+            self._db.execute("DELETE FROM recognition_cache WHERE model = ? AND image_hash = ?",
+                             (self.model, f"{removed:016x}"))
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._count = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM recognition_cache WHERE model = ?", (self.model,))
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            avg_inference_ms = self._inference_total / self._inferred * 1000 if self._inferred else 0.0
+            avg_lookup_ms = self._lookup_total / lookups * 1000 if lookups else 0.0
+            return {
+                "size": self._count,
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+                "hits": self._hits,
+                "misses": self._misses,
+                "stale": self._stale,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "avg_lookup_ms": round(avg_lookup_ms, 3),
+                "avg_inference_ms": round(avg_inference_ms, 3),
+                # Each hit skipped one model run at the average measured cost of a miss
+                "saved_ms": round(self._hits * max(avg_inference_ms - avg_lookup_ms, 0.0), 1),
+            }
@@ -0,0 +1,54 @@
+from repositories.sync_repository import SyncRepository
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 2000
+
+class SyncService:
+    def __init__(self):
+        self.sync_repo = SyncRepository()
+
+    def changes_since(self, user_id: int, since: int, limit: int = DEFAULT_SYNC_LIMIT) -> Dict[str, Any]:
+        """
+        Everything the user can see that changed after sequence `since`: upserted meals,
+        foods and profile, plus deletions. At most `limit` changes are returned, oldest
+        first; pass `next` back as `since` until `has_more` is false.
+        """
+        limit = max(1, min(limit, MAX_SYNC_LIMIT))
+        # Read before the streams: anything committed later has a higher sequence and is
+        # picked up by the following sync, never skipped
+        current = self.sync_repo.current_seq()
+
+        # Each stream is fetched with limit + 1 so the merged cut below is exact
+        changes: List[Tuple[int, str, Any]] = []
+        changes += [(seq, "meal", meal) for meal, seq in self.sync_repo.meals_since(user_id, since, limit + 1)]
+        changes += [(seq, "food", food) for food, seq in self.sync_repo.foods_since(since, limit + 1)]
+        changes += [(t.seq, "deleted", t) for t in self.sync_repo.tombstones_since(user_id, since, limit + 1)]
+        profile = self.sync_repo.profile_since(user_id, since)
+        if profile is not None:
+            changes.append((profile[1], "profile", profile[0]))
+        changes = [change for change in sorted(changes, key=lambda change: change[0]) if change[0] <= current]
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        result: Dict[str, Any] = {
+            "since": since,
+            # Without more pages the client can jump to the global head, skipping other users' changes
+            "next": changes[-1][0] if has_more else max(current, since),
+            "has_more": has_more,
+            "meals": [],
+            "foods": [],
+            "profile": None,
+            "deleted": {"meals": [], "foods": []},
+        }
+        for _, kind, item in changes:
+            if kind == "meal":
+                result["meals"].append(item.model_dump())
+            elif kind == "food":
+                result["foods"].append(item.model_dump())
+            elif kind == "profile":
+                result["profile"] = item.model_dump(exclude={"hashed_password"})
+            else:
+                result["deleted"][f"{item.entity}s"].append(item.entity_id)
+        return result
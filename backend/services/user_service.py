@@ -1,10 +1,19 @@
 from repositories.user_repository import UserRepository
 from interfaces.services import IUserProfileService
+from services.principal_cache import PrincipalCache
+from services.plan_cache import PlanCache
+from database import run_after_commit
 from typing import Dict, Any, Optional
 
 class UserProfileService(IUserProfileService):
-    def __init__(self):
+    def __init__(self, principal_cache: Optional[PrincipalCache] = None, plan_cache: Optional[PlanCache] = None):
+        if principal_cache is None or plan_cache is None:
+            from container import get_container
+            principal_cache = principal_cache or get_container().principal_cache
+            plan_cache = plan_cache or get_container().plan_cache
         self.user_repo = UserRepository()
+        self.principal_cache = principal_cache
+        self.plan_cache = plan_cache
 
     def get_profile(self, user_id: int) -> Optional[Any]:
         return self.user_repo.find_by_id(user_id)
@@ -15,7 +24,13 @@ class UserProfileService(IUserProfileService):
             daily_calories = self.calculate_bmr_tdee(update_data)
             update_data["daily_calorie_goal"] = daily_calories
         
-        return self.user_repo.update_user(user_id, update_data)
+        updated_user = self.user_repo.update_user(user_id, update_data)
+        if updated_user is not None:
+            email = updated_user.email
+            run_after_commit(lambda: self.principal_cache.invalidate(email))
+            # New goal or calorie target: the user's cached plans are for the old one
+            run_after_commit(lambda: self.plan_cache.invalidate_user(user_id))
+        return updated_user
 
     def calculate_bmr_tdee(self, data: Dict[str, Any]) -> float:
         # Mifflin-St Jeor Equation
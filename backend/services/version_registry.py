@@ -0,0 +1,47 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import threading
+from repositories.sync_repository import SyncRepository
+
+class VersionRegistry:
+    """
+    Change markers behind the ETags, read from the database instead of counted in process.
+    The sync triggers (migration 8) stamp every food and meal write with the next
+    sync_sequence value, whichever process makes it: API workers or the import CLI.
+    A marker is the highest such stamp in its scope, found with index lookups only, so
+    a 304 costs one small query, every worker issues the same ETag for the same data,
+    and a marker never goes backwards, so an old ETag can never match newer data.
+    """
+    def __init__(self, sync_repo: Optional[SyncRepository] = None):
+        self.sync_repo = sync_repo or SyncRepository()
+        self._lock = threading.Lock()
+        self._reads = 0
+
+    def catalog(self) -> int:
+        """Marker of the food table: changes with every food insert, update or delete."""
+        self._count_read()
+        return self.sync_repo.catalog_marker()
+
+    def meals(self, user_id: int) -> int:
+        """Marker of one user's meal log: changes with every meal they log, edit or delete."""
+        self._count_read()
+        return self.sync_repo.meals_marker(user_id)
+
+    @staticmethod
+    def fingerprint(data: Dict[str, Any]) -> str:
+        """Short content hash, for bodies already in memory (the cached principal)."""
+        encoded = json.dumps(data, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+    def etag(self, *parts: Any) -> str:
+        """Strong ETag over the given marker parts."""
+        return '"' + "-".join(str(part) for part in parts) + '"'
+
+    def _count_read(self):
+        with self._lock:
+            self._reads += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"marker_reads": self._reads}
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment configuration, read once at startup instead of on every service construction."""
+    database_url: str = "sqlite:///database.db"
+    # Storage profile from database.STORAGE_PROFILES; the pool sizes apply to "production"
+    db_profile: str = "production"
+    db_pool_size: int = 10
+    db_pool_max_overflow: int = 20
+    sql_echo: bool = False
+    secret_key: str = "fallback-secret-key-for-development-only"
+    algorithm: str = "HS256"
+    access_token_expire_minutes: int = 30
+    hash_pool_workers: int = 4
+    hash_pool_max_pending: int = 16
+    principal_cache_size: int = 1024
+    principal_cache_ttl: float = 60.0
+    food_catalog_max_age: float = 300.0
+    compression_minimum_size: int = 1024
+    # One plan worker per core, up to 4; on a single core the pool only adds IPC, so plan inline
+    plan_pool_workers: int = min(4, os.cpu_count() or 1) if (os.cpu_count() or 1) > 1 else 0
+    plan_pool_budget: float = 0.25
+    plan_pool_inline_max_foods: int = 2000
+    plan_cache_size: int = 256
+    plan_cache_spill_path: str = ""
+    upload_max_bytes: int = 10 * 1024 * 1024
+    recognizer: str = "services.recognition:DigestRecognizer"
+    recognition_batch_size: int = 16
+    recognition_batch_wait_ms: float = 5.0
+    recognition_queue_depth: int = 64
+    recognition_cache_size: int = 2048
+    recognition_cache_max_distance: int = 6
+    recognition_cache_path: str = ""
+    import_chunk_size: int = 5000
+    import_max_bytes: int = 1024 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            database_url=os.getenv("DATABASE_URL", cls.database_url),
+            db_profile=os.getenv("DB_PROFILE", cls.db_profile),
+            db_pool_size=int(os.getenv("DB_POOL_SIZE", str(cls.db_pool_size))),
+            db_pool_max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", str(cls.db_pool_max_overflow))),
+            sql_echo=os.getenv("SQL_ECHO", "false").lower() == "true",
+            secret_key=os.getenv("SECRET_KEY", cls.secret_key),
+            access_token_expire_minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", str(cls.access_token_expire_minutes))),
+            hash_pool_workers=int(os.getenv("HASH_POOL_WORKERS", str(cls.hash_pool_workers))),
+            hash_pool_max_pending=int(os.getenv("HASH_POOL_MAX_PENDING", str(cls.hash_pool_max_pending))),
+            principal_cache_size=int(os.getenv("PRINCIPAL_CACHE_SIZE", str(cls.principal_cache_size))),
+            principal_cache_ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", str(cls.principal_cache_ttl))),
+            food_catalog_max_age=float(os.getenv("FOOD_CATALOG_MAX_AGE", str(cls.food_catalog_max_age))),
+            compression_minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", str(cls.compression_minimum_size))),
+            plan_pool_workers=int(os.getenv("PLAN_POOL_WORKERS", str(cls.plan_pool_workers))),
+            plan_pool_budget=float(os.getenv("PLAN_POOL_BUDGET", str(cls.plan_pool_budget))),
+            plan_pool_inline_max_foods=int(os.getenv("PLAN_POOL_INLINE_MAX_FOODS", str(cls.plan_pool_inline_max_foods))),
+            plan_cache_size=int(os.getenv("PLAN_CACHE_SIZE", str(cls.plan_cache_size))),
+            plan_cache_spill_path=os.getenv("PLAN_CACHE_SPILL_PATH", cls.plan_cache_spill_path),
+            upload_max_bytes=int(os.getenv("UPLOAD_MAX_BYTES", str(cls.upload_max_bytes))),
+            recognizer=os.getenv("RECOGNIZER", cls.recognizer),
+            recognition_batch_size=int(os.getenv("RECOGNITION_BATCH_SIZE", str(cls.recognition_batch_size))),
+            recognition_batch_wait_ms=float(os.getenv("RECOGNITION_BATCH_WAIT_MS", str(cls.recognition_batch_wait_ms))),
+            recognition_queue_depth=int(os.getenv("RECOGNITION_QUEUE_DEPTH", str(cls.recognition_queue_depth))),
+            recognition_cache_size=int(os.getenv("RECOGNITION_CACHE_SIZE", str(cls.recognition_cache_size))),
+            recognition_cache_max_distance=int(os.getenv("RECOGNITION_CACHE_MAX_DISTANCE", str(cls.recognition_cache_max_distance))),
+            recognition_cache_path=os.getenv("RECOGNITION_CACHE_PATH", cls.recognition_cache_path),
+            import_chunk_size=int(os.getenv("IMPORT_CHUNK_SIZE", str(cls.import_chunk_size))),
+            import_max_bytes=int(os.getenv("IMPORT_MAX_BYTES", str(cls.import_max_bytes))),
+        )
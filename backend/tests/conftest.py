@@ -11,6 +11,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from main import app, get_current_user, get_auth_service
 from database import get_session
+from migrations import run_migrations
 from models import User, FoodItem
 from services.auth_service import AuthenticationService
 
@@ -23,6 +24,7 @@ def session_fixture():
         poolclass=StaticPool
     )
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
     with Session(engine) as session:
         # Mock close to prevent app from closing the test session
         session.close = MagicMock()
@@ -71,6 +73,18 @@ def patch_get_session(session):
     with patch("repositories.base.get_session", side_effect=mock_get_session):
         yield
 
+@pytest.fixture(autouse=True)
+def reset_process_caches():
+    # Every test starts from a fresh database, so cached users, foods, plans and recognitions from earlier tests are stale
+    from container import get_container
+    container = get_container()
+    container.principal_cache.clear()
+    container.food_catalog.bump()
+    container.plan_cache.clear()
+    container.recognition_cache.clear()
+    yield
+    container.principal_cache.clear()
+
 @pytest.fixture(name="test_user")
 def test_user_fixture(session, client):
     # Create a user in the DB
@@ -28,3 +28,200 @@ def test_generate_meal_plan(client, auth_headers):
     assert "meal_type" in first_meal
     assert "food" in first_meal
     assert "date" in first_meal
+
+def test_planner_reads_versioned_food_catalog(client, auth_headers, session):
+    from container import get_container
+    from models import FoodItem
+    catalog = get_container().food_catalog
+
+    session.add(FoodItem(name="Oatmeal", calories=150, protein=5, carbs=27, fats=3, is_custom=False))
+    session.commit()
+    # Writes outside the app paths are only seen after a bump (or the max-age refresh)
+    catalog.bump()
+
+    client.post("/plans/generate", headers=auth_headers)
+    rebuilds = catalog.metrics()["rebuilds"]
+    plan = client.post("/plans/generate", headers=auth_headers).json()
+    assert {m["food"]["name"] for m in plan["meals"]} == {"Oatmeal"}
+    assert "id" not in plan["meals"][0]["food"]
+    # Unchanged catalog: served from the snapshot, no reload
+    assert catalog.metrics()["rebuilds"] == rebuilds
+
+    version = catalog.version
+    response = client.post("/foods", json={"name": "Protein Shake", "calories": 200, "protein": 30, "carbs": 8, "fats": 3}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert catalog.version == version + 1
+    names = {r.name for r in catalog.records()}
+    assert names == {"Oatmeal", "Protein Shake"}
+
+    recognized = client.post("/ai/recognize", headers=auth_headers).json()
+    assert recognized["name"] in names
+
+def test_expired_catalog_rebuild_bumps_version_only_on_changes():
+    from services.food_catalog import FoodCatalog
+    rows = [(1, "Oatmeal", 150, 5, 27, 3, None, False)]
+    catalog = FoodCatalog(lambda: list(rows), max_age_seconds=0)
+
+    catalog.records()
+    version = catalog.version
+    catalog.records()
+    assert catalog.version == version
+
+    # Another process added a food: the age-triggered rebuild reports it as a new version
+    rows.append((2, "Lentils", 116, 9, 20, 0.4, None, False))
+    assert len(catalog.records()) == 2
+    assert catalog.version == version + 1
+
+def test_plan_hits_calorie_and_macro_targets(client, auth_headers, session):
+    from container import get_container
+    from models import FoodItem
+    from services.meal_planner import MacroTargets
+    import random
+
+    rng = random.Random(7)
+    for i in range(300):
+        protein, fats = rng.uniform(2, 50), rng.uniform(1, 35)
+        carbs = rng.uniform(5, 90)
+        calories = round(protein * 4 + carbs * 4 + fats * 9)
+        session.add(FoodItem(name=f"Food {i}", calories=calories, protein=protein, carbs=carbs, fats=fats, is_custom=False))
+    session.commit()
+    get_container().food_catalog.bump()
+
+    profile = client.put("/users/profile", json={"weight": 80, "height": 180, "age": 30, "gender": "male",
+                                                 "activity_level": "moderate", "goal": "lose"}, headers=auth_headers).json()
+    targets = MacroTargets.for_goal(profile["daily_calorie_goal"], "lose")
+
+    plan = client.post("/plans/generate", headers=auth_headers).json()
+    assert len(plan["meals"]) == 21
+    days = {}
+    for meal in plan["meals"]:
+        totals = days.setdefault(meal["date"], [0.0, 0.0, 0.0, 0.0])
+        for i, key in enumerate(("calories", "protein", "carbs", "fats")):
+            totals[i] += meal["food"][key] * meal["servings"]
+    assert len(days) == 7
+    for calories, protein, carbs, fats in days.values():
+        assert abs(calories / targets.calories - 1) < 0.05
+        assert abs(protein / targets.protein - 1) < 0.15
+        assert abs(carbs / targets.carbs - 1) < 0.15
+        assert abs(fats / targets.fats - 1) < 0.15
+
+def test_variations_presets_follow_their_macro_split(client, auth_headers, session):
+    from container import get_container
+    from models import FoodItem
+    from services.ai_service import PLAN_PRESETS
+    import random
+
+    rng = random.Random(11)
+    for i in range(300):
+        protein, carbs, fats = rng.uniform(1, 50), rng.uniform(1, 90), rng.uniform(1, 45)
+        session.add(FoodItem(name=f"Food {i}", calories=round(protein * 4 + carbs * 4 + fats * 9),
+                             protein=protein, carbs=carbs, fats=fats, is_custom=False))
+    session.commit()
+    get_container().food_catalog.bump()
+
+    variations = client.post("/plans/variations", headers=auth_headers).json()
+    assert [v["goal_name"] for v in variations] == [p["name"] for p in PLAN_PRESETS]
+    keto = next(v for v in variations if v["goal_name"] == "Keto")
+    vegan = next(v for v in variations if v["goal_name"] == "Vegan")
+
+    def fat_share(variation):
+        fat = sum(m["food"]["fats"] * m["servings"] * 9 for m in variation["meals"])
+        return fat / sum(m["food"]["calories"] * m["servings"] for m in variation["meals"])
+    assert len(keto["meals"]) == 9
+    assert fat_share(keto) > 0.5 > fat_share(vegan)
+
+def test_plan_pool_plans_from_shared_matrix():
+    import numpy as np
+    from multiprocessing.shared_memory import SharedMemory
+    from services.meal_planner import MacroTargets, MealPlanner
+    from services.plan_pool import PlanPool
+
+    rng = np.random.default_rng(3)
+    macros = np.column_stack([rng.uniform(50, 800, 5000), rng.uniform(0, 60, 5000),
+                              rng.uniform(0, 100, 5000), rng.uniform(0, 40, 5000)])
+    planner = MealPlanner(macros)
+    jobs = [(MacroTargets.for_goal(2000, goal), 3, seed) for seed, goal in enumerate(["lose", "maintain", "gain"])]
+
+    pool = PlanPool(max_workers=2, budget_seconds=5.0, inline_max_foods=1000)
+    try:
+        pooled = pool.plan_many(planner, jobs)
+        metrics = pool.metrics()
+        assert metrics["pooled"] == 3 and metrics["late"] == metrics["failed"] == 0
+        assert metrics["shared_bytes"] == macros.nbytes
+        # Same seeds, same matrix: the workers plan exactly what the request thread would
+        inline = PlanPool(max_workers=0).plan_many(planner, jobs)
+        assert pooled == inline
+
+        # A task still queued against the old snapshot's block when a new snapshot is published
+        shared_name = pool._shared.name
+        with pool._lock:
+            pool._refs[shared_name] += 1
+        pool.plan_many(MealPlanner(macros[::-1].copy()), jobs)
+        assert pool.metrics()["failed"] == 0 and pool.metrics()["shared_blocks"] == 2
+        SharedMemory(name=shared_name).close()
+        # ...keeps it linked until that task is done
+        pool._release_block(shared_name)
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=shared_name)
+        shared_name = pool._shared.name
+    finally:
+        pool.shutdown()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=shared_name)
+
+def test_plans_are_seeded_and_cached_until_inputs_change(client, auth_headers, session):
+    from container import get_container
+    from models import FoodItem
+    cache = get_container().plan_cache
+    for i in range(40):
+        session.add(FoodItem(name=f"Food {i}", calories=150 + 15 * i, protein=5 + i % 30, carbs=10 + i % 50,
+                             fats=2 + i % 20, is_custom=False))
+    session.commit()
+    get_container().food_catalog.bump()
+
+    first = client.post("/plans/generate", headers=auth_headers).json()
+    hits = cache.metrics()["hits"]
+    assert client.post("/plans/generate", headers=auth_headers).json() == first
+    assert cache.metrics()["hits"] == hits + 1
+    # Same inputs after the entry is gone: the seed reproduces the same plan
+    cache.clear()
+    assert client.post("/plans/generate", headers=auth_headers).json() == first
+    variations = client.post("/plans/variations", headers=auth_headers).json()
+    assert client.post("/plans/variations", headers=auth_headers).json() == variations
+
+    # A profile update drops the user's plans; the new targets get a new plan
+    client.put("/users/profile", json={"weight": 90, "height": 185, "age": 35, "gender": "male",
+                                       "activity_level": "active", "goal": "gain"}, headers=auth_headers)
+    assert cache.metrics()["size"] == 0
+    regained = client.post("/plans/generate", headers=auth_headers).json()
+    assert regained != first
+
+    # A catalog change moves to a new fingerprint and drops every plan built from the old one
+    client.post("/foods", json={"name": "Protein Shake", "calories": 200, "protein": 30, "carbs": 8, "fats": 3},
+                headers=auth_headers)
+    misses = cache.metrics()["misses"]
+    client.post("/plans/generate", headers=auth_headers)
+    assert cache.metrics()["misses"] == misses + 1
+    assert cache.metrics()["size"] == 1
+
+def test_plan_cache_spills_to_sqlite(tmp_path):
+    from services.plan_cache import PlanCache
+    path = str(tmp_path / "plans.db")
+    cache = PlanCache(max_entries=1, spill_path=path)
+    cache.use_catalog("c1")
+    cache.put("a", 1, "c1", {"meals": [1]})
+    cache.put("b", 2, "c1", {"meals": [2]})
+    assert cache.metrics()["spilled"] == 1
+    assert cache.get("a") == {"meals": [1]}
+    assert cache.metrics()["spill_hits"] == 1
+    cache.close()
+
+    # Spilled plans outlive the process; a new catalog drops them
+    reopened = PlanCache(max_entries=1, spill_path=path)
+    reopened.use_catalog("c1")
+    assert reopened.get("b") == {"meals": [2]}
+    reopened.invalidate_user(2)
+    assert reopened.get("b") is None
+    reopened.use_catalog("c2")
+    assert reopened.metrics()["spilled"] == 0
+    reopened.close()
@@ -61,3 +61,45 @@ def test_get_current_user(client, auth_headers, test_user):
 def test_get_current_user_unauthorized(client):
     response = client.get("/users/me/")
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_login_rejected_when_hash_pool_saturated(client, test_user, monkeypatch):
+    from container import get_container
+    from services.password_hasher import HashPoolSaturated
+
+    def saturated(*args):
+        raise HashPoolSaturated()
+
+    monkeypatch.setattr(get_container().hash_pool, "verify", saturated)
+    response = client.post("/token", data={
+        "username": test_user.email,
+        "password": "testpassword"
+    })
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+def test_hash_pool_rejects_beyond_queue_depth():
+    import threading
+    from services.password_hasher import PasswordHashPool, HashPoolSaturated
+
+    release = threading.Event()
+    started = threading.Event()
+
+    class SlowHasher:
+        def hash(self, password):
+            started.set()
+            release.wait(5)
+            return "hashed"
+
+    pool = PasswordHashPool(max_workers=1, max_pending=0, hasher=SlowHasher())
+    worker = threading.Thread(target=pool.hash, args=("pw",))
+    worker.start()
+    started.wait(5)
+
+    with pytest.raises(HashPoolSaturated):
+        pool.hash("pw")
+
+    release.set()
+    worker.join(5)
+    metrics = pool.metrics()
+    assert metrics["completed"] == 1
+    assert metrics["rejected"] == 1
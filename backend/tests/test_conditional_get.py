@@ -0,0 +1,101 @@
+from fastapi import status
+from datetime import datetime
+from sqlalchemy import event
+from models import FoodItem
+
+def _count_queries(session):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(session.get_bind(), "before_cursor_execute", listener)
+    return statements, lambda: event.remove(session.get_bind(), "before_cursor_execute", listener)
+
+def test_foods_revalidate_with_one_marker_query(client, auth_headers, session):
+    session.add(FoodItem(name="Rice", calories=130, protein=2.7, carbs=28, fats=0.3, is_custom=False))
+    session.commit()
+
+    first = client.get("/foods")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    statements, stop = _count_queries(session)
+    try:
+        cached = client.get("/foods", headers={"If-None-Match": etag})
+    finally:
+        stop()
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+    # Only the catalog marker is read: two index lookups, no listing query
+    assert len(statements) == 1 and "synctombstone" in statements[0]
+
+    # Any catalog write changes the tag
+    client.post("/foods", json={"name": "Beans", "calories": 120, "protein": 8, "carbs": 20, "fats": 1}, headers=auth_headers)
+    fresh = client.get("/foods", headers={"If-None-Match": etag})
+    assert fresh.status_code == status.HTTP_200_OK
+    assert fresh.headers["ETag"] != etag
+    assert {f["name"] for f in fresh.json()} == {"Rice", "Beans"}
+
+def test_foods_etag_follows_writes_from_other_processes(client, session):
+    from container import get_container
+    session.add(FoodItem(name="Rice", calories=130, protein=2.7, carbs=28, fats=0.3, is_custom=False))
+    session.commit()
+    etag = client.get("/foods").headers["ETag"]
+    version = get_container().food_catalog.version
+
+    # What the import CLI does: plain SQL, no service bumps the in-process catalog version
+    session.connection().exec_driver_sql(
+        "INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom, details) VALUES ('Lentils', 116, 9, 20, 0.4, 0, '{}')"
+    )
+    session.commit()
+    fresh = client.get("/foods", headers={"If-None-Match": etag})
+    assert fresh.status_code == status.HTTP_200_OK
+    assert "Lentils" in {f["name"] for f in fresh.json()}
+
+    # Deleting a food that is not the newest one still moves the marker
+    etag = fresh.headers["ETag"]
+    session.connection().exec_driver_sql("DELETE FROM fooditem WHERE name = 'Rice'")
+    session.commit()
+    assert client.get("/foods", headers={"If-None-Match": etag}).status_code == status.HTTP_200_OK
+    assert get_container().food_catalog.version == version
+
+def test_user_scoped_etags_follow_writes(client, auth_headers):
+    summary = client.get("/analytics/summary", headers=auth_headers)
+    me = client.get("/users/me/", headers=auth_headers)
+    assert summary.headers["Cache-Control"] == "private, no-cache"
+    assert client.get("/analytics/summary", headers={**auth_headers, "If-None-Match": summary.headers["ETag"]}).status_code == 304
+    assert client.get("/users/me/", headers={**auth_headers, "If-None-Match": f'W/{me.headers["ETag"]}'}).status_code == 304
+
+    client.post("/meals", json={
+        "date": datetime.now().isoformat(),
+        "meal_type": "lunch",
+        "food_item": {"name": "Soup", "calories": 250, "protein": 10, "carbs": 30, "fats": 8},
+    }, headers=auth_headers)
+    changed = client.get("/analytics/summary", headers={**auth_headers, "If-None-Match": summary.headers["ETag"]})
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.json()["today"]["calories"] == 250
+
+    client.put("/users/profile", json={"age": 52}, headers=auth_headers)
+    updated = client.get("/users/me/", headers={**auth_headers, "If-None-Match": me.headers["ETag"]})
+    assert updated.status_code == status.HTTP_200_OK
+    assert updated.json()["age"] == 52
+
+def test_summary_revalidates_without_reading_rollups(client, auth_headers, session):
+    client.post("/meals", json={
+        "date": datetime.now().isoformat(),
+        "meal_type": "lunch",
+        "food_item": {"name": "Soup", "calories": 250, "protein": 10, "carbs": 30, "fats": 8},
+    }, headers=auth_headers)
+    etag = client.get("/analytics/summary", headers=auth_headers).headers["ETag"]
+
+    statements, stop = _count_queries(session)
+    try:
+        cached = client.get("/analytics/summary", headers={**auth_headers, "If-None-Match": etag})
+    finally:
+        stop()
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    # Only the user's meal marker is read
+    assert len(statements) == 1 and "dailynutritionrollup" not in statements[0]
+
+    # A meal deleted outside the API (no service callback runs) still moves the marker
+    session.connection().exec_driver_sql("DELETE FROM meallog")
+    session.commit()
+    assert client.get("/analytics/summary", headers={**auth_headers, "If-None-Match": etag}).status_code == status.HTTP_200_OK
@@ -0,0 +1,182 @@
+from datetime import datetime
+from sqlalchemy import text
+from sqlmodel import SQLModel
+from database import create_app_engine
+from migrations import MIGRATIONS, pending_migrations, run_migrations
+from repositories.meal_repository import MealRepository
+from repositories.food_repository import FoodRepository
+import pytest
+
+def test_production_profile_applies_pragmas(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'profile.db'}", "production")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL == 1
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert engine.pool.size() == 10
+    engine.dispose()
+
+def test_engine_pool_comes_from_settings(tmp_path):
+    from database import engine_from_settings
+    from settings import Settings
+    engine = engine_from_settings(Settings(database_url=f"sqlite:///{tmp_path / 'sized.db'}", db_pool_size=3))
+    assert engine.pool.size() == 3
+    engine.dispose()
+
+def test_compat_profile_keeps_sqlite_defaults(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'compat.db'}", "compat")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
+
+def test_unknown_profile_rejected():
+    with pytest.raises(ValueError):
+        create_app_engine("sqlite://", "turbo")
+
+def _query_plan(engine, statement):
+    compiled = statement.compile(dialect=engine.dialect)
+    params = [compiled.params[name] for name in compiled.positiontup]
+    params = [p.isoformat(sep=" ") if isinstance(p, datetime) else p for p in params]
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(params)).all()
+    return " | ".join(row[-1] for row in rows)
+
+def _migrated_engine(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'migrated.db'}", "compat")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    return engine
+
+def test_migrations_are_recorded_and_idempotent(tmp_path):
+    engine = _migrated_engine(tmp_path)
+    assert pending_migrations(engine) == []
+    assert run_migrations(engine) == []
+    with engine.connect() as connection:
+        versions = [row[0] for row in connection.exec_driver_sql("SELECT version FROM schema_version ORDER BY version")]
+    assert versions == [m.version for m in MIGRATIONS]
+    engine.dispose()
+
+def test_dry_run_applies_nothing(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'dry.db'}", "compat")
+    SQLModel.metadata.create_all(engine)
+    assert run_migrations(engine, dry_run=True) == MIGRATIONS
+    assert pending_migrations(engine) == MIGRATIONS
+    engine.dispose()
+
+def test_legacy_user_table_gets_is_admin(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'legacy.db'}", "compat")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE user (id INTEGER PRIMARY KEY, email VARCHAR, hashed_password VARCHAR)")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
+    with engine.connect() as connection:
+        columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(user)")}
+    assert "is_admin" in columns
+    engine.dispose()
+
+def test_hot_meal_queries_use_user_date_index(tmp_path):
+    engine = _migrated_engine(tmp_path)
+    repo = MealRepository()
+    now = datetime.utcnow()
+
+    history_plan = _query_plan(engine, repo.history_statement(1))
+    assert "ix_meallog_user_id_date" in history_plan
+    assert "TEMP B-TREE" not in history_plan
+
+    # Later history pages seek on the index instead of scanning past earlier rows
+    page_plan = _query_plan(engine, repo.history_statement(1, before=(now, 42)))
+    assert "ix_meallog_user_id_date" in page_plan
+    assert "TEMP B-TREE" not in page_plan
+    engine.dispose()
+
+def test_food_listing_pages_seek_on_name_index(tmp_path):
+    engine = _migrated_engine(tmp_path)
+    repo = FoodRepository()
+
+    browse_plan = _query_plan(engine, repo.list_statement(51, after=("Apple", 7)))
+    assert "ix_fooditem_name" in browse_plan
+    assert "TEMP B-TREE" not in browse_plan
+
+    global_plan = _query_plan(engine, repo.list_statement(51, after=("Apple", 7), is_custom=False))
+    assert "ix_fooditem_is_custom_name" in global_plan
+    assert "TEMP B-TREE" not in global_plan
+    engine.dispose()
+
+def test_macro_backfill_from_snapshot(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'backfill.db'}", "compat")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine, target=3)
+    with engine.begin() as connection:
+        # Simulate a pre-migration database: the macro columns do not exist yet
+        for column in ("calories", "protein", "carbs", "fats"):
+            connection.exec_driver_sql(f"ALTER TABLE meallog DROP COLUMN {column}")
+        connection.exec_driver_sql(
+            "INSERT INTO meallog (user_id, food_item_id, date, meal_type, food_snapshot) "
+            "VALUES (1, 1, '2024-01-01 12:00:00', 'lunch', '{\"name\": \"Soup\", \"calories\": 210, \"protein\": 9.5}')"
+        )
+    run_migrations(engine)
+    with engine.connect() as connection:
+        row = connection.exec_driver_sql("SELECT calories, protein, carbs, fats FROM meallog").one()
+    assert tuple(row) == (210.0, 9.5, 0.0, 0.0)
+    engine.dispose()
+
+def test_sync_sequence_backfill_and_triggers(tmp_path):
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'sync.db'}", "compat")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine, target=7)
+    with engine.begin() as connection:
+        for name in ("Soup", "Bread"):
+            connection.exec_driver_sql(
+                f"INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom) VALUES ('{name}', 1, 1, 1, 1, 0)"
+            )
+    run_migrations(engine)
+    with engine.begin() as connection:
+        # Existing rows get distinct sequence numbers below the head
+        seqs = [row[0] for row in connection.exec_driver_sql("SELECT change_seq FROM fooditem ORDER BY id")]
+        assert len(set(seqs)) == 2 and 0 not in seqs
+        head = connection.exec_driver_sql("SELECT value FROM sync_sequence").scalar()
+        assert head == max(seqs)
+
+        connection.exec_driver_sql("UPDATE fooditem SET calories = 2 WHERE name = 'Soup'")
+        connection.exec_driver_sql("DELETE FROM fooditem WHERE name = 'Bread'")
+        soup_seq = connection.exec_driver_sql("SELECT change_seq FROM fooditem WHERE name = 'Soup'").scalar()
+        tombstone = connection.exec_driver_sql("SELECT seq, entity, user_id FROM synctombstone").one()
+    assert soup_seq == head + 1
+    assert tuple(tombstone) == (head + 2, "food", None)
+    engine.dispose()
+
+def test_duplicate_global_foods_are_merged_and_kept_out(tmp_path):
+    from sqlalchemy.exc import IntegrityError
+    engine = create_app_engine(f"sqlite:///{tmp_path / 'dedupe.db'}", "compat")
+    SQLModel.metadata.create_all(engine)
+    run_migrations(engine, target=8)
+    with engine.begin() as connection:
+        for name, is_custom in (("Soup", 0), ("Soup", 0), ("Soup", 1), ("Bread", 0), ("Soup", 0)):
+            connection.exec_driver_sql(
+                "INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom) VALUES (?, 1, 1, 1, 1, ?)",
+                (name, is_custom),
+            )
+        for food_id in (2, 3, 5, 4):
+            connection.exec_driver_sql(
+                "INSERT INTO meallog (user_id, food_item_id, date, meal_type, calories, protein, carbs, fats) "
+                "VALUES (1, ?, '2024-01-01', 'lunch', 0, 0, 0, 0)",
+                (food_id,),
+            )
+    run_migrations(engine)
+    with engine.begin() as connection:
+        foods = [tuple(row) for row in connection.exec_driver_sql("SELECT id, name, is_custom FROM fooditem ORDER BY id")]
+        # Meals on a removed duplicate now point at the surviving global food; custom foods are untouched
+        meals = [row[0] for row in connection.exec_driver_sql("SELECT food_item_id FROM meallog ORDER BY id")]
+    assert foods == [(1, "Soup", 0), (3, "Soup", 1), (4, "Bread", 0)]
+    assert meals == [1, 3, 1, 4]
+
+    from sqlmodel import Session
+    from database import UnitOfWork
+    # Seeding skips names already taken instead of failing
+    with Session(engine) as session, UnitOfWork(session):
+        assert FoodRepository().seed_global_foods([{"name": "Soup", "calories": 9, "protein": 0, "carbs": 0, "fats": 0},
+                                       {"name": "Tea", "calories": 2, "protein": 0, "carbs": 0, "fats": 0}]) == 1
+    with pytest.raises(IntegrityError), engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO fooditem (name, calories, protein, carbs, fats, is_custom) VALUES ('Tea', 1, 1, 1, 1, 0)")
+    engine.dispose()
@@ -0,0 +1,84 @@
+from fastapi import status
+from sqlmodel import select
+from models import FoodItem
+import gzip
+import json
+import pytest
+
+@pytest.fixture
+def admin_headers(session, test_user, auth_headers):
+    test_user.is_admin = True
+    session.add(test_user)
+    session.commit()
+    return auth_headers
+
+def _import(client, headers, filename, content, **params):
+    return client.post("/admin/foods/import", params=params, headers=headers,
+                       files={"file": (filename, content, "application/octet-stream")})
+
+def test_records_are_normalized_from_common_export_shapes():
+    from services.food_import import InvalidFoodRecord, normalize_record
+    row = normalize_record({"fdc_id": "171688", "description": " Apples, raw ", "energy_kcal": "52",
+                            "protein_g": "0.26", "carbohydrate_g": "13.8", "fat_g": "", "brand": "Orchard"}, "fdc")
+    assert row["source_id"] == "fdc:171688" and row["name"] == "Apples, raw"
+    assert (row["calories"], row["protein"], row["carbs"], row["fats"]) == (52, 0.26, 13.8, 0)
+    assert row["details"] == {"brand": "Orchard"}
+
+    fdc = normalize_record(json.dumps({"fdcId": 9, "description": "Oats", "foodNutrients": [
+        {"nutrient": {"number": "957", "name": "Energy (Atwater General Factors)"}, "amount": 380},
+        {"nutrient": {"number": "208", "name": "Energy"}, "amount": 379},
+        {"number": "203", "name": "Protein", "amount": 13.2},
+    ]}))
+    assert (fdc["source_id"], fdc["calories"], fdc["protein"]) == ("9", 379, 13.2)
+    assert fdc["details"]["nutrients"]["Protein"] == 13.2
+
+    for bad in ('{"name": "Soup"}', '{"name": "", "calories": 5}', '{"name": "Soup", "calories": -1}',
+                '{"name": "Soup", "calories": "NaN"}', "[1, 2]", "{not json"):
+        with pytest.raises(InvalidFoodRecord):
+            normalize_record(bad)
+
+def test_csv_import_upserts_by_source_id_and_resumes(client, session, admin_headers):
+    session.add(FoodItem(name="Apple", calories=95, protein=0.5, carbs=25, fats=0.3, is_custom=False))
+    session.commit()
+    apple_id = session.exec(select(FoodItem.id).where(FoodItem.name == "Apple")).one()
+
+    lines = ["source_id,name,calories,protein,carbs,fats,category",
+             "a1,Apple,52,0.3,14,0.2,Fruit",         # claims the existing Apple
+             "a2,Banana,89,1.1,23,0.3,Fruit",
+             "a3,Broken,lots,1,1,1,Fruit",           # invalid
+             "a4,Banana,90,1,20,0,Fruit",            # name already taken by a2
+             "a5,Carrot,41,0.9,10,0.2,Vegetable"]
+    csv_body = "\n".join(lines).encode()
+    report = _import(client, admin_headers, "foods.csv", csv_body, source="test").json()
+    assert (report["read"], report["written"], report["invalid"], report["skipped"]) == (5, 3, 1, 1)
+    assert report["next_offset"] == 5
+    assert report["errors"][0]["record"] == 3
+
+    apple = session.get(FoodItem, apple_id)
+    session.refresh(apple)
+    assert (apple.source_id, apple.calories, apple.details) == ("test:a1", 52, {"category": "Fruit"})
+
+    # Resume after the first two records; a record seen before is updated in place
+    lines[5] = "a5,Carrot,45,0.9,10,0.2,Vegetable"
+    report = _import(client, admin_headers, "foods.csv", "\n".join(lines).encode(), source="test", offset=2).json()
+    assert (report["offset"], report["read"], report["written"]) == (2, 3, 1)
+    carrots = session.exec(select(FoodItem).where(FoodItem.name == "Carrot")).all()
+    assert len(carrots) == 1 and carrots[0].calories == 45
+
+    names = [food["name"] for food in client.get("/foods?search=carr").json()]
+    assert names == ["Carrot"]
+
+def test_ndjson_gzip_import(client, session, admin_headers):
+    body = gzip.compress(b"\n".join(json.dumps(record).encode() for record in [
+        {"code": "0001", "product_name": "Granola", "energy-kcal_100g": 471, "proteins_100g": 10},
+        {"code": "0002", "product_name": "Granola Bar"},
+    ]) + b"\n\n")
+    report = _import(client, admin_headers, "off.ndjson.gz", body).json()
+    assert (report["read"], report["written"], report["invalid"]) == (2, 1, 1)
+    assert session.exec(select(FoodItem.source_id).where(FoodItem.name == "Granola")).one() == "0001"
+
+    assert _import(client, admin_headers, "foods.txt", b"x").status_code == status.HTTP_400_BAD_REQUEST
+
+def test_import_is_admin_only(client, auth_headers):
+    response = _import(client, auth_headers, "foods.csv", b"name,calories\nSoup,50\n")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
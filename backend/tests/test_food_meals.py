@@ -1,6 +1,6 @@
 from fastapi import status
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 from models import FoodItem, MealLog
 
 def test_seed_and_get_foods(client, session):
@@ -97,3 +97,222 @@ def test_analytics_summary(client, auth_headers, session, test_user):
     assert data["today"]["calories"] == 300
     assert data["today"]["protein"] == 30
     assert "goal" in data
+
+def test_log_meal_commits_once(client, auth_headers, session):
+    from sqlalchemy import event
+
+    commits = []
+    listener = lambda s: commits.append(s)
+    event.listen(session, "after_commit", listener)
+    try:
+        response = client.post("/meals", json={
+            "date": datetime.utcnow().isoformat(),
+            "meal_type": "snack",
+            "food_item": {"name": "Yogurt", "calories": 120, "protein": 8, "carbs": 12, "fats": 4}
+        }, headers=auth_headers)
+    finally:
+        event.remove(session, "after_commit", listener)
+
+    assert response.status_code == status.HTTP_200_OK
+    # User lookup, custom food insert and meal insert share one unit of work
+    assert len(commits) == 1
+
+def test_rollup_follows_log_and_delete(client, auth_headers, session, test_user):
+    from models import DailyNutritionRollup
+    from repositories.rollup_repository import RollupRepository
+
+    today = datetime.now().isoformat()
+    first = client.post("/meals", json={
+        "date": today,
+        "meal_type": "lunch",
+        "food_item": {"name": "Pasta", "calories": 400, "protein": 12, "carbs": 70, "fats": 6}
+    }, headers=auth_headers).json()
+    client.post("/meals", json={
+        "date": today,
+        "meal_type": "dinner",
+        "food_item": {"name": "Salmon", "calories": 350, "protein": 34, "carbs": 0, "fats": 22}
+    }, headers=auth_headers)
+
+    response = client.delete(f"/meals/{first['id']}", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.delete(f"/meals/{first['id']}", headers=auth_headers).status_code == status.HTTP_404_NOT_FOUND
+
+    summary = client.get("/analytics/summary", headers=auth_headers).json()
+    assert summary["today"]["calories"] == 350
+    assert summary["today"]["protein"] == 34
+
+    # A bulk rebuild from history lands on the same numbers
+    rollup = session.get(DailyNutritionRollup, (test_user.id, datetime.now().date()))
+    before = (rollup.calories, rollup.protein, rollup.meal_count)
+    RollupRepository().rebuild(test_user.id)
+    session.expire_all()
+    rollup = session.get(DailyNutritionRollup, (test_user.id, datetime.now().date()))
+    assert (rollup.calories, rollup.protein, rollup.meal_count) == before == (350, 34, 1)
+
+def test_analytics_range_buckets(client, auth_headers):
+    for day, calories in [("2024-03-04", 500), ("2024-03-05", 700), ("2024-03-05", 100), ("2024-03-12", 900), ("2024-04-01", 300)]:
+        client.post("/meals", json={
+            "date": f"{day}T12:00:00",
+            "meal_type": "lunch",
+            "food_item": {"name": "Meal", "calories": calories, "protein": 10, "carbs": 10, "fats": 1}
+        }, headers=auth_headers)
+
+    response = client.get("/analytics/range?from=2024-03-04&to=2024-03-06&granularity=day", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    buckets = response.json()["buckets"]
+    assert [b["start"] for b in buckets] == ["2024-03-04", "2024-03-05", "2024-03-06"]
+    assert [b["calories"] for b in buckets] == [500, 800, 0]
+    assert buckets[1]["meals_count"] == 2
+
+    # 2024-03-04 is a Monday; weeks start on Monday
+    weeks = client.get("/analytics/range?from=2024-03-04&to=2024-03-17&granularity=week", headers=auth_headers).json()["buckets"]
+    assert [(b["start"], b["calories"], b["days_logged"]) for b in weeks] == [("2024-03-04", 1300, 2), ("2024-03-11", 900, 1)]
+
+    months = client.get("/analytics/range?from=2024-03-01&to=2024-04-30&granularity=month", headers=auth_headers).json()["buckets"]
+    assert [(b["start"], b["calories"]) for b in months] == [("2024-03-01", 2200), ("2024-04-01", 300)]
+
+    assert client.get("/analytics/range?from=2024-03-10&to=2024-03-01", headers=auth_headers).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/analytics/range?granularity=year", headers=auth_headers).status_code == 422
+
+def test_food_search_is_prefix_matched_and_limited(client, session):
+    for name in ["Chicken Breast", "Chicken Thigh", "Chickpea Salad", "Beef Steak"]:
+        session.add(FoodItem(name=name, calories=100, protein=10, carbs=10, fats=2, is_custom=False))
+    session.commit()
+
+    names = {f["name"] for f in client.get("/foods?search=chick").json()}
+    assert names == {"Chicken Breast", "Chicken Thigh", "Chickpea Salad"}
+
+    data = client.get("/foods?search=chicken bre").json()
+    assert [f["name"] for f in data] == ["Chicken Breast"]
+
+    # FTS operators in user input are treated as plain words
+    assert client.get('/foods?search=") OR *').status_code == status.HTTP_200_OK
+
+    # Renames are picked up by the sync triggers
+    steak = session.query(FoodItem).filter(FoodItem.name == "Beef Steak").one()
+    steak.name = "Sirloin Steak"
+    session.commit()
+    assert [f["name"] for f in client.get("/foods?search=sirl").json()] == ["Sirloin Steak"]
+
+    assert len(client.get("/foods?limit=2").json()) == 2
+    assert client.get("/foods?limit=1000").status_code == 422
+
+def test_history_is_keyset_paginated(client, auth_headers, session, test_user):
+    # Three meals share a timestamp, so pages must break ties on id
+    base = datetime(2024, 5, 1, 12, 0)
+    for i in range(7):
+        session.add(MealLog(user_id=test_user.id, food_item_id=1, date=base - timedelta(days=i // 3), meal_type="lunch", calories=i))
+    session.commit()
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/meals/history", params={"limit": 3, "cursor": cursor}, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) <= 3
+        seen.extend(m["id"] for m in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 7
+    meals = {m.id: m for m in session.query(MealLog).all()}
+    assert [(meals[i].date, i) for i in seen] == sorted(((m.date, m.id) for m in meals.values()), reverse=True)
+
+    assert client.get("/meals/history?cursor=not-a-cursor", headers=auth_headers).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/meals/history?limit=1000", headers=auth_headers).status_code == 422
+
+def test_food_browsing_is_keyset_paginated(client, session):
+    # Global names are unique; a custom food may share one, so the id tie-break still matters
+    for name, is_custom in [("Apple", False), ("Apple", True), ("Banana", False), ("Carrot", False), ("Date", False)]:
+        session.add(FoodItem(name=name, calories=50, protein=1, carbs=10, fats=0, is_custom=is_custom))
+    session.commit()
+
+    first = client.get("/foods?limit=2")
+    assert [f["name"] for f in first.json()] == ["Apple", "Apple"]
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/foods?limit=2&cursor={cursor}")
+    assert [f["name"] for f in second.json()] == ["Banana", "Carrot"]
+    last = client.get(f"/foods?limit=2&cursor={second.headers['X-Next-Cursor']}")
+    assert [f["name"] for f in last.json()] == ["Date"]
+    assert "X-Next-Cursor" not in last.headers
+
+    # A history cursor is not accepted by the food listing
+    from repositories.pagination import encode_cursor
+    history_cursor = encode_cursor("history", datetime(2024, 1, 1), 1)
+    assert client.get(f"/foods?cursor={history_cursor}").status_code == status.HTTP_400_BAD_REQUEST
+
+def test_batch_logging_is_one_transaction_with_per_item_results(client, auth_headers, session, test_user):
+    from sqlalchemy import event
+    from models import DailyNutritionRollup
+
+    session.add(FoodItem(name="Banana", calories=105, protein=1.3, carbs=27, fats=0.4, is_custom=False))
+    session.commit()
+    banana_id = session.query(FoodItem).filter(FoodItem.name == "Banana").one().id
+
+    day = "2024-06-01T08:00:00"
+    shake = {"name": "Shake", "calories": 200, "protein": 20, "carbs": 10, "fats": 5}
+    batch = {"meals": [
+        {"date": day, "meal_type": "breakfast", "food_item": {"id": banana_id, "name": "Banana", "calories": 105}},
+        {"date": day, "meal_type": "snack", "food_item": dict(shake)},
+        {"date": "2024-06-02T19:00:00", "meal_type": "dinner", "food_item": dict(shake)},
+        {"date": day, "meal_type": "lunch", "food_item": {"note": "no food"}},
+        # Matches the existing global food, so no custom copy is created
+        {"date": day, "meal_type": "lunch", "food_item": {"name": "Banana", "calories": 105, "protein": 1.3, "carbs": 27, "fats": 0.4}},
+    ]}
+
+    commits = []
+    listener = lambda s: commits.append(s)
+    event.listen(session, "after_commit", listener)
+    try:
+        response = client.post("/meals/batch", json=batch, headers=auth_headers)
+    finally:
+        event.remove(session, "after_commit", listener)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(commits) == 1
+    body = response.json()
+    assert (body["created"], body["failed"]) == (4, 1)
+    results = body["results"]
+    assert [r["ok"] for r in results] == [True, True, True, False, True]
+    assert results[3]["error"]
+    # The same custom food in two entries is created once
+    assert results[1]["food_item_id"] == results[2]["food_item_id"] != banana_id
+    assert results[4]["food_item_id"] == banana_id
+    assert session.query(FoodItem).filter(FoodItem.name == "Shake").count() == 1
+
+    history = {m["id"]: m for m in client.get("/meals/history", headers=auth_headers).json()}
+    assert history[results[1]["id"]]["calories"] == 200
+    assert history[results[1]["id"]]["food_snapshot"]["is_custom"] is True
+
+    rollups = {r.day.isoformat(): r for r in session.query(DailyNutritionRollup).filter(DailyNutritionRollup.user_id == test_user.id)}
+    assert rollups["2024-06-01"].meal_count == 3
+    assert rollups["2024-06-01"].calories == 105 + 200 + 105
+    assert rollups["2024-06-02"].calories == 200
+
+    assert client.post("/meals/batch", json={"meals": []}, headers=auth_headers).status_code == 422
+
+def test_batch_never_reuses_another_users_custom_food(client, auth_headers, session):
+    # Another user's custom food with the same name and macros as the batch entry
+    other = FoodItem(name="Shake", calories=200, protein=20, carbs=10, fats=5, is_custom=True)
+    session.add(other)
+    session.commit()
+
+    entry = {"date": "2024-06-01T08:00:00", "meal_type": "snack",
+             "food_item": {"name": "Shake", "calories": 200, "protein": 20, "carbs": 10, "fats": 5}}
+    result = client.post("/meals/batch", json={"meals": [entry]}, headers=auth_headers).json()["results"][0]
+    assert result["ok"] and result["food_item_id"] != other.id
+    assert session.get(FoodItem, result["food_item_id"]).is_custom
+
+def test_batch_rejects_unknown_food_ids(client, auth_headers, session, test_user):
+    from models import DailyNutritionRollup, MealLog
+    day = "2024-06-01T08:00:00"
+    batch = {"meals": [
+        {"date": day, "meal_type": "lunch", "food_item": {"id": 999999, "name": "Ghost", "calories": 900}},
+        {"date": day, "meal_type": "dinner", "food_item": {"name": "Stew", "calories": 300}},
+    ]}
+    body = client.post("/meals/batch", json=batch, headers=auth_headers).json()
+    assert [r["ok"] for r in body["results"]] == [False, True]
+    assert body["results"][0]["error"] == "food_item.id not found"
+
+    assert session.query(MealLog).filter(MealLog.food_item_id == 999999).count() == 0
+    rollup = session.query(DailyNutritionRollup).filter(DailyNutritionRollup.user_id == test_user.id).one()
+    assert (rollup.meal_count, rollup.calories) == (1, 300)
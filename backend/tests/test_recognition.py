@@ -0,0 +1,191 @@
+from fastapi import status
+from io import BytesIO
+from PIL import Image
+import numpy as np
+import pytest
+
+def _photo(width=3000, height=2000, orientation=None, fmt="JPEG") -> bytes:
+    # Left half red, right half blue, as the camera sensor recorded it
+    image = Image.new("RGB", (width, height), (0, 0, 255))
+    image.paste((255, 0, 0), (0, 0, width // 2, height))
+    buffer = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, fmt, exif=exif.tobytes())
+    return buffer.getvalue()
+
+def _meal_photo(seed=1, size=(1600, 1200), quality=95, fmt="JPEG", brightness=1.0) -> bytes:
+    # Smooth random colour field: textured enough for a perceptual hash, unlike the flat halves above
+    rng = np.random.default_rng(seed)
+    image = Image.fromarray((rng.random((6, 8, 3)) * 255).astype(np.uint8)).resize(size, Image.Resampling.BICUBIC)
+    image = image.point(lambda value: min(255, int(value * brightness)))
+    buffer = BytesIO()
+    image.save(buffer, fmt, **({"quality": quality} if fmt == "JPEG" else {}))
+    return buffer.getvalue()
+
+@pytest.fixture
+def catalog(session):
+    from container import get_container
+    from models import FoodItem
+    for name in ("Apple", "Banana", "Salad", "Pasta"):
+        session.add(FoodItem(name=name, calories=100, protein=1, carbs=20, fats=1, is_custom=False))
+    session.commit()
+    get_container().food_catalog.bump()
+    return {"Apple", "Banana", "Salad", "Pasta"}
+
+def test_model_input_is_upright_square_and_small():
+    from services.recognition import MODEL_INPUT_SIZE, load_model_input
+    # Orientation 6: the viewer rotates 90 degrees clockwise, so the red half ends up on top
+    pixels = load_model_input(BytesIO(_photo(orientation=6)))
+    assert pixels.shape == (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE, 3)
+    assert pixels.dtype == np.uint8
+    assert pixels[10, MODEL_INPUT_SIZE // 2, 0] > 200 and pixels[10, MODEL_INPUT_SIZE // 2, 2] < 50
+    assert pixels[-10, MODEL_INPUT_SIZE // 2, 2] > 200 and pixels[-10, MODEL_INPUT_SIZE // 2, 0] < 50
+
+def test_recognize_upload_is_deterministic(client, auth_headers, catalog):
+    photo = _photo(orientation=6)
+    first = client.post("/ai/recognize", files={"image": ("meal.jpg", photo, "image/jpeg")}, headers=auth_headers)
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json()["name"] in catalog
+    again = client.post("/ai/recognize", files={"image": ("meal.jpg", photo, "image/jpeg")}, headers=auth_headers)
+    assert again.json() == first.json()
+
+    png = client.post("/ai/recognize", files={"image": ("meal.png", _photo(400, 300, fmt="PNG"), "image/png")},
+                      headers=auth_headers)
+    assert png.status_code == status.HTTP_200_OK
+
+def test_recognize_rejects_bad_and_oversized_uploads(client, auth_headers, catalog):
+    from settings import Settings
+    response = client.post("/ai/recognize", files={"image": ("meal.jpg", b"not an image", "image/jpeg")},
+                           headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    oversized = b"\xff" * (Settings.from_env().upload_max_bytes + 1)
+    response = client.post("/ai/recognize", files={"image": ("meal.jpg", oversized, "image/jpeg")},
+                           headers=auth_headers)
+    assert response.status_code == 413
+
+def test_body_limit_counts_streamed_bytes():
+    import asyncio
+    from fastapi import FastAPI, Request
+    from upload_limits import BodySizeLimitMiddleware
+    import httpx
+
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(BodySizeLimitMiddleware, limits={"/upload": 1000})
+
+    async def chunks(count):
+        # No Content-Length: the cap has to be enforced while reading
+        for _ in range(count):
+            yield b"x" * 300
+
+    async def post(count):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/upload", content=chunks(count))
+
+    assert asyncio.run(post(3)).json() == {"size": 900}
+    assert asyncio.run(post(4)).status_code == 413
+
+def test_batcher_groups_concurrent_requests():
+    import asyncio
+    from services.inference_batcher import InferenceBatcher
+    sizes = []
+
+    def run_batch(items):
+        sizes.append(len(items))
+        return [item * 10 for item in items]
+
+    batcher = InferenceBatcher(run_batch, max_batch_size=4, max_wait_ms=50, max_queue=16)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert asyncio.run(main()) == [i * 10 for i in range(10)]
+    assert sizes == [4, 4, 2]
+    metrics = batcher.metrics()
+    assert metrics["batches"] == 3 and metrics["largest_batch"] == 4
+
+def test_batcher_rejects_when_queue_is_full_and_fans_out_errors():
+    import asyncio
+    import threading
+    from services.inference_batcher import InferenceBatcher, InferenceQueueFull
+    release = threading.Event()
+
+    def run_batch(items):
+        release.wait(5)
+        if "bad" in items:
+            raise RuntimeError("model failed")
+        return items
+
+    batcher = InferenceBatcher(run_batch, max_batch_size=1, max_wait_ms=0, max_queue=2)
+
+    async def main():
+        running = asyncio.ensure_future(batcher.submit("first"))
+        await asyncio.sleep(0.05)  # picked up by the worker, blocked inside the model
+        queued = [asyncio.ensure_future(batcher.submit(item)) for item in ("bad", "third")]
+        await asyncio.sleep(0)
+        with pytest.raises(InferenceQueueFull):
+            await batcher.submit("fourth")
+        release.set()
+        return await asyncio.gather(running, *queued, return_exceptions=True)
+
+    first, bad, third = asyncio.run(main())
+    assert first == "first" and third == "third"
+    assert isinstance(bad, RuntimeError)
+    assert batcher.metrics()["rejected"] == 1
+
+def test_near_duplicate_photos_are_served_from_the_cache(client, auth_headers, catalog):
+    from container import get_container
+    cache = get_container().recognition_cache
+    before = cache.metrics()
+
+    def recognize(photo, name="meal.jpg"):
+        response = client.post("/ai/recognize", files={"image": (name, photo, "image/jpeg")}, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    first = recognize(_meal_photo())
+    # Recompressed, rescaled and re-lit copies hash within the threshold of the original
+    assert recognize(_meal_photo(quality=40)) == first
+    assert recognize(_meal_photo(size=(800, 600), fmt="PNG"), "meal.png") == first
+    assert recognize(_meal_photo(brightness=1.1)) == first
+    recognize(_meal_photo(seed=2))
+
+    metrics = cache.metrics()
+    assert metrics["hits"] - before["hits"] == 3 and metrics["misses"] - before["misses"] == 2
+    assert metrics["size"] == 2
+    assert metrics["saved_ms"] >= before["saved_ms"]
+
+def test_recognition_cache_persists_and_drops_stale_foods(tmp_path):
+    from services.recognition_cache import RecognitionCache
+    path = str(tmp_path / "recognitions.db")
+    cache = RecognitionCache(max_entries=2, max_distance=2, path=path, model="digest")
+    cache.store([(0xF0F0, 7), (0x0F0F_0000, None)], inference_seconds=0.02)
+    cache.close()
+
+    reloaded = RecognitionCache(max_entries=2, max_distance=2, path=path, model="digest")
+    assert reloaded.lookup(0xF0F0 ^ 0b11, {7}) == (True, 7)
+    assert reloaded.lookup(0xF0F0 ^ 0b111, {7}) == (False, None)
+    assert reloaded.lookup(0x0F0F_0000, {7}) == (True, None)
+    # Food 7 was deleted from the catalog: the entry is dropped, here and on disk
+    assert reloaded.lookup(0xF0F0, set()) == (False, None)
+    assert reloaded.metrics()["stale"] == 1
+    reloaded.store([(0xAAAA_0000_0000, 3), (0x5555_0000_0000_0000, 4)], inference_seconds=0.01)
+    assert reloaded.metrics()["evictions"] == 1
+    reloaded.close()
+
+    again = RecognitionCache(max_entries=2, max_distance=2, path=path, model="digest")
+    assert again.lookup(0xF0F0, {7}) == (False, None)
+    assert again.lookup(0x5555_0000_0000_0000, {4}) == (True, 4)
+    assert again.metrics()["size"] == 2
+    again.close()
+    # Another recognizer never sees these answers
+    other = RecognitionCache(max_entries=2, max_distance=2, path=path, model="projection")
+    assert other.metrics()["size"] == 0
+    other.close()
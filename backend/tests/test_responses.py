@@ -0,0 +1,47 @@
+from fastapi import status
+from datetime import datetime
+import gzip
+import pytest
+from models import FoodItem
+from compression import negotiate_encoding
+import json_responses
+
+@pytest.mark.parametrize("header, brotli_available, expected", [
+    ("gzip, deflate, br", True, "br"),
+    ("gzip, deflate, br", False, "gzip"),
+    ("br;q=0.5, gzip", True, "gzip"),
+    ("gzip;q=0, identity", True, None),
+    ("*", True, "br"),
+    ("", True, None),
+])
+def test_encoding_negotiation(header, brotli_available, expected):
+    assert negotiate_encoding(header, brotli_available) == expected
+
+def test_large_json_is_compressed_small_is_not(client, session):
+    for i in range(60):
+        session.add(FoodItem(name=f"Granola {i}", calories=400, protein=10, carbs=60, fats=15, is_custom=False))
+    session.commit()
+
+    # Read the raw bytes to see what went over the wire
+    with client.stream("GET", "/foods?limit=60", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    # The representation differs per encoding, so its tag is weak
+    assert response.headers["etag"].startswith('W/"')
+    assert len(gzip.decompress(raw).decode().split('"name"')) == 61
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    # Weak tags from compressed responses still revalidate
+    cached = client.get("/foods?limit=60", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+def test_fast_json_matches_fastapi_encoding(monkeypatch):
+    payload = {"at": datetime(2024, 5, 1, 12, 30, 0, 250000), "day": datetime(2024, 5, 1).date(), "items": [{"q": 1.5, "name": "Café"}]}
+    expected = b'{"at":"2024-05-01T12:30:00.250000","day":"2024-05-01","items":[{"q":1.5,"name":"Caf\xc3\xa9"}]}'
+    assert json_responses.dumps(payload) == expected
+    # Without orjson installed the stdlib fallback produces the same bytes
+    monkeypatch.setattr(json_responses, "orjson", None)
+    assert json_responses.dumps(payload) == expected
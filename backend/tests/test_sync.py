@@ -0,0 +1,64 @@
+from fastapi import status
+from datetime import datetime
+from models import FoodItem, MealLog
+
+def _log(client, auth_headers, name, calories):
+    response = client.post("/meals", json={
+        "date": datetime.utcnow().isoformat(),
+        "meal_type": "snack",
+        "food_item": {"name": name, "calories": calories, "protein": 1, "carbs": 1, "fats": 1},
+    }, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+def test_sync_returns_only_changes_after_since(client, auth_headers, session, test_user):
+    first = client.get("/sync", headers=auth_headers).json()
+    assert first["profile"]["email"] == test_user.email
+    assert "hashed_password" not in first["profile"]
+    assert first["has_more"] is False
+    head = first["next"]
+
+    # Nothing changed: empty delta, same position
+    idle = client.get(f"/sync?since={head}", headers=auth_headers).json()
+    assert (idle["meals"], idle["foods"], idle["profile"], idle["next"]) == ([], [], None, head)
+
+    apple = _log(client, auth_headers, "Apple", 95)
+    pear = _log(client, auth_headers, "Pear", 100)
+    client.put("/users/profile", json={"age": 41}, headers=auth_headers)
+    client.delete(f"/meals/{apple['id']}", headers=auth_headers)
+
+    # Another user's meal is not visible
+    session.add(MealLog(user_id=test_user.id + 1, food_item_id=1, date=datetime.utcnow(), meal_type="lunch"))
+    session.commit()
+
+    delta = client.get(f"/sync?since={head}", headers=auth_headers).json()
+    assert [m["id"] for m in delta["meals"]] == [pear["id"]]
+    assert {f["name"] for f in delta["foods"]} == {"Apple", "Pear"}
+    assert delta["profile"]["age"] == 41
+    assert delta["deleted"] == {"meals": [apple["id"]], "foods": []}
+    assert delta["next"] > head
+
+    # Catalog deletions are tombstoned for everyone
+    food = session.get(FoodItem, pear["food_item_id"])
+    session.delete(food)
+    session.commit()
+    after_delete = client.get(f"/sync?since={delta['next']}", headers=auth_headers).json()
+    assert after_delete["deleted"]["foods"] == [pear["food_item_id"]]
+
+def test_sync_pages_in_sequence_order(client, auth_headers):
+    for i in range(5):
+        _log(client, auth_headers, f"Food {i}", 100 + i)
+
+    since, pages, meals, foods = 0, 0, [], []
+    while True:
+        page = client.get(f"/sync?since={since}&limit=3", headers=auth_headers).json()
+        assert len(page["meals"]) + len(page["foods"]) + (page["profile"] is not None) <= 3
+        meals += [m["id"] for m in page["meals"]]
+        foods += [f["name"] for f in page["foods"]]
+        since, pages = page["next"], pages + 1
+        if not page["has_more"]:
+            break
+    # 5 custom foods + 5 meals + the profile, no duplicates or gaps across pages
+    assert pages == 4
+    assert len(meals) == len(set(meals)) == 5
+    assert sorted(foods) == [f"Food {i}" for i in range(5)]
@@ -36,3 +36,33 @@ def test_update_profile_and_bmr_calculation(client, auth_headers, session, test_
     session.refresh(test_user) # Refresh instance from DB
     assert test_user.weight == 100
     assert test_user.daily_calorie_goal == 2376.0
+
+def test_current_user_cached_and_invalidated_on_profile_update(client, auth_headers, test_user):
+    from container import get_container
+    cache = get_container().principal_cache
+
+    client.get("/users/me/", headers=auth_headers)
+    hits_before = cache.metrics()["hits"]
+    response = client.get("/users/me/", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert cache.metrics()["hits"] == hits_before + 1
+
+    response = client.put("/users/profile", json={"weight": 72}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    # The cached principal was dropped on commit, so the new weight is visible
+    response = client.get("/users/me/", headers=auth_headers)
+    assert response.json()["weight"] == 72
+
+def test_principal_cache_drops_put_that_races_an_invalidation(test_user):
+    from services.principal_cache import PrincipalCache
+    cache = PrincipalCache()
+
+    # A miss read the row, then a profile update committed and invalidated before the put
+    generation = cache.generation()
+    cache.invalidate(test_user.email)
+    cache.put(test_user.email, test_user, generation)
+    assert cache.get(test_user.email) is None
+
+    cache.put(test_user.email, test_user, cache.generation())
+    assert cache.get(test_user.email).email == test_user.email
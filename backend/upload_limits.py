@@ -0,0 +1,45 @@
+from typing import Dict
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+class InvalidImage(ValueError):
+    """The upload is not an image Pillow can decode (or is implausibly large)."""
+
+class BodySizeLimitMiddleware:
+    """
+    Caps request bodies on upload routes (`limits` maps a path to its maximum size in bytes).
+    A Content-Length over the cap is refused with 413 before any byte is read; otherwise
+    bytes are counted as they stream in, so chunked uploads cannot get past the cap
+    either. Past the cap, reading raises a 413 HTTPException, which FastAPI re-raises
+    from form parsing instead of turning it into a 400.
+    """
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(status_code=413, content={"detail": f"Upload larger than {limit} bytes"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=f"Upload larger than {limit} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -21,11 +21,18 @@ class _AdminDashboardScreenState extends State<AdminDashboardScreen> with Single
   final _fatsController = TextEditingController();
   bool _isAddingFood = false;
 
+  // Global food list, loaded one page at a time as the admin scrolls
+  final List<dynamic> _foods = [];
+  String? _foodsCursor;
+  bool _hasMoreFoods = true;
+  bool _isLoadingFoods = false;
+
   @override
   void initState() {
     super.initState();
     _tabController = TabController(length: 2, vsync: this);
     _loadStats();
+    _loadMoreFoods();
   }
 
   @override
@@ -50,6 +57,30 @@ class _AdminDashboardScreenState extends State<AdminDashboardScreen> with Single
     }
   }
 
+  Future<void> _loadMoreFoods() async {
+    if (_isLoadingFoods || !_hasMoreFoods) return;
+    setState(() => _isLoadingFoods = true);
+    final page = await ApiService.getGlobalFoods(cursor: _foodsCursor);
+    if (!mounted) return;
+    setState(() {
+      if (page != null) {
+        _foods.addAll(page['items']);
+        _foodsCursor = page['nextCursor'];
+        _hasMoreFoods = _foodsCursor != null;
+      }
+      _isLoadingFoods = false;
+    });
+  }
+
+  Future<void> _reloadFoods() async {
+    setState(() {
+      _foods.clear();
+      _foodsCursor = null;
+      _hasMoreFoods = true;
+    });
+    await _loadMoreFoods();
+  }
+
   Future<void> _addFood() async {
     if (_foodNameController.text.isEmpty || _caloriesController.text.isEmpty) return;
     
@@ -74,6 +105,7 @@ class _AdminDashboardScreenState extends State<AdminDashboardScreen> with Single
         _carbsController.clear();
         _fatsController.clear();
         _loadStats(); // Update stats
+        _reloadFoods();
       } else {
         ScaffoldMessenger.of(context).showSnackBar(const SnackBar(content: Text('Failed to add food.')));
       }
@@ -203,32 +235,41 @@ class _AdminDashboardScreenState extends State<AdminDashboardScreen> with Single
   }
 
   Widget _buildFoodList() {
-    return FutureBuilder<List<dynamic>?>(
-      future: ApiService.getGlobalFoods(),
-      builder: (context, snapshot) {
-        if (snapshot.connectionState == ConnectionState.waiting) {
-          return const Center(child: CircularProgressIndicator());
-        }
-        if (!snapshot.hasData || snapshot.data!.isEmpty) {
-          return const Center(child: Text('No global foods found.'));
-        }
+    if (_foods.isEmpty) {
+      if (_isLoadingFoods) return const Center(child: CircularProgressIndicator());
+      return const Center(child: Text('No global foods found.'));
+    }
 
-        final foods = snapshot.data!;
-        return ListView.builder(
-          itemCount: foods.length,
-          itemBuilder: (context, index) {
-            final food = foods[index];
-            return ListTile(
-              title: Text(food['name']),
-              subtitle: Text('${food['calories']} kcal | P: ${food['protein']}g C: ${food['carbs']}g F: ${food['fats']}g'),
-              trailing: IconButton(
-                icon: const Icon(Icons.delete, color: Colors.red),
-                onPressed: () => _deleteFood(food['id'], food['name']),
+    return NotificationListener<ScrollNotification>(
+      // Fetch the next page a little before the end of the list comes into view
+      onNotification: (notification) {
+        if (notification.metrics.extentAfter < 300) _loadMoreFoods();
+        return false;
+      },
+      child: ListView.builder(
+        itemCount: _foods.length + (_hasMoreFoods ? 1 : 0),
+        itemBuilder: (context, index) {
+          if (index == _foods.length) {
+            return Padding(
+              padding: const EdgeInsets.all(16.0),
+              child: Center(
+                child: _isLoadingFoods
+                    ? const CircularProgressIndicator()
+                    : TextButton(onPressed: _loadMoreFoods, child: const Text('Load more')),
               ),
             );
-          },
-        );
-      },
+          }
+          final food = _foods[index];
+          return ListTile(
+            title: Text(food['name']),
+            subtitle: Text('${food['calories']} kcal | P: ${food['protein']}g C: ${food['carbs']}g F: ${food['fats']}g'),
+            trailing: IconButton(
+              icon: const Icon(Icons.delete, color: Colors.red),
+              onPressed: () => _deleteFood(food['id'], food['name']),
+            ),
+          );
+        },
+      ),
     );
   }
 
@@ -249,7 +290,7 @@ class _AdminDashboardScreenState extends State<AdminDashboardScreen> with Single
       final success = await ApiService.deleteFood(id);
       if (mounted) {
         if (success) {
-          setState(() {}); // Rebuild to refresh FutureBuilder
+          setState(() => _foods.removeWhere((food) => food['id'] == id));
           ScaffoldMessenger.of(context).showSnackBar(const SnackBar(content: Text('Food deleted.')));
            _loadStats();
         } else {
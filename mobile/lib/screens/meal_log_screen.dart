@@ -1,4 +1,5 @@
 import 'package:flutter/material.dart';
+import 'package:image_picker/image_picker.dart';
 import '../services/api_service.dart';
 
 class MealLogScreen extends StatefulWidget {
@@ -37,9 +38,11 @@ class _MealLogScreenState extends State<MealLogScreen> {
   }
 
   Future<void> _scanMeal() async {
-    // Mock AI Scan
+    // Downscaled on the device: the server only needs a small model input
+    final photo = await ImagePicker().pickImage(source: ImageSource.camera, maxWidth: 1600, imageQuality: 85);
+    if (photo == null) return;
     setState(() => _isLoading = true);
-    final food = await ApiService.recognizeImage();
+    final food = await ApiService.recognizeImage(imageBytes: await photo.readAsBytes(), filename: photo.name);
     setState(() => _isLoading = false);
     
     if (food != null && mounted) {
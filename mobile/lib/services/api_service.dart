@@ -1,3 +1,4 @@
+import 'dart:typed_data';
 import 'package:flutter/foundation.dart';
 import 'package:http/http.dart' as http;
 
@@ -151,13 +152,14 @@ class ApiService {
     return response.statusCode == 200;
   }
 
-  static Future<Map<String, dynamic>?> recognizeImage() async {
+  static Future<Map<String, dynamic>?> recognizeImage({Uint8List? imageBytes, String filename = 'meal.jpg'}) async {
     if (_token == null) return null;
-    // Mock image upload - in real app, send multipart request
-    final response = await http.post(
-      Uri.parse('$baseUrl/ai/recognize'),
-      headers: {'Authorization': 'Bearer $_token'},
-    );
+    final request = http.MultipartRequest('POST', Uri.parse('$baseUrl/ai/recognize'));
+    request.headers['Authorization'] = 'Bearer $_token';
+    if (imageBytes != null) {
+      request.files.add(http.MultipartFile.fromBytes('image', imageBytes, filename: filename));
+    }
+    final response = await http.Response.fromStream(await request.send());
     if (response.statusCode == 200) {
       return jsonDecode(response.body);
     }
@@ -211,16 +213,20 @@ class ApiService {
     );
     return response.statusCode == 200;
   }
-  static Future<List<dynamic>?> getGlobalFoods() async {
+  // One page of the catalog: {'items': [...], 'nextCursor': String?}.
+  // Pass nextCursor back to load the following page; it is null on the last one.
+  static Future<Map<String, dynamic>?> getGlobalFoods({String? cursor}) async {
     if (_token == null) return null;
+    final query = cursor == null ? '' : '?cursor=${Uri.encodeQueryComponent(cursor)}';
     final response = await http.get(
-      Uri.parse('$baseUrl/admin/foods'),
+      Uri.parse('$baseUrl/admin/foods$query'),
       headers: {'Authorization': 'Bearer $_token'},
     );
-    if (response.statusCode == 200) {
-      return jsonDecode(response.body);
-    }
-    return null;
+    if (response.statusCode != 200) return null;
+    return {
+      'items': jsonDecode(response.body),
+      'nextCursor': response.headers['x-next-cursor'],
+    };
   }
 
   static Future<List<dynamic>?> getMealPlanVariations() async {